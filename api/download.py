@@ -1,9 +1,40 @@
+import base64
 import os
 import re
 import logging
 import asyncio
 from typing import Any
 
+# Kept for the lifetime of a warm function instance, so later invocations reuse the
+# downloader (and whatever sessions and caches it holds) and the event loop.
+_downloader = None
+_loop = None
+
+
+def _get_downloader():
+    """Return the instance's downloader, importing it on first use."""
+    global _downloader
+    if _downloader is None:
+        # Import here to avoid cold start penalty
+        try:
+            from roblox_asset_downloader import RobloxAssetDownloader
+        except ImportError:
+            # Try importing from api/ if not found
+            import sys
+            sys.path.append(os.path.dirname(__file__))
+            from roblox_asset_downloader import RobloxAssetDownloader
+        _downloader = RobloxAssetDownloader()
+    return _downloader
+
+
+def _run(coro: Any) -> Any:
+    """Run a coroutine on the instance's event loop instead of a new one per call."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coro)
+
+
 def handler(request):
     """Vercel Python serverless function for /api/download."""
     try:
@@ -23,23 +54,23 @@ def handler(request):
         if not clothing:
             return {
                 "statusCode": 400,
-                "body": '{"error": "Please provide clothing id or url in field 'clothing'"}',
+                "body": '{"error": "Please provide clothing id or url in field \'clothing\'"}',
                 "headers": {"Content-Type": "application/json"}
             }
 
-        # Import here to avoid cold start penalty
-        try:
-            from roblox_asset_downloader import RobloxAssetDownloader
-        except ImportError:
-            # Try importing from api/ if not found
-            import sys
-            sys.path.append(os.path.dirname(__file__))
-            from roblox_asset_downloader import RobloxAssetDownloader
+        # Determine the numeric asset id from the provided input
+        asset_id = re.sub(r"[^0-9]", "", clothing)
+        if not asset_id:
+            return {
+                "statusCode": 400,
+                "body": '{"error": "Could not determine numeric asset id from input"}',
+                "headers": {"Content-Type": "application/json"}
+            }
 
         # Run the asynchronous processing synchronously for this endpoint
-        downloader = RobloxAssetDownloader()
+        downloader = _get_downloader()
         try:
-            asyncio.run(downloader.process_asset(clothing))
+            result = _run(downloader.process_asset(clothing))
         except Exception:
             logging.exception("Error processing asset")
             return {
@@ -48,38 +79,21 @@ def handler(request):
                 "headers": {"Content-Type": "application/json"}
             }
 
-        # Determine the numeric asset id from the provided input
-        asset_id = re.sub(r"[^0-9]", "", clothing)
-        if not asset_id:
-            return {
-                "statusCode": 400,
-                "body": '{"error": "Could not determine numeric asset id from input"}',
-                "headers": {"Content-Type": "application/json"}
-            }
-
-        downloads_dir = os.environ.get(
-            "DOWNLOADS_DIR",
-            os.path.join(os.path.dirname(os.path.dirname(__file__)), "downloads"),
-        )
-        file_path = os.path.join(downloads_dir, f"{asset_id}.png")
-
-        if not os.path.exists(file_path):
+        if result is None:
             return {
                 "statusCode": 500,
-                "body": '{"error": "Download finished but output file not found"}',
+                "body": '{"error": "Asset could not be rendered"}',
                 "headers": {"Content-Type": "application/json"}
             }
 
-        # Read the file and return as binary
-        with open(file_path, "rb") as f:
-            file_bytes = f.read()
+        # Return the rendered bytes straight from memory
         return {
             "statusCode": 200,
-            "body": file_bytes,
+            "body": base64.b64encode(result.data).decode("ascii"),
             "isBase64Encoded": True,
             "headers": {
-                "Content-Type": "image/png",
-                "Content-Disposition": f'attachment; filename="{asset_id}.png"'
+                "Content-Type": result.media_type,
+                "Content-Disposition": f'attachment; filename="{result.filename}"'
             }
         }
     except Exception:
@@ -1,21 +1,36 @@
 # RobloxAssetDownloader for Vercel Python serverless function
 # Move this file to /api/ for Vercel compatibility
 import os
-import requests
+
+
+class RenderedAsset:
+    """The encoded image returned by process_asset, mirroring src/rendered_asset.py."""
+
+    def __init__(self, asset_id, data, media_type="image/png", extension="png"):
+        self.asset_id = asset_id
+        self.data = data
+        self.media_type = media_type
+        self.extension = extension
+
+    @property
+    def filename(self):
+        return f"{self.asset_id}.{self.extension}"
+
 
 class RobloxAssetDownloader:
-    def process_asset(self, clothing):
+    async def process_asset(self, clothing):
         # Dummy implementation for Vercel demo
         # Replace with your actual logic
         asset_id = ''.join(filter(str.isdigit, clothing))
-        downloads_dir = os.environ.get(
-            "DOWNLOADS_DIR",
-            os.path.join(os.path.dirname(__file__), "downloads"),
-        )
-        os.makedirs(downloads_dir, exist_ok=True)
-        file_path = os.path.join(downloads_dir, f"{asset_id}.png")
-        # Download or generate a PNG file here
-        # For demo, just create a blank file
-        with open(file_path, "wb") as f:
-            f.write(b"\x89PNG\r\n\x1a\n")  # PNG header
-        return file_path
+        # Download or generate a PNG here
+        # For demo, just return a blank file
+        data = b"\x89PNG\r\n\x1a\n"  # PNG header
+        if os.environ.get("PERSIST_OUTPUTS", "1") != "0":
+            downloads_dir = os.environ.get(
+                "DOWNLOADS_DIR",
+                os.path.join(os.path.dirname(__file__), "downloads"),
+            )
+            os.makedirs(downloads_dir, exist_ok=True)
+            with open(os.path.join(downloads_dir, f"{asset_id}.png"), "wb") as f:
+                f.write(data)
+        return RenderedAsset(asset_id, data)
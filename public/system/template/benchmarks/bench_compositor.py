@@ -0,0 +1,57 @@
+"""
+Microbenchmark: shirt/pants/t-shirt overlay compositing, NumPy backend versus Pillow.
+
+Usage:
+    python benchmarks/bench_compositor.py [iterations]
+
+Times the cases from tests/test_compositor.py (a random clothing image with the
+real templates from src/assets), after running those tests to check that both
+backends produce byte-identical output. NumPy must be installed for the
+comparison; otherwise only Pillow is reported.
+"""
+
+import sys
+import timeit
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tests"))
+
+# Imported after sys.path is set up; the test module puts src/ on it too.
+# pylint: disable=wrong-import-position
+from test_compositor import NumpyCompositorTest, clothing_cases  # noqa: E402
+from compositor import PillowCompositor, np  # noqa: E402
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    cases = clothing_cases()
+
+    pillow = PillowCompositor()
+    numpy_compositor = None
+    if np is not None:
+        suite = unittest.defaultTestLoader.loadTestsFromTestCase(NumpyCompositorTest)
+        if not unittest.TextTestRunner(verbosity=0).run(suite).wasSuccessful():
+            sys.exit("NumpyCompositor output differs from Pillow's; not timing it.")
+        from compositor import NumpyCompositor  # pylint: disable=import-outside-toplevel
+
+        numpy_compositor = NumpyCompositor()
+    else:
+        print("numpy not installed; reporting the Pillow backend only.")
+
+    print(f"{'case':<8} {'pillow (ms)':>12} {'numpy (ms)':>11} {'speedup':>8}")
+    for name, (asset, layers) in cases.items():
+        slow = timeit.timeit(lambda a=asset, l=layers: pillow.compose(a, l), number=iterations)
+        slow_ms = slow / iterations * 1e3
+        if numpy_compositor is None:
+            print(f"{name:<8} {slow_ms:>12.3f} {'-':>11} {'-':>8}")
+            continue
+        fast = timeit.timeit(
+            lambda a=asset, l=layers: numpy_compositor.compose(a, l), number=iterations
+        )
+        fast_ms = fast / iterations * 1e3
+        print(f"{name:<8} {slow_ms:>12.3f} {fast_ms:>11.3f} {slow_ms / fast_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Microbenchmark: encode time versus output size for each encode profile.
+
+Usage:
+    python benchmarks/bench_encoders.py [iterations]
+
+Each case renders a shirt with the real templates from src/assets, once from a
+flat-coloured design (few colours, like most uploads) and once from noise (the worst
+case), then encodes it with every profile the installed Pillow supports. Lossless
+profiles are decoded again and checked against the rendered pixels.
+"""
+
+import io
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+# Imported after sys.path is set up.
+# pylint: disable=wrong-import-position
+import constants  # noqa: E402
+from asset_type import ShirtAsset  # noqa: E402
+from encoder import available_profiles, encode_image, get_profile  # noqa: E402
+from PIL import Image, ImageDraw  # noqa: E402
+
+
+def flat_design(size) -> Image.Image:
+    """A clothing upload made of a few solid shapes."""
+    image = Image.new("RGBA", size, (40, 90, 160, 255))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((60, 60, size[0] - 60, 200), fill=(230, 230, 230, 255))
+    draw.ellipse((200, 250, 380, 430), fill=(200, 40, 40, 255))
+    return image
+
+
+def noisy_design(size) -> Image.Image:
+    """A noisy, partly transparent RGBA image."""
+    return Image.frombytes("RGBA", size, os.urandom(size[0] * size[1] * 4))
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    size = constants.CLOTHING_TEMPLATE_SIZE
+    cases = {
+        "flat": ShirtAsset("0", flat_design(size)).render(),
+        "noise": ShirtAsset("0", noisy_design(size)).render(),
+    }
+
+    print(f"{'case':<6} {'profile':<8} {'encode (ms)':>12} {'size (KiB)':>11} {'vs default':>11}")
+    for case, rendered in cases.items():
+        baseline = None
+        for name in available_profiles():
+            profile = get_profile(name)
+            data = encode_image(rendered, profile)
+            if profile.lossless:
+                with Image.open(io.BytesIO(data)) as decoded:
+                    assert decoded.convert("RGBA").tobytes() == rendered.tobytes(), name
+            elapsed = timeit.timeit(
+                lambda p=profile: encode_image(rendered, p), number=iterations
+            )
+            baseline = baseline or len(data)
+            print(
+                f"{case:<6} {name:<8} {elapsed / iterations * 1e3:>12.2f} "
+                f"{len(data) / 1024:>11.1f} {len(data) / baseline:>10.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
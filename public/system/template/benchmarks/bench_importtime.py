@@ -0,0 +1,143 @@
+"""
+Import-time budget for the serverless entry point.
+
+Usage:
+    python benchmarks/bench_importtime.py [module] [--budget-ms N] [--runs N] [--top N]
+
+Imports `module` (default: vercel_app, the Vercel WSGI entry point) in fresh
+interpreters under `python -X importtime`, with the background warm-up disabled so
+only the cold-start critical path is measured. It prints the best run's total and
+the heaviest imports, and exits with status 1 if the total exceeds the budget
+(default 300 ms, or IMPORT_TIME_BUDGET_MS) or if a module that should only load on
+first use (the download pipeline's aiohttp, Pillow, NumPy or certifi) was imported.
+For the web entry points it then scrapes /metrics and /api/stats, which must not
+load those modules or create any of the pipeline's components either.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+
+# Loaded by the first download (or the warm-up thread), never by the import itself.
+DEFERRED_MODULES = ("aiohttp", "PIL", "numpy", "certifi", "bs4")
+
+# Components a stats scrape reports only once a download has created them.
+COMPONENT_MODULES = (
+    "rate_limiter",
+    "metadata_cache",
+    "output_cache",
+    "output_writer",
+    "render_executor",
+    "job_manager",
+    "connection_pool",
+)
+
+SCRAPE_CODE = """
+import sys
+import {module}
+from web_server import app
+client = app.test_client()
+for path in ("/metrics", "/api/stats"):
+    assert client.get(path).status_code == 200, path
+print(" ".join(sorted(sys.modules)))
+"""
+
+
+def measure(module: str) -> Tuple[int, List[Tuple[int, int, str]]]:
+    """
+    Imports `module` in a fresh interpreter ("pass" imports nothing beyond startup).
+
+    Returns:
+        Tuple[int, List[Tuple[int, int, str]]]: The total in microseconds, and the
+        (self, cumulative, name) timing of every module imported.
+    """
+    env = dict(os.environ, WEB_WARM_UP="0", PYTHONPATH=str(SRC_DIR))
+    code = "pass" if module == "pass" else f"import {module}"
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SRC_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    total = 0
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+        if name.strip() == module:
+            total = int(cumulative_us)
+    return total, rows
+
+
+def loaded_after_scrape(module: str) -> List[str]:
+    """
+    Imports `module` in a fresh interpreter and requests the stats routes.
+
+    Returns:
+        List[str]: The deferred and component modules the scrape loaded.
+    """
+    env = dict(os.environ, WEB_WARM_UP="0", PYTHONPATH=str(SRC_DIR))
+    completed = subprocess.run(
+        [sys.executable, "-c", SCRAPE_CODE.format(module=module)],
+        cwd=SRC_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    loaded = set(completed.stdout.split())
+    return [name for name in DEFERRED_MODULES + COMPONENT_MODULES if name in loaded]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("module", nargs="?", default="vercel_app")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=float(os.getenv("IMPORT_TIME_BUDGET_MS", "300")),
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    # The first run also compiles bytecode; keep the fastest of the rest.
+    measure(args.module)
+    total, rows = min((measure(args.module) for _ in range(args.runs)), key=lambda r: r[0])
+
+    print(f"import {args.module}: {total / 1000:.1f} ms (budget {args.budget_ms:.0f} ms)\n")
+    print(f"{'self (ms)':>10} {'cumulative (ms)':>16}  module")
+    for self_us, cumulative_us, name in sorted(rows, key=lambda r: r[0], reverse=True)[: args.top]:
+        print(f"{self_us / 1000:>10.1f} {cumulative_us / 1000:>16.1f}  {name.strip()}")
+
+    # Ignore whatever the interpreter itself loads at startup (site, .pth files).
+    startup = {name.strip() for _, _, name in measure("pass")[1]}
+    imported = {name.strip() for _, _, name in rows} - startup
+    leaked = [name for name in DEFERRED_MODULES if name in imported]
+    failures = []
+    if total / 1000 > args.budget_ms:
+        failures.append(
+            f"import took {total / 1000:.1f} ms, over the {args.budget_ms:.0f} ms budget"
+        )
+    if leaked:
+        failures.append(f"imported at startup instead of on first use: {', '.join(leaked)}")
+    if args.module in ("vercel_app", "web_server"):
+        scraped = [name for name in loaded_after_scrape(args.module) if name not in startup]
+        if scraped:
+            failures.append(f"loaded by a stats scrape: {', '.join(scraped)}")
+    for failure in failures:
+        print(f"\nFAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+End-to-end benchmarks of the download pipeline against the offline Roblox stub.
+
+Usage:
+    python benchmarks/bench_pipeline.py [single|group|web|all] [options]
+
+Scenarios:
+    single  `--requests` asset downloads, `--concurrency` at a time, straight through
+            RobloxAssetDownloader.process_asset.
+    group   One group of `--group-size` assets through GroupDownloadPipeline, the way
+            the CLI downloads a group.
+    web     `--requests` GET /download/<id> requests, `--concurrency` at a time,
+            against web_server running on a local threaded WSGI server.
+
+Every scenario runs in a fresh interpreter with an empty DOWNLOADS_DIR, against the
+stub (see roblox_stub.py) in a process of its own, and uses asset IDs nothing has
+seen before, so nothing is served from a cache. It reports p50/p99 latency per
+asset, throughput, the process's peak RSS and what the stub served. Use the stub
+options (--latency-ms, --throttle-rate, --error-rate...) to model a slow or
+throttling Roblox, and --host-rate / --host-concurrency for the rate limiter's
+limits on the stub's host.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict, fields
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+# pylint: disable-next=wrong-import-position
+from roblox_stub import StubConfig, install_routes, start_in_process  # noqa: E402
+
+SCENARIOS = ("single", "group", "web")
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of `values` (0 if empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb() -> float:
+    """This process's peak resident set size in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+async def run_single(args: argparse.Namespace) -> Tuple[List[float], int, float]:
+    """Download `requests` distinct assets, `concurrency` at a time."""
+    # pylint: disable-next=import-outside-toplevel
+    from roblox_asset_downloader import RobloxAssetDownloader
+
+    downloader = RobloxAssetDownloader()
+    gate = asyncio.Semaphore(args.concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def one(asset_id: int) -> None:
+        nonlocal failures
+        async with gate:
+            started = time.perf_counter()
+            try:
+                result = await downloader.process_asset(str(asset_id))
+            except ValueError:
+                result = None
+            latencies.append(time.perf_counter() - started)
+            failures += result is None
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(args.first_id + index) for index in range(args.requests)))
+    return latencies, failures, time.perf_counter() - started
+
+
+async def run_group(args: argparse.Namespace) -> Tuple[List[float], int, float]:
+    """Download one stub group through the group pipeline."""
+    from group_handler import GroupHandler  # pylint: disable=import-outside-toplevel
+    from group_pipeline import GroupDownloadPipeline  # pylint: disable=import-outside-toplevel
+
+    pipeline = GroupDownloadPipeline(workers=args.concurrency)
+    latencies: List[float] = []
+    process_asset = pipeline.downloader.process_asset
+
+    async def timed(*call_args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return await process_asset(*call_args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    pipeline.downloader.process_asset = timed
+    group_id = str(args.first_id)
+    ids = GroupHandler(pipeline.downloader.api_handler).iter_clothing_ids(group_id)
+    summary = await pipeline.run(ids, group_id)
+    return latencies, len(summary.failed), summary.elapsed
+
+
+def run_web(args: argparse.Namespace) -> Tuple[List[float], int, float]:
+    """Drive GET /download/<id> on a local threaded WSGI server."""
+    import aiohttp  # pylint: disable=import-outside-toplevel
+    from werkzeug.serving import make_server  # pylint: disable=import-outside-toplevel
+
+    import web_server  # pylint: disable=import-outside-toplevel
+
+    server = make_server("127.0.0.1", 0, web_server.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    latencies: List[float] = []
+    failures = 0
+
+    async def drive() -> float:
+        nonlocal failures
+        gate = asyncio.Semaphore(args.concurrency)
+        timeout = aiohttp.ClientTimeout(total=300)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+
+            async def one(asset_id: int) -> None:
+                nonlocal failures
+                async with gate:
+                    started = time.perf_counter()
+                    async with session.get(f"{base_url}/download/{asset_id}") as response:
+                        await response.read()
+                        failures += response.status != 200
+                    latencies.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one(args.first_id + i) for i in range(args.requests)))
+            return time.perf_counter() - started
+
+    try:
+        elapsed = asyncio.run(drive())
+    finally:
+        server.shutdown()
+    return latencies, failures, elapsed
+
+
+def stub_counts(base_url: str) -> Dict[str, int]:
+    """What the stub served, by route and injected failure."""
+    from urllib.request import urlopen  # pylint: disable=import-outside-toplevel
+
+    with urlopen(f"{base_url}/__stats", timeout=10) as response:
+        return json.loads(response.read())
+
+
+def run_child(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run one scenario in this process and return its results."""
+    config = StubConfig(**{f.name: getattr(args, f.name) for f in fields(StubConfig)})
+    stub, base_url = start_in_process(config)
+    try:
+        install_routes(
+            base_url,
+            {
+                "rate": args.host_rate,
+                "burst": args.host_rate,
+                "max_rate": args.host_rate,
+                "concurrency": args.host_concurrency,
+                "max_concurrency": args.host_concurrency,
+            },
+        )
+        if args.scenario == "web":
+            latencies, failures, elapsed = run_web(args)
+        else:
+            runner = run_single if args.scenario == "single" else run_group
+            latencies, failures, elapsed = asyncio.run(runner(args))
+        counts = stub_counts(base_url)
+    finally:
+        stub.terminate()
+
+    return {
+        "scenario": args.scenario,
+        "assets": len(latencies),
+        "failed": failures,
+        "elapsed_s": round(elapsed, 3),
+        "per_second": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "stub": counts,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline end-to-end pipeline benchmarks.")
+    parser.add_argument("scenario", nargs="?", default="all", choices=SCENARIOS + ("all",))
+    parser.add_argument("--requests", type=int, default=200, help="Assets for single/web")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--first-id", type=int, default=0, help="First asset/group ID (default: random)"
+    )
+    parser.add_argument(
+        "--host-rate", type=float, default=1000, help="Rate limit for the stub host"
+    )
+    parser.add_argument("--host-concurrency", type=int, default=64)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON lines")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    for field, value in asdict(StubConfig()).items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=type(value), default=value)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.child:
+        # Quiet the pipeline's per-asset logging; it would dominate the measurement.
+        import logging  # pylint: disable=import-outside-toplevel
+
+        logging.disable(logging.WARNING)
+        print(json.dumps(run_child(args)))
+        return
+
+    if not args.first_id:
+        args.first_id = int(time.time() * 1000) % 10**9 * 3 + 1
+    scenarios = SCENARIOS if args.scenario == "all" else (args.scenario,)
+    forwarded = [arg for arg in sys.argv[1:] if arg not in SCENARIOS + ("all", "--json")]
+    results = []
+    for scenario in scenarios:
+        with tempfile.TemporaryDirectory() as downloads_dir:
+            env = dict(os.environ, DOWNLOADS_DIR=downloads_dir, WEB_WARM_UP="0")
+            completed = subprocess.run(
+                [sys.executable, __file__, scenario, "--child", "--first-id", str(args.first_id)]
+                + forwarded,
+                env=env,
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+        if completed.returncode:
+            sys.stderr.write(completed.stderr)
+            sys.exit(f"Scenario {scenario} failed")
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    if args.json:
+        for result in results:
+            print(json.dumps(result))
+        return
+    print(
+        f"{'scenario':<8} {'assets':>6} {'failed':>6} {'seconds':>8} {'assets/s':>9} "
+        f"{'p50 (ms)':>9} {'p99 (ms)':>9} {'peak RSS (MiB)':>15}"
+    )
+    for r in results:
+        print(
+            f"{r['scenario']:<8} {r['assets']:>6} {r['failed']:>6} {r['elapsed_s']:>8.2f} "
+            f"{r['per_second']:>9.1f} {r['p50_ms']:>9.1f} {r['p99_ms']:>9.1f} "
+            f"{r['peak_rss_mb']:>15.1f}"
+        )
+    for r in results:
+        served = ", ".join(f"{k}={v}" for k, v in sorted(r["stub"].items()))
+        print(f"stub ({r['scenario']}): {served}")
+
+
+if __name__ == "__main__":
+    main()
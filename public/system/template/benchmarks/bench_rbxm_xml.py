@@ -0,0 +1,80 @@
+"""
+Microbenchmark: asset XML extraction with rbxm_xml versus the previous BeautifulSoup path.
+
+Usage:
+    python benchmarks/bench_rbxm_xml.py [iterations]
+
+The BeautifulSoup comparison runs only if beautifulsoup4 is installed; it is no longer a
+runtime dependency of the downloader.
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from rbxm_xml import extract_clothing_content  # noqa: E402  pylint: disable=wrong-import-position
+from utils import validate_clothing_id  # noqa: E402  pylint: disable=wrong-import-position
+
+_HEADER = (
+    '<roblox xmlns:xmime="http://www.w3.org/2005/05/xmlmime" '
+    'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+    'xsi:noNamespaceSchemaLocation="http://www.roblox.com/roblox.xsd" version="4">'
+    "<External>null</External><External>nil</External>"
+)
+
+SAMPLES = {
+    "shirt": _HEADER
+    + '<Item class="Shirt" referent="RBX0"><Properties>'
+    + '<Content name="ShirtTemplate">'
+    + "<url>http://www.roblox.com/asset/?id=1234567890</url></Content>"
+    + '<string name="Name">Shirt</string><BinaryString name="Tags"></BinaryString>'
+    + "</Properties></Item></roblox>",
+    "pants": _HEADER
+    + '<Item class="Pants" referent="RBX0"><Properties>'
+    + '<Content name="PantsTemplate">'
+    + "<url>http://www.roblox.com/asset/?id=2345678901</url></Content>"
+    + '<string name="Name">Pants</string>'
+    + "</Properties></Item></roblox>",
+    "tshirt": _HEADER
+    + '<Item class="ShirtGraphic" referent="RBX0"><Properties>'
+    + '<Content name="Graphic"><url>http://www.roblox.com/asset/?id=3456789012</url></Content>'
+    + '<string name="Name">Shirt Graphic</string>'
+    + "</Properties></Item></roblox>",
+}
+
+
+def bs4_extract(xml: str):
+    """The extraction previously done by RobloxAssetDownloader.fetch_asset."""
+    from bs4 import BeautifulSoup  # pylint: disable=import-outside-toplevel
+
+    soup = BeautifulSoup(xml, "html.parser")
+    return soup.find("content").get("name"), validate_clothing_id(soup.find("url").text)
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    try:
+        import bs4  # noqa: F401  pylint: disable=import-outside-toplevel,unused-import
+
+        have_bs4 = True
+    except ImportError:
+        have_bs4 = False
+        print("beautifulsoup4 not installed; reporting rbxm_xml only.")
+
+    print(f"{'sample':<8} {'rbxm_xml (us)':>14} {'bs4 (us)':>10} {'speedup':>8}")
+    for name, xml in SAMPLES.items():
+        fast = timeit.timeit(lambda x=xml: extract_clothing_content(x), number=iterations)
+        fast_us = fast / iterations * 1e6
+        if have_bs4:
+            assert bs4_extract(xml) == extract_clothing_content(xml), name
+            slow = timeit.timeit(lambda x=xml: bs4_extract(x), number=iterations)
+            slow_us = slow / iterations * 1e6
+            print(f"{name:<8} {fast_us:>14.2f} {slow_us:>10.2f} {slow_us / fast_us:>7.0f}x")
+        else:
+            print(f"{name:<8} {fast_us:>14.2f} {'-':>10} {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+A local stand-in for the Roblox endpoints the downloader talks to, for offline benchmarks.
+
+The stub serves the same paths as the hosts in `constants.ROUTES` (assetdelivery's
+asset XML, image location and batch lookup, catalog search pagination, group info)
+plus CDN routes for asset XML and template images, all from one aiohttp server on
+127.0.0.1. Every route can be slowed down and made to fail:
+
+    latency_ms / jitter_ms  Added to every response (uniformly random jitter).
+    error_rate              Fraction of requests answered with 503.
+    throttle_rate           Fraction of requests answered with 429 (with Retry-After).
+    missing_rate            Fraction of asset IDs that don't exist (404).
+
+Any numeric asset ID exists: ID % 3 picks a shirt, pants or t-shirt. A group's
+catalog lists `group_size` assets whose IDs are derived from the group ID, so every
+group and asset is distinct and never hits the pipeline's caches by accident. The
+catalog answers 400 to page sizes the real endpoint doesn't accept. With
+`template_share` above 1, that many consecutive assets of each kind use one template
+image, like the recolors and re-uploads in a real catalog.
+
+Usage as a script (prints the base URL, serves until interrupted):
+    python benchmarks/roblox_stub.py [--port 8765] [--latency-ms 20] [--throttle-rate 0.05]
+
+From a benchmark, `start_in_process` runs the stub in a separate process (so its CPU
+and memory don't count against the code under test) and `install_routes` points
+`constants.ROUTES` at it.
+"""
+
+import argparse
+import asyncio
+import io
+import multiprocessing
+import random
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from aiohttp import web
+from PIL import Image, ImageDraw
+
+ASSET_XML = (
+    '<roblox xmlns:xmime="http://www.w3.org/2005/05/xmlmime" version="4">'
+    "<External>null</External><External>nil</External>"
+    '<Item class="{item_class}" referent="RBX0"><Properties>'
+    '<Content name="{content_name}">'
+    "<url>http://www.roblox.com/asset/?id={template_id}</url></Content>"
+    '<string name="Name">{item_class}</string><BinaryString name="Tags"></BinaryString>'
+    "</Properties></Item></roblox>"
+)
+ASSET_KINDS = (
+    ("Shirt", "ShirtTemplate"),
+    ("Pants", "PantsTemplate"),
+    ("ShirtGraphic", "Graphic"),
+)
+# Template IDs are offset from asset IDs so the two never collide in caches (and so
+# the batch route can tell them apart); group asset IDs stay well below it.
+TEMPLATE_ID_OFFSET = 10**15
+# Page sizes /v1/search/items/details accepts.
+CATALOG_DETAILS_LIMITS = (10, 28, 30)
+
+
+@dataclass
+class StubConfig:
+    """Latency and failure injection settings for the stub."""
+
+    latency_ms: float = 20.0
+    jitter_ms: float = 5.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    missing_rate: float = 0.0
+    retry_after: float = 0.2
+    group_size: int = 100
+    template_share: int = 1
+    seed: int = 0
+
+
+def _asset_xml(asset_id: int, template_share: int = 1) -> str:
+    """
+    The asset XML of a stub asset: ID % 3 picks a shirt, pants or t-shirt, and
+    `template_share` consecutive assets of a kind share a template.
+    """
+    item_class, content_name = ASSET_KINDS[asset_id % 3]
+    stride = 3 * max(1, template_share)
+    return ASSET_XML.format(
+        item_class=item_class,
+        content_name=content_name,
+        template_id=asset_id - asset_id % stride + asset_id % 3 + TEMPLATE_ID_OFFSET,
+    )
+
+
+def _template_image(size: Tuple[int, int], seed: int) -> bytes:
+    """A PNG like an uploaded clothing template: flat colours plus a noisy patch."""
+    rng = random.Random(seed)
+    image = Image.new("RGBA", size, (rng.randrange(256), rng.randrange(256), 200, 255))
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        colour = (rng.randrange(256), rng.randrange(256), rng.randrange(256), 255)
+        draw.rectangle((x, y, x + rng.randrange(20, 120), y + rng.randrange(20, 120)), fill=colour)
+    noise = Image.frombytes("RGBA", (96, 96), rng.randbytes(96 * 96 * 4))
+    image.paste(noise, (size[0] // 3, size[1] // 3))
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class RobloxStub:
+    """
+    The stub server.
+
+    Attributes:
+        config (StubConfig): Latency and failure injection settings.
+        counts (Counter): Requests served, by route and by injected outcome.
+    """
+
+    def __init__(self, config: Optional[StubConfig] = None) -> None:
+        self.config = config or StubConfig()
+        self.counts: Counter = Counter()
+        self.base_url = ""
+        self._random = random.Random(self.config.seed)
+        self._images = {
+            "clothing": _template_image((585, 559), self.config.seed),
+            "tshirt": _template_image((420, 420), self.config.seed + 1),
+        }
+        self._runner: Optional[web.AppRunner] = None
+
+    def _missing(self, asset_id: int) -> bool:
+        """Whether an asset ID is one of the nonexistent ones (stable per ID)."""
+        return random.Random(asset_id).random() < self.config.missing_rate
+
+    @web.middleware
+    async def _inject(self, request: web.Request, handler) -> web.StreamResponse:
+        """Delay every response and inject 429/503 failures."""
+        config = self.config
+        route = request.match_info.route.name or "unknown"
+        if route == "stats":
+            return await handler(request)
+        self.counts[route] += 1
+        delay = config.latency_ms + self._random.uniform(-config.jitter_ms, config.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        roll = self._random.random()
+        if roll < config.throttle_rate:
+            self.counts["injected_429"] += 1
+            return web.Response(status=429, headers={"Retry-After": str(config.retry_after)})
+        if roll < config.throttle_rate + config.error_rate:
+            self.counts["injected_503"] += 1
+            return web.Response(status=503)
+        return await handler(request)
+
+    async def _asset(self, request: web.Request) -> web.Response:
+        asset_id = int(request.query.get("id", "0") or 0)
+        if not asset_id or self._missing(asset_id):
+            return web.Response(status=404)
+        return web.Response(
+            text=_asset_xml(asset_id, self.config.template_share), content_type="application/xml"
+        )
+
+    async def _image_location(self, request: web.Request) -> web.Response:
+        template_id = request.match_info["asset_id"]
+        return web.json_response(
+            {"location": f"{self.base_url}/cdn/{template_id}", "requestId": template_id}
+        )
+
+    async def _batch(self, request: web.Request) -> web.Response:
+        """
+        Models POST /v1/assets/batch: a list of {"assetId", "requestId"} in, a list of
+        {"requestId", "location"} or {"requestId", "errors"} out, in the same order.
+        Asset IDs resolve to their XML on the CDN, template IDs to their image.
+        """
+        try:
+            items = await request.json()
+        except ValueError:
+            return web.json_response(
+                {"errors": [{"code": 0, "message": "Bad request"}]}, status=400
+            )
+        self.counts["batch_items"] += len(items)
+        results = []
+        for item in items:
+            asset_id = int(item.get("assetId") or 0)
+            result = {"requestId": item.get("requestId")}
+            if asset_id >= TEMPLATE_ID_OFFSET:
+                result["location"] = f"{self.base_url}/cdn/{asset_id}"
+            elif asset_id and not self._missing(asset_id):
+                result["location"] = f"{self.base_url}/cdn/xml/{asset_id}"
+            else:
+                result["errors"] = [
+                    {"code": 404, "message": "Asset is not approved for the requester"}
+                ]
+            results.append(result)
+        return web.json_response(results)
+
+    async def _cdn_xml(self, request: web.Request) -> web.Response:
+        asset_id = int(request.match_info["asset_id"])
+        return web.Response(
+            text=_asset_xml(asset_id, self.config.template_share),
+            content_type="application/octet-stream",
+        )
+
+    async def _cdn(self, request: web.Request) -> web.Response:
+        template_id = int(request.match_info["template_id"])
+        kind = "tshirt" if (template_id - TEMPLATE_ID_OFFSET) % 3 == 2 else "clothing"
+        return web.Response(body=self._images[kind], content_type="image/png")
+
+    async def _catalog(self, request: web.Request) -> web.Response:
+        group_id = int(request.query.get("CreatorTargetId", "0") or 0)
+        limit = int(request.query.get("limit", "10"))
+        if limit not in CATALOG_DETAILS_LIMITS:
+            # Like the real endpoint, which only takes a few fixed page sizes.
+            return web.json_response(
+                {"errors": [{"code": 0, "message": "Invalid limit"}]}, status=400
+            )
+        cursor = int(request.query.get("cursor", "0") or 0)
+        end = min(cursor + limit, self.config.group_size)
+        data = [
+            {"id": group_id * 100000 + index, "itemType": "Asset"} for index in range(cursor, end)
+        ]
+        return web.json_response(
+            {
+                "data": data,
+                "previousPageCursor": str(cursor) if cursor else None,
+                "nextPageCursor": str(end) if end < self.config.group_size else None,
+            }
+        )
+
+    async def _group_info(self, request: web.Request) -> web.Response:
+        group_id = int(request.match_info["group_id"])
+        return web.json_response(
+            {
+                "id": group_id,
+                "name": f"Benchmark Group {group_id}",
+                "owner": {"userId": 1, "username": "stub", "displayName": "Stub"},
+                "memberCount": 1000,
+            }
+        )
+
+    async def _stats(self, request: web.Request) -> web.Response:
+        return web.json_response(dict(self.counts))
+
+    def app(self) -> web.Application:
+        """Builds the aiohttp application."""
+        app = web.Application(middlewares=[self._inject])
+        app.router.add_get("/v1/asset/", self._asset, name="asset")
+        app.router.add_get("/v1/assetid/{asset_id}", self._image_location, name="image_location")
+        app.router.add_get("/v1/search/items/details", self._catalog, name="catalog")
+        app.router.add_get("/v1/communities/{group_id}", self._group_info, name="group_info")
+        app.router.add_post("/v1/assets/batch", self._batch, name="batch")
+        app.router.add_get("/cdn/xml/{asset_id}", self._cdn_xml, name="cdn_xml")
+        app.router.add_get("/cdn/{template_id}", self._cdn, name="cdn")
+        # Not counted or delayed: the benchmark reads it after a run.
+        app.router.add_get("/__stats", self._stats, name="stats")
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Starts serving.
+
+        Returns:
+            str: The base URL, e.g. "http://127.0.0.1:8765".
+        """
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]  # pylint: disable=protected-access
+        self.base_url = f"http://{host}:{bound_port}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        """Stops serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+def stub_routes(base_url: str, routes: Dict[str, str]) -> Dict[str, str]:
+    """
+    Rewrites route templates to point at the stub, keeping their paths and queries.
+
+    Args:
+        base_url (str): The stub's base URL.
+        routes (Dict[str, str]): `constants.ROUTES`.
+
+    Returns:
+        Dict[str, str]: The same routes on the stub's host.
+    """
+    rewritten = {}
+    for name, template in routes.items():
+        parts = urlsplit(template)
+        rewritten[name] = f"{base_url}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+    return rewritten
+
+
+def install_routes(base_url: str, host_limits: Optional[Dict[str, float]] = None) -> None:
+    """
+    Points `constants.ROUTES` at the stub. Call before the pipeline builds any URL.
+
+    The rate limiter sees the stub as a single host ("127.0.0.1") instead of Roblox's
+    separately limited ones, so it gets limits of its own.
+
+    Args:
+        base_url (str): The stub's base URL.
+        host_limits (Optional[Dict[str, float]]): Rate limiter settings for the stub's
+            host (see `constants.HOST_RATE_LIMITS`); the "default" entry if omitted.
+    """
+    import constants  # pylint: disable=import-outside-toplevel
+
+    constants.ROUTES.update(stub_routes(base_url, constants.ROUTES))
+    if host_limits:
+        constants.HOST_RATE_LIMITS[urlsplit(base_url).hostname] = dict(host_limits)
+
+
+def _serve(config: StubConfig, port: int, ready) -> None:
+    """Process target: run the stub until terminated."""
+
+    async def main() -> None:
+        stub = RobloxStub(config)
+        ready.send(await stub.start(port=port))
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+def start_in_process(
+    config: Optional[StubConfig] = None, port: int = 0
+) -> Tuple[multiprocessing.Process, str]:
+    """
+    Runs the stub in a separate process.
+
+    Returns:
+        Tuple[multiprocessing.Process, str]: The process (terminate it when done) and
+        the stub's base URL.
+    """
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.get_context("spawn").Process(
+        target=_serve, args=(config or StubConfig(), port, sender), daemon=True
+    )
+    process.start()
+    if not receiver.poll(30):
+        process.terminate()
+        raise RuntimeError("The Roblox stub didn't start")
+    return process, receiver.recv()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the offline Roblox stub.")
+    parser.add_argument("--port", type=int, default=8765)
+    for field, value in asdict(StubConfig()).items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=type(value), default=value)
+    args = vars(parser.parse_args())
+    port = args.pop("port")
+
+    async def serve() -> None:
+        stub = RobloxStub(StubConfig(**args))
+        print(f"Roblox stub listening on {await stub.start(port=port)}", flush=True)
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -9,21 +9,23 @@ Methods:
     __init__: Initializes the APIHandler instance.
     _is_json_response: Checks if the response content type is JSON.
     _handle_response_status: Handles the response status and logs any errors.
-    _get: Sends a GET request to the given URL with enhanced error handling and retry logic.
-    get_session: Gets or creates an aiohttp.ClientSession instance.
+    _request: Sends a request to the given URL, retrying according to the RetryPolicy.
+    get_session: Gets the shared aiohttp.ClientSession from the connection pool.
     fetch_json: Fetches JSON data from the given URL using aiohttp with a retry mechanism.
     fetch_text: Fetches text data from the given URL using aiohttp with a retry mechanism.
-    fetch_image: Fetches image data from the given URL.
+    fetch_bytes: Fetches the undecoded response body from the given URL.
+    fetch_image: Fetches image data from the given URL with a retry mechanism.
+    post_json: Posts a JSON body to the given URL and returns the decoded JSON response.
+    iter_paginated_data: Yields paginated data from the given URL as each page arrives.
     fetch_paginated_data: Fetches paginated data from the given URL,
                           handling pagination and returning all results.
-    close: Closes the aiohttp.ClientSession if it is open.
-    
+    close: Releases the handler; the shared connection pool stays open.
+
 
 api_handler.py
 """
 
 import asyncio
-import ssl
 import time
 import os
 from pathlib import Path
@@ -34,23 +36,26 @@ try:
         load_dotenv(dotenv_path=env_path)
 except ImportError:
     pass  # python-dotenv not installed; skip loading .env
-from logging import Logger
-from typing import Any, Callable, Dict, List, Optional, Union
+from logging import DEBUG, Logger
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
+from urllib.parse import urlsplit
 
 import aiohttp
-import certifi
 
 import constants
+import json_codec
+from connection_pool import ConnectionPool, get_connection_pool, get_ssl_context
 from custom_logger import setup_logger
+from metrics import HTTP_REQUEST_SECONDS, HTTP_RETRIES, MetricsRegistry, get_metrics
+from rate_limiter import RateLimiter, get_rate_limiter
+from retry_policy import PermanentHTTPError, RetryClass, RetryPolicy
 
-ssl_context = ssl.create_default_context(cafile=certifi.where())
+# Set up the logger for this module
+logger = setup_logger(__name__)
 
 STATUS_MAP: Dict[int, Union[Callable[[Any], str], str]] = {
     200: lambda data: f"Request to {data['url']} using {data['method']} was successful",
-    429: lambda data: (
-        f"Request to {data['url']} using {data['method']} was rate limited. "
-        f"Retrying in {data['potential_wait_time']} seconds..."
-    ),
+    429: lambda data: f"Request to {data['url']} using {data['method']} was rate limited",
     500: lambda data: (
         f"Request to {data['url']} using {data['method']} failed due to a server error"
     ),
@@ -75,10 +80,33 @@ class APIHandler:
     It includes retry mechanisms and functionality for handling paginated data fetching.
     """
 
-    def __init__(self):
-        """Initializes the APIHandler instance."""
-        self.session: Optional[aiohttp.ClientSession] = None
-        self.logger: Logger = setup_logger(__name__)
+    def __init__(
+        self,
+        pool: Optional[ConnectionPool] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        json_loads: Optional[Callable[[bytes], Any]] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        """Initializes the APIHandler instance.
+
+        Args:
+            pool (Optional[ConnectionPool]): The connection pool to borrow sessions from.
+                Defaults to the process-wide shared pool.
+            retry_policy (Optional[RetryPolicy]): How failed requests are retried.
+            rate_limiter (Optional[RateLimiter]): Per-host pacing and concurrency control.
+                Defaults to the process-wide shared limiter.
+            json_loads (Optional[Callable[[bytes], Any]]): JSON decoder for response
+                bodies. Defaults to `json_codec.loads` (orjson when installed).
+            metrics (Optional[MetricsRegistry]): Where request timings and retries are
+                recorded. Defaults to the process-wide registry.
+        """
+        self.pool: ConnectionPool = pool or get_connection_pool()
+        self.retry_policy: RetryPolicy = retry_policy or RetryPolicy()
+        self.rate_limiter: RateLimiter = rate_limiter or get_rate_limiter()
+        self.json_loads: Callable[[bytes], Any] = json_loads or json_codec.loads
+        self.metrics: MetricsRegistry = metrics or get_metrics()
+        self.logger: Logger = logger
 
         # Default headers to appear like a browser; some Roblox endpoints
         # may reject requests without a common User-Agent.
@@ -90,6 +118,9 @@ class APIHandler:
         roblox_cookie = os.getenv("ROBLOSECURITY")
         if roblox_cookie:
             self._default_headers["Cookie"] = f".ROBLOSECURITY={roblox_cookie}"
+        # Whether requests carry a cookie, which changes what a 403 means.
+        self.authenticated: bool = bool(roblox_cookie)
+
     async def _is_json_response(self, response: aiohttp.ClientResponse) -> bool:
         """Check if the response content type is JSON.
 
@@ -106,6 +137,10 @@ class APIHandler:
     ) -> Dict[str, Any]:
         """Handle the response status and log any errors.
 
+        Waiting on rate limits is left to the retry policy in `_request`, so this method
+        never sleeps. The per-request records are DEBUG level (and subject to
+        LOG_DEBUG_SAMPLE_RATE) and are only formatted when DEBUG is enabled.
+
         Args:
             response (aiohttp.ClientResponse): The response object.
             attempt (int): The current attempt number for the request.
@@ -119,15 +154,8 @@ class APIHandler:
             "status": response.status,
             "current_attempt": attempt,
             "time": time.time(),
-            "potential_wait_time": constants.RATE_LIMIT_SLEEP**attempt,
         }
-        if response.status in STATUS_MAP:
-            status_handler = STATUS_MAP[response.status]
-            log_message = (
-                status_handler(request_data) if callable(status_handler) else status_handler
-            )
-            self.logger.debug(log_message)
-        else:
+        if response.status not in STATUS_MAP:
             # Log an error for statuses that are not in STATUS_MAP
             self.logger.error(
                 "Request to %s using %s failed with status %s",
@@ -135,163 +163,341 @@ class APIHandler:
                 response.method,
                 response.status,
             )
-
-        if response.status == 429:
-            await asyncio.sleep(request_data["potential_wait_time"])
-        self.logger.info(request_data)
+        elif self.logger.isEnabledFor(DEBUG):
+            status_handler = STATUS_MAP[response.status]
+            log_message = (
+                status_handler(request_data) if callable(status_handler) else status_handler
+            )
+            self.logger.debug(log_message)
+            self.logger.debug("Request: %s", request_data)
         return request_data
 
-    async def _get(
+    async def _request(
         self,
         session: aiohttp.ClientSession,
         url: str,
         params: Optional[Dict[str, str]] = None,
-        max_retries: int = 5,
+        max_retries: Optional[int] = None,
+        raise_permanent: bool = False,
+        include_headers: bool = False,
+        method: str = "GET",
+        json_body: Any = None,
     ) -> Optional[Dict[str, Any]]:
-        """Send a GET request to the given URL with enhanced error handling and retry logic.
+        """Send a request to the given URL, retrying according to the retry policy.
+
+        Only requests that don't change anything (GETs, and lookups like the batch
+        asset API that happen to be POSTs) may be sent: failed attempts are repeated.
+
+        Permanent failures (e.g. 400/403/404) return immediately, transient failures
+        are retried with jittered backoff, and 429 responses honour `Retry-After`.
+        The whole call, retries included, is bounded by the policy's deadline. Each
+        attempt is timed by host and status ("error" or "timeout" if no response
+        arrived), and each retry is counted by reason.
 
         Args:
             session (aiohttp.ClientSession): The session to use for the request.
-            url (str): The URL to send the GET request to.
+            url (str): The URL to send the request to.
             params (Optional[Dict[str, str]]): Optional query parameters for the request.
-            max_retries (int): Maximum number of retry attempts.
+            max_retries (Optional[int]): Maximum number of attempts; defaults to the policy's.
+            raise_permanent (bool): If True, raise PermanentHTTPError on a permanent
+                                    failure instead of returning None.
+            include_headers (bool): If True, copy the response headers into "headers".
+            method (str): The HTTP method.
+            json_body (Any): A body to send as JSON, if any.
 
         Returns:
-            Optional[Dict[str, Any]]: A dictionary containing the response data,
-                                     or None if the request fails.
+            Optional[Dict[str, Any]]: The status, URL, content type, charset and raw
+                                     "body" bytes, or None if the request fails.
+
+        Raises:
+            PermanentHTTPError: On a permanent failure, when `raise_permanent` is set.
         """
-        failed_attempts = []
-        timeout = aiohttp.ClientTimeout(total=30)  # Adjust timeout as needed
+        policy = self.retry_policy
+        attempts = max_retries or policy.max_retries
+        deadline_at = policy.start()
+        host = urlsplit(url).hostname or ""
+
+        for attempt in range(attempts):
+            remaining = policy.remaining(deadline_at)
+            if remaining <= 0:
+                break
+            timeout = aiohttp.ClientTimeout(total=min(constants.REQUEST_TIMEOUT, remaining))
+            retry_class = RetryClass.RETRYABLE
+            retry_after: Optional[str] = None
+            retry_reason: Optional[str] = None
+            # The rate limiter's wait is timed too: the request spent it waiting.
+            timer = self.metrics.time(HTTP_REQUEST_SECONDS, host=host)
 
-        for attempt in range(max_retries):
             try:
-                # Merge default headers with session-level headers
-                hdrs = dict(self._default_headers)
-                # session.get will use session headers as well; explicit is fine
-                async with session.get(
-                    url, params=params, ssl=ssl_context, timeout=timeout, headers=hdrs
-                ) as response:
-                    status_response = await self._handle_response_status(response, attempt)
-
-                    # Read body once and decide how to expose it
-                    content_type = response.headers.get("Content-Type", "")
-                    body_text = await response.text()
-                    body_json = None
-                    if "application/json" in content_type:
-                        try:
-                            # Try to parse JSON safely
-                            body_json = await response.json()
-                        except Exception:
-                            body_json = None
-
-                    if response.status != 200:
-                        # Include the body in debug logs for easier troubleshooting
-                        self.logger.debug("Non-200 body from %s: %s", url, body_text)
-                        failed_attempts.append(status_response)
-                        # Backoff before retrying
-                        wait_time = constants.RATE_LIMIT_SLEEP * (2 ** attempt)
-                        await asyncio.sleep(wait_time)
-                        continue
-
-                    return {
-                        "status": response.status,
-                        "headers": dict(response.headers),
-                        "text": body_text,
-                        "json": body_json,
-                        "url": str(response.url),
-                    }
+                async with timer, self.rate_limiter.limit(url) as permit:
+                    async with session.request(
+                        method,
+                        url,
+                        params=params,
+                        json=json_body,
+                        ssl=get_ssl_context(),
+                        timeout=timeout,
+                        headers=self._default_headers,
+                    ) as response:
+                        permit.record(response.status)
+                        timer.set(status=response.status)
+                        await self._handle_response_status(response, attempt)
+                        retry_class = policy.classify(response.status)
+
+                        if retry_class is RetryClass.SUCCESS:
+                            # Read the body bytes once; callers decode only what they need.
+                            response_data: Dict[str, Any] = {
+                                "status": response.status,
+                                "url": url,
+                                "content_type": response.content_type,
+                                "charset": response.charset,
+                                "body": await response.read(),
+                            }
+                            if include_headers:
+                                response_data["headers"] = dict(response.headers)
+                            return response_data
+
+                        if self.logger.isEnabledFor(DEBUG):
+                            # Include the body in debug logs for easier troubleshooting
+                            self.logger.debug(
+                                "Non-success body from %s: %s",
+                                url,
+                                await response.text(errors="replace"),
+                            )
+                        if retry_class is RetryClass.PERMANENT:
+                            self.logger.warning(
+                                "Request to %s failed with status %s; not retrying.",
+                                url,
+                                response.status,
+                            )
+                            if raise_permanent:
+                                raise PermanentHTTPError(url, response.status)
+                            return None
+                        retry_after = response.headers.get("Retry-After")
             except (
                 aiohttp.ClientConnectionError,
                 aiohttp.ServerDisconnectedError,
                 aiohttp.ClientPayloadError,
             ) as e:
-                wait_time = constants.RATE_LIMIT_SLEEP * (2 ** attempt)
+                retry_reason = "network"
                 self.logger.error(
-                    "Network error occurred while sending GET request to %s: %s. "
-                    "Retrying in %s seconds...",
-                    url,
-                    e,
-                    wait_time,
+                    "Network error occurred while sending %s request to %s: %s", method, url, e
                 )
-                await asyncio.sleep(wait_time)
-
             except asyncio.TimeoutError:
+                retry_reason = "timeout"
                 self.logger.warning(
-                    "Request to %s timed out. Attempt %d/%d", url, attempt + 1, max_retries
+                    "Request to %s timed out. Attempt %d/%d", url, attempt + 1, attempts
                 )
 
+            if attempt + 1 >= attempts:
+                break
+            wait_time = policy.delay_for(retry_class, attempt, retry_after)
+            if wait_time >= policy.remaining(deadline_at):
+                self.logger.error(
+                    "Retrying %s in %.2f seconds would exceed the request deadline.",
+                    url,
+                    wait_time,
+                )
+                return None
+            self.metrics.inc(
+                HTTP_RETRIES,
+                host=host,
+                reason=retry_reason or retry_class.name.lower(),
+            )
+            self.logger.info("Retrying %s in %.2f seconds...", url, wait_time)
+            await asyncio.sleep(wait_time)
+
         self.logger.error("Exceeded retries. Failed to fetch data from %s.", url)
         return None
 
     async def get_session(self) -> aiohttp.ClientSession:
-        """Get or create an aiohttp.ClientSession instance.
+        """Get the shared aiohttp.ClientSession from the connection pool.
 
         Returns:
-            aiohttp.ClientSession: An instance of aiohttp.ClientSession.
+            aiohttp.ClientSession: The pooled session for the running event loop.
         """
-        if self.session is None or self.session.closed:
-            # Provide some sensible defaults; do not use trust_env in case local
-            # environment proxies interfere with requests.
-            self.session = aiohttp.ClientSession(headers=self._default_headers)
-        return self.session
+        return await self.pool.get_session()
 
     async def fetch_json(
-        self, url: str, params: Optional[Dict[str, str]] = None, retries: int = 5
+        self,
+        url: str,
+        params: Optional[Dict[str, str]] = None,
+        retries: Optional[int] = None,
+        raise_permanent: bool = False,
     ) -> Union[dict, None]:
         """Fetch JSON data from the given URL using aiohttp with a retry mechanism.
 
         Args:
             url (str): The URL to fetch JSON data from.
             params (Optional[Dict[str, str]]): Optional query parameters for the request.
-            retries (int): Number of retry attempts.
+            retries (Optional[int]): Number of attempts; defaults to the retry policy's.
+            raise_permanent (bool): If True, raise PermanentHTTPError on a permanent
+                                    failure (e.g. 404) instead of returning None.
 
         Returns:
             Union[dict, None]: The JSON data as a dictionary, or None if an error occurs.
         """
         session = await self.get_session()
-        response_data = await self._get(session, url, params, retries)
-        if not response_data or not response_data.get("json"):
+        response_data = await self._request(
+            session, url, params, retries, raise_permanent=raise_permanent
+        )
+        if not response_data or "json" not in response_data["content_type"]:
+            return None
+
+        try:
+            json_data = self.json_loads(response_data["body"])
+        except ValueError:
+            self.logger.error("Invalid JSON received from %s", url)
+            return None
+        if not json_data:
             return None
 
         self.logger.debug("Successfully fetched JSON from %s", url)
-        return response_data["json"]
+        return json_data
 
-    async def fetch_text(self, url: str, retries: int = 5) -> Optional[str]:
+    async def fetch_text(
+        self, url: str, retries: Optional[int] = None, raise_permanent: bool = False
+    ) -> Optional[str]:
         """Fetch text data from the given URL using aiohttp with a retry mechanism.
 
         Args:
             url (str): The URL to fetch text data from.
-            retries (int): Number of retry attempts.
+            retries (Optional[int]): Number of attempts; defaults to the retry policy's.
+            raise_permanent (bool): If True, raise PermanentHTTPError on a permanent
+                                    failure (e.g. 404) instead of returning None.
 
         Returns:
             Optional[str]: The text data as a string, or None if an error occurs.
         """
         session = await self.get_session()
-        response_data = await self._get(session, url, max_retries=retries)
-        if not response_data or not response_data.get("text"):
+        response_data = await self._request(
+            session, url, max_retries=retries, raise_permanent=raise_permanent
+        )
+        if not response_data or not response_data["body"]:
             return None
 
         self.logger.debug("Successfully fetched text from %s", url)
-        return response_data["text"]
+        return response_data["body"].decode(response_data["charset"] or "utf-8", "replace")
 
-    async def fetch_image(self, url: str) -> Optional[bytes]:
+    async def fetch_bytes(
+        self, url: str, retries: Optional[int] = None, raise_permanent: bool = False
+    ) -> Optional[bytes]:
+        """Fetch the raw response body from the given URL with a retry mechanism.
+
+        Args:
+            url (str): The URL to fetch.
+            retries (Optional[int]): Number of attempts; defaults to the retry policy's.
+            raise_permanent (bool): If True, raise PermanentHTTPError on a permanent
+                                    failure (e.g. 404) instead of returning None.
+
+        Returns:
+            Optional[bytes]: The undecoded body, or None if an error occurs.
+        """
         session = await self.get_session()
-        timeout = aiohttp.ClientTimeout(total=30)  # Adjust as needed
+        response_data = await self._request(
+            session, url, max_retries=retries, raise_permanent=raise_permanent
+        )
+        if not response_data or not response_data["body"]:
+            return None
+
+        self.logger.debug("Successfully fetched %d bytes from %s", len(response_data["body"]), url)
+        return response_data["body"]
+
+    async def fetch_image(self, url: str, retries: Optional[int] = None) -> Optional[bytes]:
+        """Fetch raw image bytes from the given URL using aiohttp with a retry mechanism.
+
+        Args:
+            url (str): The URL to fetch the image from.
+            retries (Optional[int]): Number of attempts; defaults to the retry policy's.
+
+        Returns:
+            Optional[bytes]: The image bytes, or None if an error occurs.
+        """
+        image_data = await self.fetch_bytes(url, retries)
+        if not image_data:
+            self.logger.error("Failed to fetch image from %s", url)
+        return image_data
+
+    async def post_json(
+        self, url: str, payload: Any, retries: Optional[int] = None
+    ) -> Optional[Any]:
+        """Post a JSON body to the given URL and decode the JSON response.
+
+        Only for lookups that change nothing on the server, since failures are retried.
+
+        Args:
+            url (str): The URL to post to.
+            payload (Any): The JSON-serialisable request body.
+            retries (Optional[int]): Number of attempts; defaults to the retry policy's.
+
+        Returns:
+            Optional[Any]: The decoded JSON (a dict or a list), or None if an error occurs.
+        """
+        session = await self.get_session()
+        response_data = await self._request(
+            session, url, max_retries=retries, method="POST", json_body=payload
+        )
+        if not response_data or "json" not in response_data["content_type"]:
+            return None
+
         try:
-            async with session.get(url, ssl=ssl_context, timeout=timeout) as response:
-                if response.status != 200:
-                    self.logger.error("Failed to fetch image from %s. Status: %s", url, response.status)
-                    return None
-                image_data = await response.read()
-                self.logger.debug("Successfully fetched image from %s", url)
-                return image_data
-        except Exception as e:
-            self.logger.error("Error fetching image from %s: %s", url, str(e))
+            return self.json_loads(response_data["body"])
+        except ValueError:
+            self.logger.error("Invalid JSON received from %s", url)
             return None
 
+    async def iter_paginated_data(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        limit: int = 10,
+        retries: Optional[int] = None,
+    ) -> AsyncIterator[dict]:
+        """Yield items from a cursor-paginated endpoint as each page arrives.
+
+        The next page is requested as soon as the current one is received, so the
+        fetch overlaps with the caller consuming the current page's items.
+
+        Args:
+            url (str): The URL to fetch data from.
+            params (Optional[dict]): Query parameters for the request; not modified.
+            limit (int): The number of items to fetch per page.
+            retries (Optional[int]): Number of attempts; defaults to the retry policy's.
+
+        Yields:
+            dict: Each item of each page's `data` list, in order.
+        """
+        page_params = dict(params or {})
+        page_params["limit"] = str(limit)
+        total = 0
+
+        next_page: Optional[asyncio.Task] = asyncio.create_task(
+            self.fetch_json(url, dict(page_params), retries)
+        )
+        try:
+            while next_page is not None:
+                response = await next_page
+                next_page = None
+                if not response or "data" not in response:
+                    break
+
+                page_cursor = response.get("nextPageCursor")
+                if page_cursor:
+                    page_params["cursor"] = page_cursor
+                    next_page = asyncio.create_task(
+                        self.fetch_json(url, dict(page_params), retries)
+                    )
+
+                for item in response["data"]:
+                    total += 1
+                    yield item
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+            self.logger.debug("Fetched a total of %s items from %s", total, url)
 
     async def fetch_paginated_data(
-        self, url: str, params: dict, limit: int = 10, retries: int = 5
+        self, url: str, params: dict, limit: int = 10, retries: Optional[int] = None
     ) -> List[dict]:
         """Fetch paginated data from the given URL, handling pagination and returning all results.
 
@@ -299,33 +505,18 @@ class APIHandler:
             url (str): The URL to fetch data from.
             params (dict): Query parameters for the request.
             limit (int): The number of items to fetch per page.
-            retries (int): Number of retry attempts.
+            retries (Optional[int]): Number of attempts; defaults to the retry policy's.
 
         Returns:
             List[dict]: A list of dictionaries containing the fetched data.
         """
-        all_data: List[dict] = []
-        params["limit"] = str(limit)
-        page_cursor = None
-
-        while True:
-            if page_cursor:
-                params["cursor"] = page_cursor
-
-            response = await self.fetch_json(url, params, retries)
-            if not response or "data" not in response:
-                break
-
-            all_data.extend(response["data"])
-            page_cursor = response.get("nextPageCursor")
-
-            if not page_cursor:
-                break
-
-        self.logger.debug("Fetched a total of %s items from %s", len(all_data), url)
-        return all_data
+        return [item async for item in self.iter_paginated_data(url, params, limit, retries)]
 
     async def close(self) -> None:
-        """Closes the aiohttp.ClientSession if it is open."""
-        if self.session and not self.session.closed:
-            await self.session.close()
+        """Release the handler.
+
+        The session belongs to the shared connection pool and is left open so other
+        handlers keep reusing its warm connections. Use
+        `connection_pool.shutdown_connection_pool` when the application exits.
+        """
+        self.logger.debug("APIHandler released; pooled session left open.")
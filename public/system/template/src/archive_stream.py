@@ -0,0 +1,159 @@
+"""
+This module streams a group's rendered clothing to an HTTP client as one ZIP archive.
+
+The archive is produced while the group is downloaded: GroupDownloadPipeline runs on
+the web server's background event loop and hands each rendered asset to a small
+bounded queue, and the WSGI response iterator takes them off the queue and writes
+them to a ZIP file object whose output goes straight to the client. No copy of the
+whole archive exists in memory or on disk, and when the client reads slowly the
+queue fills and the pipeline waits, so memory stays bounded whatever the group's
+size.
+
+Images are stored without recompression (PNG, WebP and AVIF are already
+compressed). A `manifest.json` entry at the end lists which assets succeeded and
+which failed, and why.
+
+Classes:
+    GroupArchiveStream: Iterates over the bytes of a group's ZIP archive.
+
+archive_stream.py
+"""
+
+import asyncio
+import json
+import zipfile
+from typing import Iterator, List, Optional, Union
+
+import constants
+from api_handler import APIHandler
+from background_loop import BackgroundLoop, get_background_loop
+from custom_logger import setup_logger
+from group_handler import GroupHandler
+from group_pipeline import GroupDownloadPipeline, GroupDownloadSummary
+from rendered_asset import RenderedAsset
+from utils import env_int
+
+# Set up the logger for this module
+logger = setup_logger(__name__)
+
+QueueItem = Union[RenderedAsset, GroupDownloadSummary, BaseException]
+
+
+class _ChunkSink:
+    """A write-only, unseekable file object collecting what ZipFile writes."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        """Collect one write."""
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        """Nothing to flush; chunks are handed out by `drain`."""
+
+    def drain(self) -> bytes:
+        """Return and forget everything written so far."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class GroupArchiveStream:
+    """
+    Iterates over the bytes of a ZIP archive of a group's rendered clothing.
+
+    Call `start` first; it waits for the first asset so an empty or unknown group
+    can be reported before any response is sent.
+
+    Attributes:
+        group_id (str): The Roblox group.
+        profile (Optional[str]): The encode profile the images are saved with.
+        queue_size (int): Rendered assets buffered ahead of the client.
+    """
+
+    def __init__(
+        self,
+        group_id: str,
+        profile: Optional[str] = None,
+        queue_size: Optional[int] = None,
+        loop: Optional[BackgroundLoop] = None,
+    ) -> None:
+        self.group_id = group_id
+        self.profile = profile
+        self.queue_size = queue_size or env_int(
+            "ARCHIVE_QUEUE_SIZE", constants.ARCHIVE_QUEUE_SIZE
+        )
+        self._loop = loop or get_background_loop()
+        self._queue: Optional["asyncio.Queue[QueueItem]"] = None
+        self._producer = None
+        self._first: Optional[QueueItem] = None
+
+    def start(self) -> bool:
+        """
+        Starts downloading the group and waits for the first result.
+
+        Returns:
+            bool: False if the group has no clothing (nothing to stream).
+
+        Raises:
+            Exception: Whatever stopped the group from being downloaded.
+        """
+        self._queue = self._loop.run(self._create_queue())
+        self._producer = self._loop.submit(self._produce())
+        self._first = self._next()
+        if isinstance(self._first, BaseException):
+            raise self._first
+        return not (isinstance(self._first, GroupDownloadSummary) and not self._first.total)
+
+    async def _create_queue(self) -> "asyncio.Queue[QueueItem]":
+        """Create the queue on the background loop, which owns it."""
+        return asyncio.Queue(maxsize=self.queue_size)
+
+    async def _produce(self) -> None:
+        """Download the group, queueing each rendered asset and then the summary."""
+        api_handler = APIHandler()
+        pipeline = GroupDownloadPipeline(
+            api_handler, profile=self.profile, on_asset=self._queue.put
+        )
+        try:
+            summary = await pipeline.run(
+                GroupHandler(api_handler).iter_clothing_ids(self.group_id), self.group_id
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            await self._queue.put(e)
+            return
+        await self._queue.put(summary)
+
+    def _next(self) -> QueueItem:
+        """Wait for the next queued item."""
+        return self._loop.run(self._queue.get())
+
+    def __iter__(self) -> Iterator[bytes]:
+        sink = _ChunkSink()
+        item, self._first = self._first, None
+        try:
+            # Stored entries: images are already compressed.
+            with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as archive:
+                while isinstance(item, RenderedAsset):
+                    archive.writestr(item.filename, item.data)
+                    yield sink.drain()
+                    item = self._next()
+                if isinstance(item, BaseException):
+                    # The response has already started; the truncated archive tells
+                    # the client something went wrong.
+                    raise item
+                archive.writestr(
+                    "manifest.json", json.dumps(item.as_dict(), indent=2).encode("utf-8")
+                )
+            yield sink.drain()
+            logger.info("Streamed archive for group %s: %s", self.group_id, item.format())
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Stops the download, e.g. when the client disconnects."""
+        if self._producer is not None and not self._producer.done():
+            self._producer.cancel()
+            logger.info("Archive stream for group %s stopped early.", self.group_id)
@@ -3,15 +3,16 @@ This module contains the asset type class and its implementations.
 """
 
 import re
-from abc import ABC
-from pathlib import Path
+from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Type
 
 from PIL import Image
 
 import constants
+from compositor import get_compositor
 from custom_logger import setup_logger
 from file_handler import FileHandler
+from template_registry import LANCZOS, get_template_registry
 
 # Set up the logger for this module
 logger = setup_logger(__name__)
@@ -49,30 +50,38 @@ class AssetType(ABC):
         self.file_handler.save_image(self.asset_image, f"{self.asset_id}.png")
         logger.info("Successfully saved asset image for asset ID: %s", self.asset_id)
 
+    @abstractmethod
+    def render(self) -> Optional[Image.Image]:
+        """
+        Composites the asset image onto its template. Synchronous and CPU-bound, so
+        it can run in a worker thread or process.
+
+        Returns:
+            Optional[Image.Image]: The rendered image, or None if it can't be rendered.
+        """
+
+    async def overlay_image(self) -> Optional[Image.Image]:
+        """
+        Composites the asset image onto its template.
+
+        Returns:
+            Optional[Image.Image]: The rendered image, or None if it can't be rendered.
+        """
+        return self.render()
+
     def get_overlay_template(self) -> Optional[Image.Image]:
         """
-        Gets the overlay template PNG from the assets folder, based on the overlay type.
+        Gets the overlay template from the template registry, based on the overlay type.
 
         Returns:
-            Optional[Image.Image]: The overlay image if found, otherwise None.
+            Optional[Image.Image]: The shared, read-only overlay image if found,
+                                   otherwise None.
         """
         if not self.overlay_type:
             logger.warning("Overlay type not defined for asset ID: %s", self.asset_id)
             return None
 
-        template_filename = constants.CLOTHING_TEMPLATES.get(self.overlay_type.capitalize())
-        if not template_filename:
-            logger.error("No overlay template found for type: %s", self.overlay_type)
-            return None
-
-        overlay_path = Path("src", "assets", template_filename)
-
-        if overlay_path.exists():
-            logger.debug("Loading overlay template from: %s", overlay_path)
-            return Image.open(overlay_path)
-
-        logger.error("Overlay template file not found at: %s", overlay_path)
-        return None
+        return get_template_registry().get(self.overlay_type)
 
 
 class TShirtAsset(AssetType):
@@ -81,124 +90,64 @@ class TShirtAsset(AssetType):
     """
     overlay_type = None
 
-    async def overlay_image(self) -> Optional[Image.Image]:
+    def render(self) -> Optional[Image.Image]:
         if not self.asset_image:
             logger.error("No asset image available to overlay for asset ID: %s", self.asset_id)
             return None
-        try:
-            resample = Image.Resampling.LANCZOS
-        except AttributeError:
-            resample = Image.LANCZOS if hasattr(Image, 'LANCZOS') else Image.BICUBIC
-        tshirt_img = self.asset_image.convert("RGBA").resize((512, 512), resample)
-        tshirt_template_path = Path(__file__).parent / "assets" / "tshirt_template.png"
-        if tshirt_template_path.exists():
-            try:
-                tshirt_template = Image.open(tshirt_template_path).convert("RGBA")
-                if tshirt_template.size != (512, 512):
-                    tshirt_template = tshirt_template.resize((512, 512), resample)
-                tshirt_img = Image.alpha_composite(tshirt_img, tshirt_template)
-                logger.debug("Applied tshirt_template overlay from: %s", tshirt_template_path)
-            except Exception as e:
-                logger.error("Failed to overlay tshirt_template.png: %s", e)
+        tshirt_img = self.asset_image.convert("RGBA").resize(constants.TSHIRT_SIZE, LANCZOS)
+        tshirt_template = get_template_registry().get("tshirt", constants.TSHIRT_SIZE)
+        if tshirt_template:
+            tshirt_img = get_compositor().compose(tshirt_img, [tshirt_template])
+            logger.debug("Applied tshirt_template overlay.")
         else:
             logger.info("No tshirt_template.png found, just scaling T-Shirt to 512x512.")
         return tshirt_img
 
 
-
-class ShirtAsset(AssetType):
+class ClothingAsset(AssetType):
     """
-    Class for shirt assets.
+    Base class for clothing drawn on a template (shirts and pants).
     """
-    overlay_type = "shirt"
 
-    async def overlay_image(self) -> Optional[Image.Image]:
+    def render(self) -> Optional[Image.Image]:
         if not self.asset_image:
             logger.error("No asset image available to overlay for asset ID: %s", self.asset_id)
             return None
         if not self.overlay_image_template:
             logger.error("No overlay template available for asset ID: %s", self.asset_id)
             return None
-        # Compose asset and template if template exists, else just use asset
-        if self.overlay_image_template:
-            base = Image.alpha_composite(
-                self.asset_image.convert("RGBA"),
-                self.overlay_image_template.convert("RGBA"),
-            )
-        else:
-            base = self.asset_image.convert("RGBA")
-
-        # Always overlay whitespace.png if size is 585x559
-        if base.size == (585, 559):
-            whitespace_path = Path(__file__).parent / "assets" / "whitespace.png"
-            if whitespace_path.exists():
-                try:
-                    whitespace_img = Image.open(whitespace_path).convert("RGBA")
-                    if whitespace_img.size != base.size:
-                        try:
-                            resample = Image.Resampling.LANCZOS
-                        except AttributeError:
-                            resample = Image.LANCZOS if hasattr(Image, 'LANCZOS') else Image.BICUBIC
-                        whitespace_img = whitespace_img.resize(base.size, resample)
-                    # Composite ON TOP
-                    base = Image.alpha_composite(base, whitespace_img)
-                    logger.debug("Applied whitespace overlay from: %s", whitespace_path)
-                except Exception as e:
-                    logger.error("Failed to overlay whitespace.png: %s", e)
+        layers = [self.overlay_image_template]
+
+        # Always overlay whitespace.png (ON TOP) if the image has the template size
+        if self.asset_image.size == constants.CLOTHING_TEMPLATE_SIZE:
+            whitespace_img = get_template_registry().get("whitespace", self.asset_image.size)
+            if whitespace_img:
+                layers.append(whitespace_img)
             else:
-                logger.warning("whitespace.png not found at: %s", whitespace_path)
+                logger.warning("whitespace.png could not be loaded.")
+
+        # Template and whitespace are applied in one pass by the compositor
+        base = get_compositor().compose(self.asset_image, layers)
         self.asset_image = base  # Ensure the composited image is saved and sent
         return base
 
+
+class ShirtAsset(ClothingAsset):
+    """
+    Class for shirt assets.
+    """
+    overlay_type = "shirt"
+
     def print_details(self) -> None:
         logger.info("ShirtAsset with ID: %s, URL: %s", self.asset_id, self.asset_url)
 
 
-
-class PantsAsset(AssetType):
+class PantsAsset(ClothingAsset):
     """
     Class for pants assets.
     """
     overlay_type = "pants"
 
-    async def overlay_image(self) -> Optional[Image.Image]:
-        if not self.asset_image:
-            logger.error("No asset image available to overlay for asset ID: %s", self.asset_id)
-            return None
-        if not self.overlay_image_template:
-            logger.error("No overlay template available for asset ID: %s", self.asset_id)
-            return None
-        # Compose asset and template if template exists, else just use asset
-        if self.overlay_image_template:
-            base = Image.alpha_composite(
-                self.asset_image.convert("RGBA"),
-                self.overlay_image_template.convert("RGBA"),
-            )
-        else:
-            base = self.asset_image.convert("RGBA")
-
-        # Always overlay whitespace.png if size is 585x559
-        if base.size == (585, 559):
-            whitespace_path = Path(__file__).parent / "assets" / "whitespace.png"
-            if whitespace_path.exists():
-                try:
-                    whitespace_img = Image.open(whitespace_path).convert("RGBA")
-                    if whitespace_img.size != base.size:
-                        try:
-                            resample = Image.Resampling.LANCZOS
-                        except AttributeError:
-                            resample = Image.LANCZOS if hasattr(Image, 'LANCZOS') else Image.BICUBIC
-                        whitespace_img = whitespace_img.resize(base.size, resample)
-                    # Composite ON TOP
-                    base = Image.alpha_composite(base, whitespace_img)
-                    logger.debug("Applied whitespace overlay from: %s", whitespace_path)
-                except Exception as e:
-                    logger.error("Failed to overlay whitespace.png: %s", e)
-            else:
-                logger.warning("whitespace.png not found at: %s", whitespace_path)
-        self.asset_image = base  # Ensure the composited image is saved and sent
-        return base
-
     def print_details(self) -> None:
         logger.info("PantsAsset with ID: %s, URL: %s", self.asset_id, self.asset_url)
 
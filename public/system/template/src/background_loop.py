@@ -0,0 +1,189 @@
+"""
+This module runs one long-lived asyncio event loop on a background thread.
+
+Flask handlers are synchronous, and each used to call `asyncio.run`, which created
+and tore down an event loop for every request. Anything bound to a loop (the pooled
+aiohttp session, in-flight downloads shared by the single-flight groups) was thrown
+away after each response. The handlers now submit their coroutines to a single
+background loop instead, so that state lives for as long as the process.
+
+The loop starts on first use. It is recreated after a fork (e.g. in pre-forking WSGI
+servers that import the app before forking workers), and it is stopped at
+interpreter exit, running any registered shutdown hooks on it first.
+
+Classes:
+    BackgroundLoop: An event loop running forever on a daemon thread.
+
+Functions:
+    get_background_loop: Returns the process-wide BackgroundLoop instance.
+    shutdown_background_loop: Stops the process-wide loop, if it was started.
+
+background_loop.py
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import os
+import threading
+from typing import Awaitable, Callable, Coroutine, List, Optional, TypeVar
+
+import constants
+from custom_logger import setup_logger
+from utils import env_int
+
+# Set up the logger for this module
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+
+
+class BackgroundLoop:
+    """
+    An asyncio event loop running forever on a daemon thread.
+
+    Attributes:
+        timeout (float): Default seconds `run` waits for a coroutine's result.
+    """
+
+    def __init__(self, timeout: Optional[float] = None) -> None:
+        self.timeout = timeout or env_int("WEB_REQUEST_TIMEOUT", constants.WEB_REQUEST_TIMEOUT)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        self._shutdown_hooks: List[Callable[[], Awaitable[None]]] = []
+
+    @property
+    def running(self) -> bool:
+        """bool: Whether the loop thread is running in this process."""
+        return self._thread is not None and self._thread.is_alive() and self._pid == os.getpid()
+
+    def add_shutdown_hook(self, hook: Callable[[], Awaitable[None]]) -> None:
+        """
+        Registers a coroutine function to await on the loop before it stops.
+
+        Args:
+            hook (Callable[[], Awaitable[None]]): e.g. `shutdown_connection_pool`.
+        """
+        with self._lock:
+            if hook not in self._shutdown_hooks:
+                self._shutdown_hooks.append(hook)
+
+    def _after_fork(self) -> None:
+        """Forget the parent's loop; its thread doesn't exist in the child."""
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._pid = os.getpid()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the loop thread on first use and return the loop."""
+        if self._pid != os.getpid():
+            self._after_fork()
+        with self._lock:
+            if self._loop is None or self._thread is None or not self._thread.is_alive():
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def _serve() -> None:
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                thread = threading.Thread(target=_serve, name="background-loop", daemon=True)
+                thread.start()
+                ready.wait()
+                self._loop, self._thread = loop, thread
+                logger.debug("Started background event loop.")
+            return self._loop
+
+    def submit(self, coro: Coroutine[object, object, T]) -> "concurrent.futures.Future[T]":
+        """
+        Schedules a coroutine on the loop without waiting for it.
+
+        Args:
+            coro (Coroutine): The coroutine to run.
+
+        Returns:
+            concurrent.futures.Future: The coroutine's eventual result.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+
+    def run(self, coro: Coroutine[object, object, T], timeout: Optional[float] = None) -> T:
+        """
+        Runs a coroutine on the loop and waits for its result.
+
+        Args:
+            coro (Coroutine): The coroutine to run.
+            timeout (Optional[float]): Seconds to wait; defaults to `timeout`.
+
+        Returns:
+            T: The coroutine's result.
+
+        Raises:
+            TimeoutError: If the coroutine didn't finish in time; it is cancelled.
+            Exception: Whatever the coroutine raised.
+        """
+        future = self.submit(coro)
+        try:
+            return future.result(timeout or self.timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def stop(self, timeout: float = 10) -> None:
+        """
+        Runs the shutdown hooks on the loop, then stops and closes it.
+
+        Args:
+            timeout (float): Seconds to wait for the hooks and the loop thread.
+        """
+        if not self.running:
+            return
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            hooks = list(self._shutdown_hooks)
+            self._loop = self._thread = None
+
+        async def _run_hooks() -> None:
+            for hook in hooks:
+                try:
+                    await hook()
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    logger.warning("Background loop shutdown hook failed: %s", e)
+
+        try:
+            asyncio.run_coroutine_threadsafe(_run_hooks(), loop).result(timeout)
+        except concurrent.futures.TimeoutError:
+            logger.warning("Background loop shutdown hooks timed out.")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
+        logger.debug("Stopped background event loop.")
+
+
+_background_loop: Optional[BackgroundLoop] = None
+_background_loop_lock = threading.Lock()
+
+
+def get_background_loop() -> BackgroundLoop:
+    """Return the process-wide BackgroundLoop, creating it on first use.
+
+    Returns:
+        BackgroundLoop: The shared loop instance.
+    """
+    global _background_loop  # pylint: disable=global-statement
+    if _background_loop is None:
+        with _background_loop_lock:
+            if _background_loop is None:
+                _background_loop = BackgroundLoop()
+                atexit.register(shutdown_background_loop)
+    return _background_loop
+
+
+def shutdown_background_loop() -> None:
+    """Stop the process-wide loop, if it was started."""
+    if _background_loop is not None:
+        _background_loop.stop()
@@ -0,0 +1,218 @@
+"""
+This module resolves many clothing assets per round trip with assetdelivery's batch API.
+
+Resolving an asset one at a time takes two assetdelivery calls: the asset XML (for
+the content name and template ID), then the template's image location. For a group
+or bulk download that is 2N calls against the most tightly rate-limited host. The
+batch resolver instead posts a chunk of asset IDs to `POST /v1/assets/batch`, which
+returns each asset's CDN location, fetches the XML files from the CDN, then posts
+all their template IDs in a second batch for the image locations.
+
+The results go into the metadata cache, the same entries `fetch_asset` and
+`fetch_image_location` would have written. The downloader then finds every lookup
+cached. Anything a batch couldn't resolve (an error for one item, a failed batch
+request, XML that can't be parsed) is simply not cached, and the downloader looks
+it up one at a time as before, including negative caching of missing assets.
+
+Classes:
+    BatchResolver: Resolves asset metadata and image locations in batches.
+
+batch_resolver.py
+"""
+
+import asyncio
+import contextlib
+from typing import AsyncIterable, AsyncIterator, Dict, List, Optional
+
+import constants
+from custom_logger import setup_logger
+from metadata_cache import MISS
+from roblox_asset_downloader import RobloxAssetDownloader
+from utils import env_float, env_int, validate_clothing_id
+
+# Set up the logger for this module
+logger = setup_logger(__name__)
+
+
+class BatchResolver:
+    """
+    Resolves asset metadata and image locations in batches, priming the metadata cache.
+
+    Attributes:
+        downloader (RobloxAssetDownloader): Supplies the API handler and metadata cache.
+        batch_size (int): Asset IDs per batch request.
+        batch_wait (float): Seconds a partial batch of streamed IDs waits for more.
+    """
+
+    def __init__(
+        self,
+        downloader: RobloxAssetDownloader,
+        batch_size: Optional[int] = None,
+        batch_wait: Optional[float] = None,
+    ) -> None:
+        self.downloader = downloader
+        self.batch_size = max(
+            1, batch_size or env_int("ASSET_BATCH_SIZE", constants.ASSET_BATCH_SIZE)
+        )
+        self.batch_wait = (
+            batch_wait
+            if batch_wait is not None
+            else env_float("ASSET_BATCH_WAIT", constants.ASSET_BATCH_WAIT)
+        )
+
+    async def _locate(self, asset_ids: List[str]) -> Dict[str, str]:
+        """
+        Looks up the CDN location of each asset, `batch_size` per request.
+
+        Args:
+            asset_ids (List[str]): Numeric asset IDs.
+
+        Returns:
+            Dict[str, str]: The location of every asset the batch API resolved.
+        """
+        locations: Dict[str, str] = {}
+        for start in range(0, len(asset_ids), self.batch_size):
+            chunk = asset_ids[start : start + self.batch_size]
+            response = await self.downloader.api_handler.post_json(
+                constants.ROUTES["asset_batch"],
+                [{"assetId": int(asset_id), "requestId": asset_id} for asset_id in chunk],
+            )
+            if not isinstance(response, list):
+                logger.warning("Batch lookup of %d assets failed.", len(chunk))
+                continue
+            for item in response:
+                if isinstance(item, dict) and item.get("location") and not item.get("errors"):
+                    locations[str(item.get("requestId"))] = item["location"]
+        return locations
+
+    async def _resolve_asset(self, asset_id: str, location: str) -> Optional[dict]:
+        """Fetch one asset's XML from the CDN and cache what it says."""
+        data = await self.downloader.api_handler.fetch_bytes(location)
+        if not data:
+            return None
+        return self.downloader.remember_asset_xml(asset_id, data)
+
+    async def resolve(self, clothing_ids: List[str]) -> int:
+        """
+        Resolves the assets' metadata and image locations into the metadata cache.
+
+        Never raises for an individual asset: whatever isn't resolved is left to the
+        downloader's per-asset lookups.
+
+        Args:
+            clothing_ids (List[str]): Asset IDs (anything `validate_clothing_id` accepts).
+
+        Returns:
+            int: How many assets are now fully resolved (metadata and image location).
+        """
+        cache = self.downloader.metadata_cache
+        assets: Dict[str, dict] = {}
+        unresolved: List[str] = []
+        seen = set()
+        for clothing_id in clothing_ids:
+            asset_id = validate_clothing_id(clothing_id)
+            if not asset_id or asset_id in seen:
+                continue
+            seen.add(asset_id)
+            cached = cache.get("asset", asset_id)
+            if cached is MISS:
+                unresolved.append(asset_id)
+            elif cached:
+                assets[asset_id] = cached
+
+        if unresolved:
+            locations = await self._locate(unresolved)
+            resolved = await asyncio.gather(
+                *(
+                    self._resolve_asset(asset_id, location)
+                    for asset_id, location in locations.items()
+                )
+            )
+            for asset_id, asset in zip(locations, resolved):
+                if asset:
+                    assets[asset_id] = asset
+
+        templates = [asset["template id"] for asset in assets.values()]
+        image_locations = {
+            template_id: cache.get("location", template_id) for template_id in set(templates)
+        }
+        missing = sorted(
+            template_id for template_id, location in image_locations.items() if location is MISS
+        )
+        if missing:
+            for template_id, location in (await self._locate(missing)).items():
+                cache.set("location", template_id, location)
+                image_locations[template_id] = location
+
+        ready = sum(
+            1 for template_id in templates if image_locations[template_id] not in (MISS, None)
+        )
+        logger.info(
+            "Batch-resolved %d of %d assets; the rest are looked up one at a time.",
+            ready,
+            len(seen),
+        )
+        return ready
+
+    async def resolved(self, clothing_ids: AsyncIterable[str]) -> AsyncIterator[str]:
+        """
+        Passes a stream of asset IDs through, resolving them in batches on the way.
+
+        A batch is sent once `batch_size` IDs have arrived, or `batch_wait` seconds
+        after its first ID, so IDs streamed in slowly still share batch requests while
+        none waits long for a batch to fill up. The source is closed when the
+        consumer stops early.
+
+        Args:
+            clothing_ids (AsyncIterable[str]): The asset IDs.
+
+        Yields:
+            str: Each asset ID, after its batch has been resolved.
+        """
+        pending: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=self.batch_size)
+        failure: List[Exception] = []
+
+        async def feed() -> None:
+            try:
+                async for clothing_id in clothing_ids:
+                    await pending.put(clothing_id)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                failure.append(e)
+            await pending.put(None)
+
+        loop = asyncio.get_running_loop()
+        feeder = asyncio.create_task(feed())
+        try:
+            finished = False
+            while not finished:
+                batch: List[str] = []
+                clothing_id = await pending.get()
+                flush_at = loop.time() + self.batch_wait
+                while clothing_id is not None:
+                    batch.append(clothing_id)
+                    if len(batch) >= self.batch_size:
+                        break
+                    if not pending.empty():
+                        clothing_id = pending.get_nowait()
+                        continue
+                    try:
+                        clothing_id = await asyncio.wait_for(
+                            pending.get(), max(0.0, flush_at - loop.time())
+                        )
+                    except asyncio.TimeoutError:
+                        break
+                finished = clothing_id is None
+                if batch:
+                    await self.resolve(batch)
+                for item in batch:
+                    yield item
+            if failure:
+                # The source stream failed after yielding what came before the error.
+                raise failure[0]
+        finally:
+            feeder.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await feeder
+            aclose = getattr(clothing_ids, "aclose", None)
+            if aclose is not None:
+                await aclose()
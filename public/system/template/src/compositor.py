@@ -0,0 +1,239 @@
+"""
+This module composites clothing images with their overlay templates.
+
+Shirts and pants are drawn as `asset -> template -> whitespace`, each step an
+`Image.alpha_composite` that allocates a full-size intermediate image. When NumPy is
+installed the layers are instead applied in one pass over a single output buffer,
+and only inside each layer's non-transparent bounding box; pixels outside it are
+left untouched. The arithmetic replicates Pillow's integer `alpha_composite`
+exactly, so both backends produce byte-identical images.
+
+The backend is selected with the `COMPOSITOR_BACKEND` environment variable:
+"auto" (default, NumPy when available), "numpy" or "pillow".
+
+Classes:
+    PreparedLayer: An overlay's bounding box, masks and channel arrays, computed once.
+    PillowCompositor: Composites with chained `Image.alpha_composite` calls.
+    NumpyCompositor: Composites all layers in one vectorised pass.
+
+Functions:
+    get_compositor: Returns the process-wide compositor for the configured backend.
+
+compositor.py
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+from PIL import Image
+
+from custom_logger import setup_logger
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the Pillow backend is always available
+    np = None
+
+# Set up the logger for this module
+logger = setup_logger(__name__)
+
+# Fixed-point precision used by Pillow's AlphaComposite.c
+_PRECISION_BITS = 7
+
+
+def _div255(value):
+    """Pillow's SHIFTFORDIV255: a rounding-free approximation of value / 255."""
+    return ((value >> 8) + value) >> 8
+
+
+class PillowCompositor:
+    """
+    Composites layers with chained `Image.alpha_composite` calls.
+    """
+
+    name = "pillow"
+
+    def compose(self, base: Image.Image, layers: Sequence[Image.Image]) -> Image.Image:
+        """
+        Draws each layer over the base image, in order.
+
+        Args:
+            base (Image.Image): The bottom image; converted to RGBA if needed.
+            layers (Sequence[Image.Image]): RGBA overlays the same size as `base`.
+
+        Returns:
+            Image.Image: A new RGBA image.
+
+        Raises:
+            ValueError: If a layer's size differs from the base image's.
+        """
+        result = base if base.mode == "RGBA" else base.convert("RGBA")
+        for layer in layers:
+            result = Image.alpha_composite(result, layer)
+        if result is base:
+            result = base.copy()
+        return result
+
+
+class PreparedLayer:
+    """
+    An overlay reduced to what compositing needs, computed once per template.
+
+    Pillow's formula leaves the destination unchanged where the overlay's alpha is 0
+    and yields exactly the overlay's pixel where it is 255, so only the remaining
+    translucent pixels need the full arithmetic.
+
+    Attributes:
+        size (Tuple[int, int]): The overlay's full size.
+        bbox (Optional[Tuple[int, int, int, int]]): The box containing every pixel with
+            non-zero alpha, or None if the overlay is fully transparent.
+        pixels: The overlay inside `bbox`, one uint32 per RGBA pixel.
+        opaque: Boolean mask (inside `bbox`) of the pixels with alpha 255.
+        translucent: Flat indices (into the full image) of pixels with 0 < alpha < 255.
+        rgb: uint32 colour channels of the translucent pixels.
+        alpha: uint32 alpha channel of the translucent pixels.
+        alpha255: `alpha * 255` of the translucent pixels.
+        coef_numerator: `alpha * 255 * 255 << PRECISION_BITS` of the translucent pixels.
+    """
+
+    def __init__(self, image: Image.Image) -> None:
+        if image.mode != "RGBA":
+            raise ValueError(f"Overlay layers must be RGBA, not {image.mode}")
+        self.size = image.size
+        self.bbox = image.getchannel("A").getbbox()
+        if self.bbox is None:
+            return
+
+        left, top = self.bbox[:2]
+        crop = np.ascontiguousarray(np.asarray(image.crop(self.bbox), dtype=np.uint8))
+        alpha = crop[..., 3]
+        self.pixels = crop.view(np.uint32)[..., 0]
+        self.opaque = alpha == 255
+
+        rows, cols = np.nonzero((alpha != 0) & (alpha != 255))
+        self.translucent = (rows + top) * self.size[0] + (cols + left)
+        translucent = crop[rows, cols].astype(np.uint32)
+        self.rgb = translucent[:, :3]
+        self.alpha = translucent[:, 3]
+        self.alpha255 = self.alpha * 255
+        self.coef_numerator = self.alpha255 * (255 << _PRECISION_BITS)
+
+
+class NumpyCompositor:
+    """
+    Composites every layer in one pass over a single output buffer.
+
+    Layers are expected to be long-lived shared templates (see `template_registry`);
+    each one is analysed the first time it is seen and kept for the process lifetime.
+    """
+
+    name = "numpy"
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # id(image) -> (image, prepared); the image is held so its id stays unique
+        self._prepared: Dict[int, Tuple[Image.Image, PreparedLayer]] = {}
+
+    def prepare(self, layer: Image.Image) -> PreparedLayer:
+        """
+        Returns the precomputed form of an overlay, building it on first use.
+
+        Args:
+            layer (Image.Image): An RGBA overlay.
+
+        Returns:
+            PreparedLayer: The overlay's bounding box, masks and channel arrays.
+        """
+        entry = self._prepared.get(id(layer))
+        if entry is not None and entry[0] is layer:
+            return entry[1]
+        with self._lock:
+            entry = self._prepared.get(id(layer))
+            if entry is None or entry[0] is not layer:
+                entry = (layer, PreparedLayer(layer))
+                self._prepared[id(layer)] = entry
+            return entry[1]
+
+    @staticmethod
+    def _apply(out, layer: PreparedLayer) -> None:
+        """Alpha-composite one prepared layer over `out` (H x W x 4 uint8) in place."""
+        left, top, right, bottom = layer.bbox  # type: ignore[misc]
+
+        # Opaque overlay pixels replace the destination outright
+        region = out.view(np.uint32)[top:bottom, left:right, 0]
+        np.copyto(region, layer.pixels, where=layer.opaque)
+
+        if not layer.translucent.size:
+            return
+
+        # Same integer pipeline as ImagingAlphaComposite in Pillow's AlphaComposite.c
+        flat = out.reshape(-1, 4)
+        dst = flat[layer.translucent].astype(np.uint32)
+        blend = dst[:, 3] * (255 - layer.alpha)
+        outa255 = layer.alpha255 + blend
+        coef1 = layer.coef_numerator // outa255
+        coef2 = (255 << _PRECISION_BITS) - coef1
+
+        rgb = layer.rgb * coef1[:, None] + dst[:, :3] * coef2[:, None]
+        rgb += 0x80 << _PRECISION_BITS
+        dst[:, :3] = _div255(rgb) >> _PRECISION_BITS
+        dst[:, 3] = _div255(outa255 + 0x80)
+        flat[layer.translucent] = dst
+
+    def compose(self, base: Image.Image, layers: Sequence[Image.Image]) -> Image.Image:
+        """
+        Draws each layer over the base image, in order, in a single output buffer.
+
+        Args:
+            base (Image.Image): The bottom image; converted to RGBA if needed.
+            layers (Sequence[Image.Image]): RGBA overlays the same size as `base`.
+
+        Returns:
+            Image.Image: A new RGBA image, identical to `PillowCompositor.compose`.
+
+        Raises:
+            ValueError: If a layer's size differs from the base image's.
+        """
+        rgba = base if base.mode == "RGBA" else base.convert("RGBA")
+        prepared = [self.prepare(layer) for layer in layers]
+        for layer in prepared:
+            if layer.size != rgba.size:
+                raise ValueError("images do not match")
+
+        visible = [layer for layer in prepared if layer.bbox is not None]
+        if not visible:
+            # Fully transparent overlays (the stock templates) change nothing
+            return rgba.copy() if rgba is base else rgba
+
+        out = np.array(rgba, dtype=np.uint8)
+        for layer in visible:
+            self._apply(out, layer)
+        return Image.fromarray(out, "RGBA")
+
+
+Compositor = Union[PillowCompositor, NumpyCompositor]
+
+_compositor: Optional[Compositor] = None
+_compositor_lock = threading.Lock()
+
+
+def get_compositor() -> Compositor:
+    """Return the process-wide compositor for the `COMPOSITOR_BACKEND` setting.
+
+    Returns:
+        Compositor: The NumPy compositor when selected and available, else Pillow's.
+    """
+    global _compositor  # pylint: disable=global-statement
+    if _compositor is None:
+        with _compositor_lock:
+            if _compositor is None:
+                backend = os.getenv("COMPOSITOR_BACKEND", "auto").strip().lower()
+                if backend != "pillow" and np is not None:
+                    _compositor = NumpyCompositor()
+                else:
+                    if backend == "numpy":
+                        logger.warning("NumPy is not installed; compositing with Pillow.")
+                    _compositor = PillowCompositor()
+                logger.debug("Using the %s compositor.", _compositor.name)
+    return _compositor
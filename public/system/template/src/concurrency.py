@@ -0,0 +1,186 @@
+"""
+Concurrency primitives shared by the download pipeline.
+
+The web server runs request handlers on several threads, each of which may drive
+its own event loop, while the CLI uses a single loop. The primitives here keep
+their state behind a threading lock and wake waiters on whichever loop they are
+awaiting from, so a single process-wide instance can be shared by all of them.
+
+Classes:
+    AsyncGate: An awaitable counting semaphore whose limit can be changed at runtime.
+    SingleFlight: Deduplicates concurrent calls that share a key into one execution.
+
+concurrency.py
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import threading
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Hashable, Set, TypeVar
+
+T = TypeVar("T")
+
+
+def _resolve(future: asyncio.Future) -> None:
+    """Complete a waiter future unless it was cancelled in the meantime."""
+    if not future.done():
+        future.set_result(None)
+
+
+class AsyncGate:
+    """
+    An awaitable counting semaphore with an adjustable limit.
+
+    Waiters are served in FIFO order. The limit can be raised or lowered while
+    slots are held; lowering it simply stops new acquisitions until enough
+    holders have released.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self._limit = max(1, limit)
+        self._in_use = 0
+        self._lock = threading.Lock()
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def limit(self) -> int:
+        """int: The current maximum number of concurrent holders."""
+        return self._limit
+
+    @property
+    def in_use(self) -> int:
+        """int: The number of slots currently held."""
+        return self._in_use
+
+    @property
+    def waiting(self) -> int:
+        """int: The number of callers waiting for a slot."""
+        return len(self._waiters)
+
+    def set_limit(self, limit: int) -> None:
+        """Change the maximum number of concurrent holders.
+
+        Args:
+            limit (int): The new limit (at least 1).
+        """
+        with self._lock:
+            self._limit = max(1, limit)
+            self._wake_locked()
+
+    async def acquire(self) -> None:
+        """Wait until a slot is available and take it."""
+        with self._lock:
+            if self._in_use < self._limit and not self._waiters:
+                self._in_use += 1
+                return
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append(future)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if future in self._waiters:
+                    self._waiters.remove(future)
+                else:
+                    # The slot was already handed to us; give it back.
+                    self._in_use -= 1
+                    self._wake_locked()
+            raise
+
+    def release(self) -> None:
+        """Release a slot previously taken with `acquire`."""
+        with self._lock:
+            self._in_use -= 1
+            self._wake_locked()
+
+    def _wake_locked(self) -> None:
+        """Hand free slots to waiters. Must be called with the lock held."""
+        while self._waiters and self._in_use < self._limit:
+            future = self._waiters.popleft()
+            self._in_use += 1
+            try:
+                future.get_loop().call_soon_threadsafe(_resolve, future)
+            except RuntimeError:
+                # The waiter's loop has been closed; nobody will take this slot.
+                self._in_use -= 1
+
+    async def __aenter__(self) -> "AsyncGate":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls for the same key into a single execution.
+
+    The first caller for a key (the leader) starts the work; callers that arrive
+    while it is still in flight wait for it and receive the same result, or the
+    same exception. Waiters may be on other threads and event loops. The work runs
+    as its own task on the leader's loop, so cancelling any caller, the leader
+    included, never cancels it for the others.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, concurrent.futures.Future] = {}
+        # Strong references to running work; the event loop only keeps weak ones
+        self._tasks: Set[asyncio.Task] = set()
+
+    def in_flight(self) -> int:
+        """Return the number of keys currently being worked on.
+
+        Returns:
+            int: The number of in-flight keys.
+        """
+        return len(self._calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Run `func` for `key`, or wait for an identical in-flight run to finish.
+
+        Args:
+            key (Hashable): Identifies calls that may share one execution.
+            func (Callable[[], Awaitable[T]]): Produces the coroutine to run as leader.
+
+        Returns:
+            T: The result of the (possibly shared) execution.
+        """
+        with self._lock:
+            shared = self._calls.get(key)
+            if shared is None:
+                shared = concurrent.futures.Future()
+                self._calls[key] = shared
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            # Shield so a cancelled waiter doesn't cancel the shared result for everyone.
+            return await asyncio.shield(asyncio.wrap_future(shared))
+
+        task = asyncio.ensure_future(func())
+        with self._lock:
+            self._tasks.add(task)
+        task.add_done_callback(functools.partial(self._finish, key, shared))
+        # A cancelled leader (e.g. a timed-out web request) leaves the work running.
+        return await asyncio.shield(task)
+
+    def _finish(
+        self, key: Hashable, shared: concurrent.futures.Future, task: asyncio.Task
+    ) -> None:
+        """Hand a finished task's outcome to the waiters and forget the key."""
+        if task.cancelled():
+            # Only happens when the loop itself shuts down; don't cancel the waiters.
+            shared.set_exception(RuntimeError(f"In-flight work for {key!r} was cancelled"))
+        elif task.exception() is not None:
+            shared.set_exception(task.exception())
+        else:
+            shared.set_result(task.result())
+        with self._lock:
+            self._calls.pop(key, None)
+            self._tasks.discard(task)
@@ -0,0 +1,199 @@
+"""
+This module provides a process-wide, shared aiohttp connection pool.
+
+Every APIHandler, GroupHandler and web endpoint borrows its ClientSession from the
+same ConnectionPool so that requests to assetdelivery, catalog and the CDN reuse
+warm keep-alive connections instead of paying a new TCP+TLS handshake per asset.
+
+aiohttp sessions are bound to the event loop they were created on, so the pool
+keeps one session per running loop. In the common case (CLI, a single long-lived
+server loop) that is exactly one session for the whole process.
+
+Classes:
+    ConnectionPool: Owns the TCPConnector/ClientSession pair for each event loop.
+
+Functions:
+    get_ssl_context: Returns the process-wide TLS context, built on first use.
+    get_connection_pool: Returns the process-wide ConnectionPool instance.
+    shutdown_connection_pool: Closes the process-wide pool's session for the running loop.
+
+connection_pool.py
+"""
+
+import asyncio
+import ssl
+import threading
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+import constants
+from custom_logger import setup_logger
+from utils import env_int
+
+# Set up the logger for this module
+logger = setup_logger(__name__)
+
+_ssl_context: Optional[ssl.SSLContext] = None
+_ssl_context_lock = threading.Lock()
+
+
+def get_ssl_context() -> ssl.SSLContext:
+    """Return the TLS context for Roblox requests, building it on first use.
+
+    Loading the certifi CA bundle takes tens of milliseconds, so it is done once per
+    process, when the first session is created, rather than at import time.
+
+    Returns:
+        ssl.SSLContext: A verifying context trusting certifi's CA bundle.
+    """
+    global _ssl_context  # pylint: disable=global-statement
+    if _ssl_context is None:
+        with _ssl_context_lock:
+            if _ssl_context is None:
+                import certifi  # pylint: disable=import-outside-toplevel
+
+                _ssl_context = ssl.create_default_context(cafile=certifi.where())
+    return _ssl_context
+
+
+class ConnectionPool:
+    """
+    A long-lived pool of keep-alive connections shared by every API consumer.
+
+    Attributes:
+        limit (int): Maximum number of simultaneous connections overall.
+        limit_per_host (int): Maximum number of simultaneous connections per host.
+        keepalive_timeout (float): Seconds an idle connection is kept open for reuse.
+        dns_cache_ttl (int): Seconds resolved host addresses are cached.
+        connections_created (int): New connections opened (TCP, plus TLS for HTTPS).
+        connections_reused (int): Requests served over an already open connection.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = None,
+        limit_per_host: Optional[int] = None,
+        keepalive_timeout: Optional[float] = None,
+        dns_cache_ttl: Optional[int] = None,
+    ) -> None:
+        self.limit = limit or env_int("POOL_LIMIT", constants.POOL_LIMIT)
+        self.limit_per_host = limit_per_host or env_int(
+            "POOL_LIMIT_PER_HOST", constants.POOL_LIMIT_PER_HOST
+        )
+        self.keepalive_timeout = keepalive_timeout or env_int(
+            "POOL_KEEPALIVE_TIMEOUT", constants.POOL_KEEPALIVE_TIMEOUT
+        )
+        self.dns_cache_ttl = dns_cache_ttl or env_int(
+            "POOL_DNS_CACHE_TTL", constants.POOL_DNS_CACHE_TTL
+        )
+
+        self.connections_created = 0
+        self.connections_reused = 0
+
+        self._lock = threading.Lock()
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+    async def _on_connection_created(self, session, context, params) -> None:
+        """Trace hook: a request had to open a new connection."""
+        self.connections_created += 1
+
+    async def _on_connection_reused(self, session, context, params) -> None:
+        """Trace hook: a request got a warm keep-alive connection."""
+        self.connections_reused += 1
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create a new ClientSession backed by a tuned TCPConnector.
+
+        Returns:
+            aiohttp.ClientSession: The new session, bound to the running loop.
+        """
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+            ssl=get_ssl_context(),
+        )
+        # Count connection reuse, which is what the pool is for.
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_created)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+        # Do not use trust_env in case local environment proxies interfere with requests.
+        return aiohttp.ClientSession(connector=connector, trace_configs=[trace_config])
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Get the shared session for the running event loop, creating it if needed.
+
+        Returns:
+            aiohttp.ClientSession: The pooled session for the current loop.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            # Drop sessions whose loops have already been torn down.
+            for stale_loop in [lp for lp in self._sessions if lp.is_closed()]:
+                del self._sessions[stale_loop]
+
+            session = self._sessions.get(loop)
+            if session is None or session.closed:
+                session = self._create_session()
+                self._sessions[loop] = session
+                logger.debug(
+                    "Created pooled session (limit=%s, limit_per_host=%s)",
+                    self.limit,
+                    self.limit_per_host,
+                )
+        return session
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the pool's limits and connection counters.
+
+        Returns:
+            Dict[str, Any]: Open sessions, limits and created/reused connection counts.
+        """
+        with self._lock:
+            sessions = sum(1 for session in self._sessions.values() if not session.closed)
+        return {
+            "sessions": sessions,
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+        }
+
+    async def close(self) -> None:
+        """Close the pooled session for the running event loop, if any."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self._sessions.pop(loop, None)
+        if session and not session.closed:
+            await session.close()
+            logger.debug("Closed pooled session.")
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_connection_pool() -> ConnectionPool:
+    """Return the process-wide ConnectionPool, creating it on first use.
+
+    Returns:
+        ConnectionPool: The shared pool instance.
+    """
+    global _pool  # pylint: disable=global-statement
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+async def shutdown_connection_pool() -> None:
+    """Shutdown hook: close the shared pool's session for the running event loop.
+
+    Call this once when the application (CLI run, server loop) is exiting.
+    """
+    if _pool is not None:
+        await _pool.close()
@@ -3,8 +3,82 @@ Constants used throughout the project.
 """
 
 # Retry and Rate Limiting Constants
-MAX_RETRIES = 5  # Maximum number of retries for requests
-RATE_LIMIT_SLEEP = 1  # Sleep time in seconds for rate limiting (multiplies by 2^attempt)
+MAX_RETRIES = 5  # Maximum number of attempts for requests
+RETRY_BASE_DELAY = 0.5  # Base backoff in seconds (full jitter up to base * 2^attempt)
+RETRY_MAX_DELAY = 8  # Upper bound in seconds for a single backoff or Retry-After wait
+RETRY_DEADLINE = 20  # Total time budget in seconds for one request, retries included
+REQUEST_TIMEOUT = 30  # Per-attempt timeout in seconds (capped by the remaining deadline)
+
+# Per-host Rate Limiting Constants (token bucket + AIMD concurrency control)
+AIMD_INCREASE = 1  # Additive increase per "window" of successful requests
+AIMD_DECREASE = 0.5  # Multiplicative decrease applied on 429/5xx responses
+AIMD_COOLDOWN = 2  # Minimum seconds between two decreases for the same host
+HOST_RATE_LIMITS = {
+    # Applied to any host without an explicit entry (e.g. the rbxcdn.com image CDN)
+    "default": {
+        "rate": 20,  # Initial requests per second
+        "burst": 20,  # Token bucket capacity
+        "min_rate": 1,
+        "max_rate": 100,
+        "concurrency": 16,  # Initial concurrent requests
+        "min_concurrency": 1,
+        "max_concurrency": 64,
+    },
+    "assetdelivery.roblox.com": {"rate": 10, "burst": 10, "max_rate": 40, "concurrency": 8},
+    "catalog.roblox.com": {"rate": 5, "burst": 5, "max_rate": 20, "concurrency": 4},
+    "groups.roblox.com": {"rate": 5, "burst": 5, "max_rate": 20, "concurrency": 4},
+}
+
+# Shared Connection Pool Constants (overridable via environment variables of the same name)
+POOL_LIMIT = 100  # Maximum simultaneous connections across all hosts
+POOL_LIMIT_PER_HOST = 20  # Maximum simultaneous connections to a single host
+POOL_KEEPALIVE_TIMEOUT = 30  # Seconds an idle connection is kept open for reuse
+POOL_DNS_CACHE_TTL = 300  # Seconds resolved host addresses are cached
+
+# Largest `limit` ROUTES["group_catalog"] (/v1/search/items/details) accepts; it only
+# takes 10, 28 or 30 and answers anything else with 400. (The 50/60/100/120 sizes
+# belong to /v1/search/items, which returns IDs without details.)
+CATALOG_DETAILS_PAGE_SIZE = 30
+
+# Output Persistence Constants (overridable via environment variables of the same name)
+PERSIST_OUTPUTS = 1  # Write renders to DOWNLOADS_DIR in the background; 0 keeps them in memory
+PERSIST_WORKERS = 2  # Threads writing rendered assets to disk
+
+# Encode profile used when a request doesn't pick one (overridable via ENCODE_PROFILE)
+DEFAULT_ENCODE_PROFILE = "default"  # "default", "fast", "compact", "webp" or "avif"
+
+# Render Executor Constants (overridable via environment variables of the same name)
+RENDER_EXECUTOR = "thread"  # "thread", "process" or "inline"
+RENDER_WORKERS = 0  # Render workers; 0 uses the CPU count
+RENDER_QUEUE_PER_WORKER = 2  # Renders queued per worker before callers wait
+
+# Web Server Constants (overridable via environment variables of the same name)
+WEB_REQUEST_TIMEOUT = 120  # Seconds a request handler waits for its work on the background loop
+WEB_WARM_UP = 1  # Load the pipeline on a thread at web app import (default 0 under VERCEL)
+HTTP_CACHE_MAX_AGE = 7 * 24 * 60 * 60  # Seconds browsers and CDNs may reuse a download as is
+
+# Logging Constants (overridable via environment variables of the same name)
+LOG_LEVEL = "INFO"  # Level of every module logger; DEBUG includes per-request records
+LOG_FORMAT = "text"  # "text" or "json" (one JSON object per line)
+LOG_DEBUG_SAMPLE_RATE = 1.0  # Fraction of DEBUG records written, e.g. 0.01 under load
+LOG_QUEUE_SIZE = 10000  # Records buffered for the writer thread before new ones are dropped
+
+# Metrics Constants (overridable via environment variables of the same name)
+METRICS_ENABLED = 1  # Record stage and request timings for /metrics; 0 disables instrumentation
+# Histogram bucket bounds, in seconds
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Download Job Constants (overridable via environment variables of the same name)
+JOB_WORKERS = 2  # Jobs run at once; each downloads GROUP_DOWNLOAD_WORKERS assets concurrently
+JOB_MAX_ASSETS = 500  # Asset IDs accepted in one bulk job
+JOB_MAX_JOBS = 50  # Unfinished jobs accepted before new submissions are refused
+JOB_TTL = 60 * 60  # Seconds a finished job and its archive are kept
+ARCHIVE_QUEUE_SIZE = 4  # Rendered assets buffered ahead of a client streaming a group archive
+
+# Group Download Pipeline Constants (overridable via environment variables of the same name)
+GROUP_DOWNLOAD_WORKERS = 8  # Assets downloaded concurrently; host rate limits still apply
+ASSET_BATCH_SIZE = 100  # Asset IDs per assetdelivery batch request; 0 resolves one at a time
+ASSET_BATCH_WAIT = 0.25  # Seconds a partial batch waits for more streamed IDs before it is sent
 
 # URL Components for Roblox
 ROBLOX_ASSET_URL_START = "http://www.roblox.com/asset/?id="
@@ -23,6 +97,9 @@ ROUTES = {
     "image_location": (
         "https://assetdelivery.roblox.com/v1/assetid/{asset_id}"
     ),  # Image location API endpoint
+    "asset_batch": (
+        "https://assetdelivery.roblox.com/v1/assets/batch"
+    ),  # Batch asset location API (POST a list of {"assetId", "requestId"})
     # Example URL: Fetch all clothing assets by category, creator type, and sales filter
     "group_catalog": (
         "https://catalog.roblox.com/v1/search/items/details?"
@@ -30,12 +107,30 @@ ROUTES = {
     ),
 }
 
+# Rendered-output Cache Constants (overridable via environment variables of the same name)
+OUTPUT_VERSION = "1"  # Bump when rendering logic changes to invalidate cached outputs
+OUTPUT_CACHE_TTL = 7 * 24 * 60 * 60  # Seconds a rendered file is served from the cache
+OUTPUT_CACHE_MAX_BYTES = 256 * 1024 * 1024  # Total size of rendered files kept on disk
+OUTPUT_CACHE_MAX_ENTRIES = 5000  # Maximum number of rendered files kept on disk
+
+# Asset Metadata Cache Constants (overridable via environment variables of the same name)
+METADATA_ASSET_TTL = 24 * 60 * 60  # Seconds a parsed asset (content name, template ID) is kept
+METADATA_LOCATION_TTL = 30 * 60  # Seconds a template's CDN image location is kept
+METADATA_RENDER_TTL = 7 * 24 * 60 * 60  # Seconds a template's rendering asset is remembered
+METADATA_NEGATIVE_TTL = 10 * 60  # Seconds a missing asset is remembered (in memory only)
+METADATA_CACHE_MAX_ENTRIES = 10000  # Entries held in the in-memory tier
+METADATA_CACHE_PERSIST = 1  # 1 to back the memory tier with SQLite, 0 for memory only
+METADATA_CACHE_DB = "metadata.sqlite3"  # SQLite file name inside DOWNLOADS_DIR
+
 # Clothing Templates for Overlays
 CLOTHING_TEMPLATES = {
     "Shirt": "shirt_template.png",
     "Pants": "pants_template.png",
     "Tshirt": "tshirt_template.png",
 }
+WHITESPACE_TEMPLATE = "whitespace.png"  # Drawn over shirts and pants after the template
+CLOTHING_TEMPLATE_SIZE = (585, 559)  # Size of Roblox shirt and pants templates
+TSHIRT_SIZE = (512, 512)  # T-shirt graphics are scaled to this size
 
 # Optional: Document URL structure for easy reference
 # Example route for fetching all clothing assets from a group:
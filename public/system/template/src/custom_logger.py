@@ -1,45 +1,228 @@
 """
 Logger configuration module.
 Sets up a logger to be used across the project for consistent logging.
+
+Records are handed to a queue and written to stdout by a single listener thread, so
+a request thread or the event loop never waits on console or file I/O. The output is
+configured with environment variables:
+    LOG_LEVEL: Level of every module logger (default INFO; DEBUG for troubleshooting).
+    LOG_FORMAT: "text" (default) or "json" for one JSON object per line.
+    LOG_DEBUG_SAMPLE_RATE: Fraction of DEBUG records kept (default 1). Per-request
+        debug records are numerous; e.g. 0.01 keeps one in a hundred.
+    LOG_QUEUE_SIZE: Records buffered for the listener; more are dropped, not waited on.
+
+Classes:
+    JsonFormatter: Formats records as single-line JSON objects.
+
+Functions:
+    setup_logger: Returns a module logger writing through the shared queue.
+    logging_stats: Returns the queue's backlog and dropped record count.
+    shutdown_logging: Flushes queued records and stops the listener thread.
+
+custom_logger.py
 """
 
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import random
 import sys
+import threading
+from typing import Dict, Optional
+
+import constants
+from utils import env_float, env_int
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as single-line JSON objects for log collectors."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            record.exc_text = record.exc_text or self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _DebugSampler(logging.Filter):
+    """Keeps a random fraction of DEBUG records; other levels always pass."""
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or random.random() < self.rate
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records for the listener thread without ever blocking the caller.
+
+    The listener is started on first use in each process, so a worker forked after
+    the parent started logging gets a listener of its own.
+    """
+
+    def __init__(self, record_queue: "queue.Queue[logging.LogRecord]") -> None:
+        super().__init__(record_queue)
+        self.dropped = 0
+        self._output = _output_handler()
+        self._stopped = False
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._listener_pid: Optional[int] = None
+        self._listener_lock = threading.Lock()
+
+    def _ensure_listener(self) -> None:
+        """Start the listener thread for this process if it isn't running."""
+        pid = os.getpid()
+        if self._listener_pid == pid:
+            return
+        with self._listener_lock:
+            if self._listener_pid == pid:
+                return
+            if self._listener_pid is not None:
+                # Forked: the parent's listener thread doesn't exist here, and its
+                # queue may hold records the parent already wrote.
+                self.queue = queue.Queue(self.queue.maxsize)
+            self._listener = logging.handlers.QueueListener(
+                self.queue, self._output, respect_handler_level=False
+            )
+            self._listener.start()
+            self._listener_pid = pid
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments now, since the caller may change them after logging,
+        # but keep the traceback apart from the message for the output formatter.
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _TRACEBACK_FORMATTER.formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
 
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self._stopped:
+            # Shutting down (e.g. an atexit hook logging): write directly.
+            self._output.handle(record)
+            return
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
 
-def setup_logger(name: str, level: int = logging.DEBUG, stream: bool = True) -> logging.Logger:
+    def stop(self) -> None:
+        """Write out the queued records and stop the listener thread; records logged
+        afterwards are written synchronously."""
+        with self._listener_lock:
+            self._stopped = True
+            if self._listener is not None and self._listener_pid == os.getpid():
+                self._listener.stop()
+            self._listener = None
+            self._listener_pid = None
+
+
+def _output_handler() -> logging.Handler:
+    """The handler the listener thread writes with."""
+    handler = logging.StreamHandler(sys.stdout)
+    if os.getenv("LOG_FORMAT", constants.LOG_FORMAT).lower() == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    return handler
+
+
+def _level_from_env() -> int:
+    """The LOG_LEVEL setting as a logging level."""
+    name = os.getenv("LOG_LEVEL", constants.LOG_LEVEL).upper()
+    level = logging.getLevelName(name)
+    return level if isinstance(level, int) else logging.INFO
+
+
+_queue_handler: Optional[_QueueHandler] = None
+_queue_handler_lock = threading.Lock()
+
+
+def _get_queue_handler() -> _QueueHandler:
+    """Return the process-wide queue handler, creating it on first use."""
+    global _queue_handler  # pylint: disable=global-statement
+    if _queue_handler is None:
+        with _queue_handler_lock:
+            if _queue_handler is None:
+                handler = _QueueHandler(
+                    queue.Queue(env_int("LOG_QUEUE_SIZE", constants.LOG_QUEUE_SIZE))
+                )
+                rate = env_float("LOG_DEBUG_SAMPLE_RATE", constants.LOG_DEBUG_SAMPLE_RATE)
+                if rate < 1:
+                    handler.addFilter(_DebugSampler(rate))
+                atexit.register(shutdown_logging)
+                _queue_handler = handler
+    return _queue_handler
+
+
+def setup_logger(name: str, level: Optional[int] = None, stream: bool = True) -> logging.Logger:
     """
     Sets up a logger with the given name and configuration options.
 
     Args:
         name (str): Name of the logger, usually the module's __name__.
-        level (int): Logging level for the logger. Default is logging.DEBUG.
-        stream (bool): If True, adds a StreamHandler to output logs to stdout. Default is True.
+        level (Optional[int]): Logging level for the logger. Defaults to LOG_LEVEL
+            (INFO unless configured).
+        stream (bool): If True, logs go to stdout through the shared queue. If False,
+            they are written to "app.log" directly. Default is True.
 
     Returns:
         logging.Logger: Configured logger instance.
     """
     logger = logging.getLogger(name)
-    logger.setLevel(level)
+    logger.setLevel(level if level is not None else _level_from_env())
 
     # Clear existing handlers to avoid duplicate logs
     if logger.hasHandlers():
         logger.handlers.clear()
 
-    # Create a handler for outputting logs
     handler: logging.Handler
     if stream:
-        handler = logging.StreamHandler(sys.stdout)
+        handler = _get_queue_handler()
     else:
         handler = logging.FileHandler("app.log")  # Example for file logging
-
-    handler.setLevel(level)
-
-    # Create a formatter and set it for the handler
-    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-    handler.setFormatter(formatter)
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
 
     # Add the handler to the logger
     logger.addHandler(handler)
 
     return logger
+
+
+def logging_stats() -> Dict[str, int]:
+    """
+    Returns the queue's current backlog and how many records were dropped.
+
+    Returns:
+        Dict[str, int]: Queued and dropped record counts.
+    """
+    handler = _get_queue_handler()
+    return {"queued": handler.queue.qsize(), "dropped": handler.dropped}
+
+
+def shutdown_logging() -> None:
+    """Write out any queued records and stop the listener thread (runs at exit)."""
+    if _queue_handler is not None:
+        _queue_handler.stop()
@@ -0,0 +1,269 @@
+"""
+This module encodes rendered assets according to a selectable encode profile.
+
+Every download used to be saved with `img.save(..., "PNG")` at Pillow's default
+settings, whatever the client needed. A profile picks the format and the
+CPU-versus-size trade-off:
+
+    default  PNG at Pillow's default zlib level (what the pipeline always produced).
+    fast     PNG at zlib level 1: much quicker to encode, somewhat larger.
+    compact  PNG with `optimize`, reduced losslessly to a palette image when it uses
+             at most 256 distinct colours: slower to encode, smallest PNG.
+    webp     Lossless WebP: smaller than PNG, supported by modern browsers.
+    avif     High-quality AVIF (lossy, 4:4:4): the smallest file, meant for previews.
+
+Profiles are chosen per request by name, or by negotiating the `Accept` header.
+
+Classes:
+    EncodeProfile: The format and encoder options of one profile.
+
+Functions:
+    available_profiles: Returns the profiles the installed Pillow can encode.
+    get_profile: Looks up a profile by name.
+    negotiate_profile: Picks a profile from a request's `Accept` header.
+    encode_image: Encodes an image with a profile.
+
+encoder.py
+"""
+
+import io
+import os
+from typing import Any, Dict, List, Optional
+
+from PIL import Image, features
+
+import constants
+from custom_logger import setup_logger
+
+# Set up the logger for this module
+logger = setup_logger(__name__)
+
+
+class EncodeProfile:
+    """
+    The format and encoder options of one encode profile.
+
+    Attributes:
+        name (str): The profile name used in requests and cache keys.
+        format (str): The Pillow format name.
+        extension (str): The file extension for the format.
+        media_type (str): The MIME type for the format.
+        options (Dict[str, Any]): Keyword arguments passed to `Image.save`.
+        lossless (bool): Whether decoding returns exactly the rendered pixels.
+        palette (bool): Whether to try lossless palette reduction first.
+        feature (Optional[str]): The Pillow feature the format needs, if any.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        format: str,  # pylint: disable=redefined-builtin
+        extension: str,
+        media_type: str,
+        options: Optional[Dict[str, Any]] = None,
+        lossless: bool = True,
+        palette: bool = False,
+        feature: Optional[str] = None,
+    ) -> None:
+        self.name = name
+        self.format = format
+        self.extension = extension
+        self.media_type = media_type
+        self.options = options or {}
+        self.lossless = lossless
+        self.palette = palette
+        self.feature = feature
+
+    @property
+    def available(self) -> bool:
+        """bool: Whether the installed Pillow can encode this profile."""
+        return self.feature is None or bool(features.check(self.feature))
+
+    def download_name(self, asset_id: str) -> str:
+        """
+        Returns the file name offered to clients.
+
+        Args:
+            asset_id (str): The numeric asset ID.
+
+        Returns:
+            str: e.g. "123.png" or "123.webp".
+        """
+        return f"{asset_id}.{self.extension}"
+
+
+PROFILES: Dict[str, EncodeProfile] = {
+    "default": EncodeProfile("default", "PNG", "png", "image/png"),
+    "fast": EncodeProfile("fast", "PNG", "png", "image/png", {"compress_level": 1}),
+    "compact": EncodeProfile(
+        "compact", "PNG", "png", "image/png", {"optimize": True}, palette=True
+    ),
+    "webp": EncodeProfile(
+        "webp",
+        "WEBP",
+        "webp",
+        "image/webp",
+        # exact keeps the colour of fully transparent pixels, so decoding is bit-exact
+        {"lossless": True, "quality": 80, "method": 4, "exact": True},
+        feature="webp",
+    ),
+    "avif": EncodeProfile(
+        "avif",
+        "AVIF",
+        "avif",
+        "image/avif",
+        {"quality": 90, "subsampling": "4:4:4", "speed": 6},
+        lossless=False,
+        feature="avif",
+    ),
+}
+
+
+def available_profiles() -> List[str]:
+    """
+    Returns the names of the profiles the installed Pillow can encode.
+
+    Returns:
+        List[str]: Profile names.
+    """
+    return [name for name, profile in PROFILES.items() if profile.available]
+
+
+def default_profile_name() -> str:
+    """
+    Returns the profile used when a request doesn't choose one.
+
+    Returns:
+        str: `ENCODE_PROFILE` from the environment if valid, otherwise "default".
+    """
+    name = os.getenv("ENCODE_PROFILE", constants.DEFAULT_ENCODE_PROFILE).strip().lower()
+    if name in PROFILES and PROFILES[name].available:
+        return name
+    return "default"
+
+
+def get_profile(name: Optional[str] = None) -> EncodeProfile:
+    """
+    Looks up a profile by name.
+
+    Args:
+        name (Optional[str]): The profile name, or a format alias such as "png";
+                              the default profile if omitted.
+
+    Returns:
+        EncodeProfile: The profile.
+
+    Raises:
+        ValueError: If the profile doesn't exist or can't be encoded here.
+    """
+    key = (name or default_profile_name()).strip().lower()
+    if key == "png":
+        key = "default"
+    profile = PROFILES.get(key)
+    if profile is None or not profile.available:
+        raise ValueError(
+            f"Unknown encode profile {name!r}; choose one of {', '.join(available_profiles())}"
+        )
+    return profile
+
+
+def negotiate_profile(accept: Optional[str]) -> EncodeProfile:
+    """
+    Picks a profile from an HTTP `Accept` header.
+
+    Only explicit image requests are negotiated: browser navigations (which list
+    text/html and then image/avif, image/webp...) and wildcard-only headers get the
+    default profile, so a plain download link always yields a PNG. Otherwise the
+    best-ranked image type wins, preferring PNG on ties.
+
+    Args:
+        accept (Optional[str]): The header value.
+
+    Returns:
+        EncodeProfile: The negotiated profile.
+    """
+    default = get_profile()
+    if not accept or "text/html" in accept:
+        return default
+
+    ranks: Dict[str, float] = {}
+    for part in accept.split(","):
+        media_type, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ranks[media_type.strip().lower()] = quality
+
+    candidates = [default] + [
+        PROFILES[name] for name in ("webp", "avif") if PROFILES[name].available
+    ]
+    best, best_rank = default, ranks.get(default.media_type, 0.0)
+    for profile in candidates[1:]:
+        rank = ranks.get(profile.media_type, 0.0)
+        if rank > best_rank:
+            best, best_rank = profile, rank
+    return best
+
+
+def _numpy() -> Optional[Any]:
+    """Import NumPy on first use; only the compact profile needs it."""
+    try:
+        import numpy  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return numpy
+
+
+def _reduce_to_palette(image: Image.Image) -> Optional[Image.Image]:
+    """
+    Losslessly converts an RGBA image with at most 256 colours to a palette image.
+
+    Returns:
+        Optional[Image.Image]: The "P" image with per-entry transparency, or None if
+        the image has too many colours (or NumPy isn't installed).
+    """
+    np = _numpy()
+    if np is None or image.mode != "RGBA" or image.getcolors(256) is None:
+        return None
+    pixels = np.asarray(image).reshape(-1, 4)
+    packed = pixels.view(np.uint32).ravel()
+    colors, indices = np.unique(packed, return_inverse=True)
+    entries = colors.view(np.uint8).reshape(-1, 4)
+
+    palette_image = Image.fromarray(
+        indices.astype(np.uint8).reshape(image.size[1], image.size[0]), "P"
+    )
+    palette_image.putpalette(entries[:, :3].tobytes(), "RGB")
+    palette_image.info["transparency"] = entries[:, 3].tobytes()
+    return palette_image
+
+
+def encode_image(image: Image.Image, profile: EncodeProfile) -> bytes:
+    """
+    Encodes an image with a profile.
+
+    Args:
+        image (Image.Image): The rendered RGBA image.
+        profile (EncodeProfile): The profile to encode with.
+
+    Returns:
+        bytes: The encoded file contents.
+    """
+    buffer = io.BytesIO()
+    if profile.palette:
+        palette_image = _reduce_to_palette(image)
+        if palette_image is not None:
+            palette_image.save(
+                buffer,
+                profile.format,
+                transparency=palette_image.info["transparency"],
+                **profile.options,
+            )
+            return buffer.getvalue()
+    image.save(buffer, profile.format, **profile.options)
+    return buffer.getvalue()
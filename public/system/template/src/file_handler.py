@@ -5,9 +5,15 @@ files and images to the download directory.
 """
 
 import os
+import threading
 
 from PIL import Image
 
+from custom_logger import setup_logger
+
+# Set up the logger for this module
+logger = setup_logger(__name__)
+
 
 class FileHandler:
     """A class to handle file operations."""
@@ -34,4 +40,43 @@ class FileHandler:
     def save_image(self, img: Image.Image, filename: str) -> None:
         """Save an image to the download directory."""
         img.save(os.path.join(self.download_dir, filename), "PNG")
-        print(f"Image saved to {os.path.join(self.download_dir, filename)}")
+        logger.debug("Image saved to %s", os.path.join(self.download_dir, filename))
+
+    def save_bytes(self, data: bytes, filename: str) -> None:
+        """Save already-encoded file contents to the download directory."""
+        path = os.path.join(self.download_dir, filename)
+        self.write_atomic(path, data)
+        logger.debug("Image saved to %s", path)
+
+    @staticmethod
+    def write_atomic(path: str, data: bytes) -> None:
+        """Write a file so that readers only ever see the complete contents."""
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as file:
+                file.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def link_atomic(source: str, path: str) -> None:
+        """Hardlink an existing file to `path`, replacing whatever is there.
+
+        Raises:
+            OSError: If the source is missing or the filesystem doesn't support links.
+        """
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.link(source, temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
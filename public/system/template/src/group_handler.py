@@ -6,13 +6,16 @@ Classes:
     GroupHandler: A class to process Roblox groups
                 and fetch all clothing asset IDs from the group.
 Functions:
-    __init__(self) -> None:
+    __init__(self, api_handler: Optional[APIHandler] = None) -> None:
         Initializes the GroupHandler instance and sets up the API handler.
+    iter_clothing_ids(self, group_id: str) -> AsyncIterator[str]:
+        Yields the group's clothing asset IDs as each catalog page arrives.
     fetch_all_clothing_ids(self, group_id: str) -> Optional[List[str]]:
+        Collects every clothing asset ID of the group into a list.
 
 """
 
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 
 import constants
 from api_handler import APIHandler
@@ -27,8 +30,8 @@ class GroupHandler:
     A class to process Roblox groups and fetch all clothing asset IDs from the group.
     """
 
-    def __init__(self) -> None:
-        self.api_handler = APIHandler()
+    def __init__(self, api_handler: Optional[APIHandler] = None) -> None:
+        self.api_handler = api_handler or APIHandler()
 
     async def fetch_group_info(self, group_id: str) -> Optional[dict]:
         """
@@ -65,6 +68,33 @@ class GroupHandler:
         logger.info("Fetched group info for group ID: %s", group_id)
         return extracted_info
 
+    async def iter_clothing_ids(self, group_id: str) -> AsyncIterator[str]:
+        """
+        Yields the clothing asset IDs of the given Roblox group as catalog pages arrive.
+
+        Pages are requested at the largest size the catalog details endpoint allows,
+        and downloads can start as soon as the first page is in.
+
+        Args:
+            group_id (str): The ID of the Roblox group.
+
+        Yields:
+            str: Each clothing asset ID.
+        """
+        url = constants.ROUTES["group_catalog"].format(group_id=group_id)
+        count = 0
+        async for asset in self.api_handler.iter_paginated_data(
+            url, params={"sortOrder": "Ascend"}, limit=constants.CATALOG_DETAILS_PAGE_SIZE
+        ):
+            if "id" in asset:
+                count += 1
+                yield str(asset["id"])
+
+        if count:
+            logger.info("Fetched %d clothing asset IDs for group ID: %s", count, group_id)
+        else:
+            logger.error("Failed to fetch clothing assets for group ID: %s", group_id)
+
     async def fetch_all_clothing_ids(self, group_id: str) -> Optional[List[str]]:
         """
         Fetches all clothing asset IDs from the given Roblox group.
@@ -75,15 +105,5 @@ class GroupHandler:
         Returns:
             Optional[List[str]]: A list of clothing asset IDs if successful, otherwise None.
         """
-        url = constants.ROUTES["group_catalog"].format(group_id=group_id)
-        all_assets = await self.api_handler.fetch_paginated_data(
-            url, params={"sortOrder": "Ascend"}
-        )
-
-        if not all_assets:
-            logger.error("Failed to fetch clothing assets for group ID: %s", group_id)
-            return None
-
-        clothing_ids = [str(asset["id"]) for asset in all_assets if "id" in asset]
-        logger.info("Fetched %d clothing asset IDs for group ID: %s", len(clothing_ids), group_id)
-        return clothing_ids
+        clothing_ids = [clothing_id async for clothing_id in self.iter_clothing_ids(group_id)]
+        return clothing_ids or None
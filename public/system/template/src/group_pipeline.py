@@ -0,0 +1,291 @@
+"""
+This module contains the concurrent pipeline used to download many clothing assets,
+such as every item in a Roblox group.
+
+A fixed pool of workers pulls asset IDs from a bounded queue and runs them through a
+single shared RobloxAssetDownloader (and therefore one APIHandler, connection pool and
+rate limiter). The bounded queue applies backpressure to whatever produces the IDs,
+a failure on one item is recorded without stopping the others, and a summary of the
+whole run is returned at the end. On the way to the queue, the IDs are resolved in
+batches (see `batch_resolver`), so the workers mostly find the asset metadata and
+image locations already cached.
+
+Classes:
+    GroupDownloadSummary: Outcome of a pipeline run.
+    GroupDownloadPipeline: Downloads a stream of asset IDs with bounded concurrency.
+
+group_pipeline.py
+"""
+
+import asyncio
+import time
+from typing import (
+    Any,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import constants
+from api_handler import APIHandler
+from batch_resolver import BatchResolver
+from custom_logger import setup_logger
+from rendered_asset import RenderedAsset
+from roblox_asset_downloader import RobloxAssetDownloader
+from utils import env_int, validate_clothing_id
+
+# Set up the logger for this module
+logger = setup_logger(__name__)
+
+AssetIds = Union[Iterable[str], AsyncIterable[str]]
+
+
+class GroupDownloadSummary:
+    """
+    Outcome of a pipeline run.
+
+    Attributes:
+        group_id (Optional[str]): The group the assets came from, if any.
+        succeeded (List[str]): Asset IDs that were downloaded.
+        failed (Dict[str, str]): Asset IDs that failed, mapped to the error message.
+        elapsed (float): Wall-clock duration of the run in seconds.
+    """
+
+    def __init__(self, group_id: Optional[str] = None) -> None:
+        self.group_id = group_id
+        self.succeeded: List[str] = []
+        self.failed: Dict[str, str] = {}
+        self.elapsed = 0.0
+
+    @property
+    def total(self) -> int:
+        """int: The number of assets processed."""
+        return len(self.succeeded) + len(self.failed)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Returns the summary as a JSON-serialisable dictionary.
+
+        Returns:
+            Dict[str, Any]: The summary fields.
+        """
+        return {
+            "group_id": self.group_id,
+            "total": self.total,
+            "succeeded": list(self.succeeded),
+            "failed": dict(self.failed),
+            "elapsed": round(self.elapsed, 3),
+        }
+
+    def format(self) -> str:
+        """
+        Returns a one-line, human-readable report of the run.
+
+        Returns:
+            str: The report.
+        """
+        source = f" from group {self.group_id}" if self.group_id else ""
+        return (
+            f"Downloaded {len(self.succeeded)}/{self.total} assets{source} "
+            f"in {self.elapsed:.1f}s ({len(self.failed)} failed)"
+        )
+
+
+async def _iterate(clothing_ids: AssetIds):
+    """Iterate over either a regular or an asynchronous iterable of IDs."""
+    if hasattr(clothing_ids, "__aiter__"):
+        async for clothing_id in clothing_ids:  # type: ignore[union-attr]
+            yield clothing_id
+    else:
+        for clothing_id in clothing_ids:  # type: ignore[union-attr]
+            yield clothing_id
+
+
+class GroupDownloadPipeline:
+    """
+    Downloads a stream of clothing asset IDs with a bounded number of workers.
+
+    Attributes:
+        downloader (RobloxAssetDownloader): The downloader shared by every worker.
+        workers (int): The number of concurrent downloads.
+        queue_size (int): How many IDs may wait for a worker before the producer blocks.
+        profile (Optional[str]): The encode profile every asset is saved with.
+        batch_size (int): Asset IDs resolved per batch request; 0 disables batching.
+    """
+
+    def __init__(
+        self,
+        api_handler: Optional[APIHandler] = None,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        on_result: Optional[Callable[[str, Optional[str]], None]] = None,
+        profile: Optional[str] = None,
+        on_asset: Optional[Callable[[RenderedAsset], Awaitable[None]]] = None,
+        batch_size: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            api_handler (Optional[APIHandler]): The handler shared by all workers.
+            workers (Optional[int]): Number of concurrent downloads; defaults to
+                                     `GROUP_DOWNLOAD_WORKERS`.
+            queue_size (Optional[int]): Bound of the pending-ID queue; defaults to
+                                        twice the worker count.
+            on_result (Optional[Callable[[str, Optional[str]], None]]): Called after each
+                asset with its ID and None on success or the error message on failure.
+            profile (Optional[str]): The encode profile; the configured default if omitted.
+            on_asset (Optional[Callable[[RenderedAsset], Awaitable[None]]]): Awaited with
+                each rendered asset before it is reported, e.g. to add it to an archive.
+                An exception it raises counts as that asset's failure.
+            batch_size (Optional[int]): Asset IDs resolved per batch request; defaults
+                to `ASSET_BATCH_SIZE`. 0 resolves each asset on its own.
+        """
+        self.downloader = RobloxAssetDownloader(api_handler or APIHandler())
+        self.workers = max(
+            1, workers or env_int("GROUP_DOWNLOAD_WORKERS", constants.GROUP_DOWNLOAD_WORKERS)
+        )
+        self.queue_size = queue_size or self.workers * 2
+        self.on_result = on_result
+        self.profile = profile
+        self.on_asset = on_asset
+        self.batch_size = (
+            batch_size
+            if batch_size is not None
+            else env_int("ASSET_BATCH_SIZE", constants.ASSET_BATCH_SIZE)
+        )
+
+    async def run(
+        self, clothing_ids: AssetIds, group_id: Optional[str] = None
+    ) -> GroupDownloadSummary:
+        """
+        Downloads every asset ID, `workers` at a time.
+
+        Args:
+            clothing_ids (AssetIds): The IDs to download, as a list or an async stream.
+            group_id (Optional[str]): The group the IDs belong to, for the summary.
+
+        Returns:
+            GroupDownloadSummary: Which assets succeeded or failed, and how long it took.
+        """
+        summary = GroupDownloadSummary(group_id)
+        started = time.monotonic()
+        queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=self.queue_size)
+        tasks = [
+            asyncio.create_task(self._worker(queue, summary)) for _ in range(self.workers)
+        ]
+
+        ids = _iterate(clothing_ids)
+        if self.batch_size > 0:
+            ids = BatchResolver(self.downloader, self.batch_size).resolved(ids)
+
+        try:
+            async for clothing_id in ids:
+                # Blocks while the queue is full, so enumeration never outruns downloads.
+                await self._put(queue, clothing_id, tasks)
+            for _ in tasks:
+                await self._put(queue, None, tasks)
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            # Stops the batch resolver's read-ahead if the run ended early.
+            await ids.aclose()
+            summary.elapsed = time.monotonic() - started
+
+        logger.info(summary.format())
+        return summary
+
+    @staticmethod
+    async def _put(
+        queue: "asyncio.Queue[Optional[str]]",
+        item: Optional[str],
+        tasks: List["asyncio.Task[None]"],
+    ) -> None:
+        """
+        Puts an item on the queue, waiting for room unless a worker has died.
+
+        A worker only returns after taking a None sentinel, so one that finishes early
+        has failed; waiting on the queue then could block forever.
+
+        Raises:
+            Exception: The exception a worker died with.
+            RuntimeError: If every worker has stopped.
+        """
+        try:
+            queue.put_nowait(item)
+            return
+        except asyncio.QueueFull:
+            pass
+        put = asyncio.ensure_future(queue.put(item))
+        try:
+            while not put.done():
+                running = [task for task in tasks if not task.done()]
+                if not running:
+                    raise RuntimeError("Every download worker stopped before the queue ended")
+                done, _ = await asyncio.wait(
+                    [put, *running], return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    error = None if task is put or task.cancelled() else task.exception()
+                    if error:
+                        raise error
+        finally:
+            put.cancel()
+
+    async def _worker(
+        self, queue: "asyncio.Queue[Optional[str]]", summary: GroupDownloadSummary
+    ) -> None:
+        """Download IDs from the queue until a None sentinel arrives."""
+        while True:
+            clothing_id = await queue.get()
+            if clothing_id is None:
+                return
+            result, error = await self._download_one(clothing_id)
+            if result is not None and self.on_asset:
+                try:
+                    await self.on_asset(result)
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    logger.error("Failed to hand over asset %s: %s", clothing_id, e)
+                    error = str(e) or e.__class__.__name__
+            if error is None:
+                summary.succeeded.append(clothing_id)
+            else:
+                summary.failed[clothing_id] = error
+            if self.on_result:
+                try:
+                    self.on_result(clothing_id, error)
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    logger.error("Failed to report asset %s: %s", clothing_id, e)
+
+    async def _download_one(
+        self, clothing_id: str
+    ) -> Tuple[Optional[RenderedAsset], Optional[str]]:
+        """
+        Downloads one asset, isolating any failure to that asset.
+
+        Args:
+            clothing_id (str): The asset ID to download.
+
+        Returns:
+            Tuple[Optional[RenderedAsset], Optional[str]]: The rendered asset and None on
+            success, otherwise None and an error message.
+        """
+        asset_id = validate_clothing_id(clothing_id)
+        if not asset_id:
+            return None, "Invalid asset ID"
+        try:
+            result = await self.downloader.process_asset(asset_id, self.profile)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Failed to download asset %s: %s", asset_id, e)
+            return None, str(e) or e.__class__.__name__
+        if result is None:
+            return None, "Processing finished without producing an image"
+        return result, None
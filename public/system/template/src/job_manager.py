@@ -0,0 +1,410 @@
+"""
+This module runs group and bulk downloads as background jobs for the web server.
+
+`/api/download` renders one asset per request and answers synchronously, which a
+whole group can't do within a WSGI or serverless request timeout. A job is submitted
+instead: it runs on the web server's background event loop through the same
+GroupDownloadPipeline the CLI uses, records each asset's outcome as it completes,
+and adds every rendered image to a ZIP archive that can be downloaded once the job
+has finished. Clients poll the job for progress.
+
+Jobs are held in memory by the process that accepted them and are forgotten,
+together with their archive, `JOB_TTL` seconds after they finish.
+
+Classes:
+    JobLimitError: Raised when too many jobs are already queued or running.
+    Job: The state and progress of one download job.
+    JobManager: Accepts jobs and runs a bounded number of them at a time.
+
+Functions:
+    get_job_manager: Returns the process-wide JobManager instance.
+
+job_manager.py
+"""
+
+import asyncio
+import os
+import threading
+import time
+import uuid
+import zipfile
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import constants
+from api_handler import APIHandler
+from background_loop import BackgroundLoop, get_background_loop
+from concurrency import AsyncGate
+from custom_logger import setup_logger
+from encoder import get_profile
+from file_handler import FileHandler
+from group_handler import GroupHandler
+from group_pipeline import GroupDownloadPipeline
+from rendered_asset import RenderedAsset
+from utils import env_int, validate_clothing_id
+
+# Set up the logger for this module
+logger = setup_logger(__name__)
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+
+class JobLimitError(RuntimeError):
+    """Raised when too many jobs are already queued or running."""
+
+
+class Job:
+    """
+    The state and progress of one download job.
+
+    Attributes:
+        job_id (str): The job's identifier.
+        group_id (Optional[str]): The group to download, for group jobs.
+        asset_ids (Optional[List[str]]): The assets to download, for bulk jobs.
+        profile (str): The encode profile every asset is saved with.
+        status (str): One of "queued", "running", "succeeded" or "failed".
+        error (Optional[str]): Why the job failed, if it did.
+        artifact_path (Optional[str]): The finished ZIP archive, once available.
+    """
+
+    def __init__(
+        self,
+        group_id: Optional[str] = None,
+        asset_ids: Optional[List[str]] = None,
+        profile: str = "default",
+    ) -> None:
+        self.job_id = uuid.uuid4().hex
+        self.group_id = group_id
+        self.asset_ids = asset_ids
+        self.profile = profile
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.artifact_path: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+        self._lock = threading.Lock()
+        # Known up front for bulk jobs; counted while a group is enumerated.
+        self._total: Optional[int] = len(asset_ids) if asset_ids is not None else None
+        self._enumerated = len(asset_ids) if asset_ids is not None else 0
+        self._results: Dict[str, Dict[str, str]] = {}
+        self._archive: Optional[zipfile.ZipFile] = None
+
+    @property
+    def finished(self) -> bool:
+        """bool: Whether the job has succeeded or failed."""
+        return self.status in ("succeeded", "failed")
+
+    def record(self, clothing_id: str, error: Optional[str]) -> None:
+        """
+        Records one asset's outcome; used as the pipeline's `on_result` callback.
+
+        Args:
+            clothing_id (str): The asset ID.
+            error (Optional[str]): None on success, otherwise the error message.
+        """
+        with self._lock:
+            if error is None:
+                profile = get_profile(self.profile)
+                self._results[clothing_id] = {
+                    "status": "succeeded",
+                    "filename": profile.download_name(clothing_id),
+                }
+            else:
+                self._results[clothing_id] = {"status": "failed", "error": error}
+
+    def count_enumerated(self) -> None:
+        """Counts one more asset ID read from the group catalog."""
+        with self._lock:
+            self._enumerated += 1
+
+    def set_total(self, total: int) -> None:
+        """Sets the number of assets once the group catalog has been read."""
+        with self._lock:
+            self._total = total
+
+    def open_archive(self, path: str) -> None:
+        """
+        Starts the job's ZIP archive.
+
+        Args:
+            path (str): Where to write the archive while the job runs.
+        """
+        # PNG, WebP and AVIF are already compressed, so entries are stored as-is.
+        archive = zipfile.ZipFile(path, "w", zipfile.ZIP_STORED)
+        with self._lock:
+            self._archive = archive
+
+    def add_to_archive(self, result: RenderedAsset) -> None:
+        """
+        Appends one rendered asset to the archive.
+
+        Args:
+            result (RenderedAsset): The rendered asset.
+        """
+        with self._lock:
+            if self._archive is not None:
+                self._archive.writestr(result.filename, result.data)
+
+    def close_archive(self, path: str) -> None:
+        """
+        Finishes the archive and moves it to its final name; an empty archive is
+        deleted instead.
+
+        Args:
+            path (str): The archive's final path.
+        """
+        with self._lock:
+            archive, self._archive = self._archive, None
+        if archive is None:
+            return
+        archive.close()
+        if not archive.infolist():
+            os.remove(archive.filename)
+            return
+        os.replace(archive.filename, path)
+        self.artifact_path = path
+
+    def discard_archive(self) -> None:
+        """Closes and deletes a partial archive."""
+        with self._lock:
+            archive, self._archive = self._archive, None
+        if archive is not None:
+            archive.close()
+            try:
+                os.remove(archive.filename)
+            except OSError:
+                pass
+
+    def as_dict(self, include_results: bool = True) -> Dict[str, Any]:
+        """
+        Returns the job's state as a JSON-serialisable dictionary.
+
+        Args:
+            include_results (bool): Whether to include every asset's outcome.
+
+        Returns:
+            Dict[str, Any]: Status, timings, progress counters and per-asset results.
+        """
+        with self._lock:
+            succeeded = sum(1 for r in self._results.values() if r["status"] == "succeeded")
+            data: Dict[str, Any] = {
+                "id": self.job_id,
+                "status": self.status,
+                "kind": "group" if self.group_id else "assets",
+                "group_id": self.group_id,
+                "profile": self.profile,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "progress": {
+                    "total": self._total,
+                    "enumerated": self._enumerated,
+                    "completed": len(self._results),
+                    "succeeded": succeeded,
+                    "failed": len(self._results) - succeeded,
+                },
+                "error": self.error,
+                "artifact_ready": self.artifact_path is not None,
+            }
+            if include_results:
+                data["results"] = dict(self._results)
+        return data
+
+
+class JobManager:
+    """
+    Accepts download jobs and runs a bounded number of them at a time.
+
+    Attributes:
+        workers (int): Jobs that may run at once; others stay queued.
+        max_assets (int): Asset IDs accepted in one bulk job.
+        max_jobs (int): Unfinished jobs accepted before new ones are refused.
+        ttl (int): Seconds a finished job and its archive are kept.
+        directory (str): Where job archives are written.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_assets: Optional[int] = None,
+        max_jobs: Optional[int] = None,
+        ttl: Optional[int] = None,
+        directory: Optional[str] = None,
+        loop: Optional[BackgroundLoop] = None,
+    ) -> None:
+        self.workers = workers or env_int("JOB_WORKERS", constants.JOB_WORKERS)
+        self.max_assets = max_assets or env_int("JOB_MAX_ASSETS", constants.JOB_MAX_ASSETS)
+        self.max_jobs = max_jobs or env_int("JOB_MAX_JOBS", constants.JOB_MAX_JOBS)
+        self.ttl = ttl or env_int("JOB_TTL", constants.JOB_TTL)
+        self.directory = directory or os.path.join(
+            FileHandler.create_download_directory(), "jobs"
+        )
+        self._loop = loop
+        self._gate = AsyncGate(self.workers)
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+
+    def submit(
+        self,
+        group_id: Optional[str] = None,
+        asset_ids: Optional[List[str]] = None,
+        profile: Optional[str] = None,
+    ) -> Job:
+        """
+        Creates a job and schedules it on the background loop.
+
+        Args:
+            group_id (Optional[str]): A group whose clothing should be downloaded.
+            asset_ids (Optional[List[str]]): Asset IDs to download instead.
+            profile (Optional[str]): The encode profile; the configured default if omitted.
+
+        Returns:
+            Job: The queued job.
+
+        Raises:
+            ValueError: If the input is invalid or the profile is unknown.
+            JobLimitError: If `max_jobs` jobs are already unfinished.
+        """
+        encode_profile = get_profile(profile)
+        if bool(group_id) == bool(asset_ids):
+            raise ValueError("Provide either a group ID or a list of asset IDs")
+        if group_id:
+            group_id = validate_clothing_id(str(group_id))
+            if not group_id:
+                raise ValueError("Invalid group ID")
+            ids = None
+        else:
+            if not isinstance(asset_ids, list):
+                raise ValueError("Asset IDs must be a list")
+            if len(asset_ids) > self.max_assets:
+                raise ValueError(f"A job may contain at most {self.max_assets} assets")
+            # Duplicates would only be rendered and archived twice.
+            ids = list(dict.fromkeys(str(asset_id) for asset_id in asset_ids))
+
+        job = Job(group_id, ids, encode_profile.name)
+        with self._lock:
+            self._prune_locked()
+            unfinished = sum(1 for j in self._jobs.values() if not j.finished)
+            if unfinished >= self.max_jobs:
+                raise JobLimitError("Too many download jobs are in progress; try again later")
+            self._jobs[job.job_id] = job
+
+        loop = self._loop or get_background_loop()
+        loop.submit(self._run(job))
+        logger.info("Queued job %s (%s).", job.job_id, group_id or f"{len(ids)} assets")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Looks up a job.
+
+        Args:
+            job_id (str): The job's identifier.
+
+        Returns:
+            Optional[Job]: The job, or None if it is unknown or has expired.
+        """
+        with self._lock:
+            self._prune_locked()
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the number of retained jobs in each state.
+
+        Returns:
+            Dict[str, int]: Counts keyed by status.
+        """
+        with self._lock:
+            counts = {status: 0 for status in JOB_STATUSES}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return counts
+
+    def _prune_locked(self) -> None:
+        """Forget jobs that finished more than `ttl` seconds ago. Must hold the lock."""
+        cutoff = time.time() - self.ttl
+        for job_id in [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at is not None and job.finished_at < cutoff
+        ]:
+            job = self._jobs.pop(job_id)
+            if job.artifact_path:
+                try:
+                    os.remove(job.artifact_path)
+                except OSError:
+                    pass
+
+    async def _run(self, job: Job) -> None:
+        """Run a job once a worker slot is free."""
+        async with self._gate:
+            job.started_at = time.time()
+            job.status = "running"
+            try:
+                await self._download(job)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.error("Job %s failed: %s", job.job_id, e)
+                job.error = str(e) or e.__class__.__name__
+                job.status = "failed"
+                await asyncio.to_thread(job.discard_archive)
+            finally:
+                job.finished_at = time.time()
+        logger.info("Job %s %s.", job.job_id, job.status)
+
+    async def _download(self, job: Job) -> None:
+        """Run the pipeline for a job and finish its archive."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{job.job_id}.zip")
+        await asyncio.to_thread(job.open_archive, f"{path}.tmp")
+
+        async def archive(result: RenderedAsset) -> None:
+            await asyncio.to_thread(job.add_to_archive, result)
+
+        api_handler = APIHandler()
+        pipeline = GroupDownloadPipeline(
+            api_handler, on_result=job.record, profile=job.profile, on_asset=archive
+        )
+        if job.group_id:
+            ids = _counted(job, GroupHandler(api_handler).iter_clothing_ids(job.group_id))
+        else:
+            ids = job.asset_ids or []
+        summary = await pipeline.run(ids, job.group_id)
+
+        await asyncio.to_thread(job.close_archive, path)
+        if not summary.total:
+            raise ValueError("No clothing assets found in the group")
+        if not summary.succeeded:
+            raise ValueError("None of the assets could be downloaded")
+        job.status = "succeeded"
+
+
+async def _counted(job: Job, clothing_ids: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Pass a group's unique IDs through, counting them, and set the job's total at the end."""
+    seen = set()
+    async for clothing_id in clothing_ids:
+        if clothing_id in seen:
+            continue
+        seen.add(clothing_id)
+        job.count_enumerated()
+        yield clothing_id
+    job.set_total(len(seen))
+
+
+_job_manager: Optional[JobManager] = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Return the process-wide JobManager, creating it on first use.
+
+    Returns:
+        JobManager: The shared manager instance.
+    """
+    global _job_manager  # pylint: disable=global-statement
+    if _job_manager is None:
+        with _job_manager_lock:
+            if _job_manager is None:
+                _job_manager = JobManager()
+    return _job_manager
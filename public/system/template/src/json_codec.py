@@ -0,0 +1,40 @@
+"""
+JSON decoding used by the API layer.
+
+orjson is used when it is installed because it parses bytes directly and is several
+times faster than the standard library; otherwise the standard `json` module is used.
+Both raise a `ValueError` subclass on malformed input.
+
+Functions:
+    loads: Decodes JSON from bytes or str with the fastest available backend.
+
+json_codec.py
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None  # type: ignore[assignment]
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Decodes a JSON document.
+
+    Args:
+        data (Union[bytes, str]): The raw JSON document.
+
+    Returns:
+        Any: The decoded value.
+
+    Raises:
+        ValueError: If the document is not valid JSON.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
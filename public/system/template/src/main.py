@@ -5,10 +5,16 @@ main.py
 """
 
 import asyncio
+from typing import Optional
 
+from api_handler import APIHandler
+from connection_pool import shutdown_connection_pool
 from console_interface import CLIInterface
 from custom_logger import setup_logger
 from group_handler import GroupHandler
+from group_pipeline import GroupDownloadPipeline
+from output_writer import shutdown_output_writer
+from render_executor import shutdown_render_executor
 from roblox_asset_downloader import RobloxAssetDownloader
 from utils import extract_id_and_type_from_url, validate_clothing_id
 
@@ -38,12 +44,22 @@ async def handle_group(interface, group_id: str) -> None:
     """
 
     if group_id:
-        group_handler = GroupHandler()
+        # One handler for the whole group so every asset reuses the pooled connections
+        api_handler = APIHandler()
+        group_handler = GroupHandler(api_handler)
+
+        def report(clothing_id: str, error: Optional[str]) -> None:
+            if error is None:
+                interface.display_output(f"Successfully downloaded asset: {clothing_id}")
+            else:
+                interface.display_output(f"Failed to download asset {clothing_id}: {error}")
+
         try:
-            clothing_ids = await group_handler.fetch_all_clothing_ids(group_id)
-            if clothing_ids:
-                for clothing_id in clothing_ids:
-                    await handle_asset(interface, clothing_id)
+            # Stream IDs page by page so downloads start while the catalog is enumerated
+            pipeline = GroupDownloadPipeline(api_handler, on_result=report)
+            summary = await pipeline.run(group_handler.iter_clothing_ids(group_id), group_id)
+            if summary.total:
+                interface.display_output(summary.format())
             else:
                 interface.display_output("No clothing assets found in the group.")
                 logger.warning("No clothing assets found in the group.")
@@ -55,12 +71,15 @@ async def handle_group(interface, group_id: str) -> None:
         logger.warning("User input was invalid, no valid group ID found.")
 
 
-async def handle_asset(interface, asset_id: str) -> None:
+async def handle_asset(
+    interface, asset_id: str, api_handler: Optional[APIHandler] = None
+) -> None:
     """
     Asynchronously handles the downloading of a Roblox asset given its ID.
     Args:
         interface: An object that provides methods to display output to the user.
         asset_id (str): The ID of the Roblox asset to be downloaded.
+        api_handler (Optional[APIHandler]): A handler to share across downloads.
     Returns:
         None
     Raises:
@@ -71,11 +90,14 @@ async def handle_asset(interface, asset_id: str) -> None:
     """
 
     if asset_id:
-        downloader = RobloxAssetDownloader()
+        downloader = RobloxAssetDownloader(api_handler)
         try:
-            await downloader.process_asset(asset_id)
-            interface.display_output(f"Successfully downloaded asset: {asset_id}")
-            logger.info("Successfully downloaded asset: %s", asset_id)
+            if await downloader.process_asset(asset_id):
+                interface.display_output(f"Successfully downloaded asset: {asset_id}")
+                logger.info("Successfully downloaded asset: %s", asset_id)
+            else:
+                interface.display_output(f"Could not download asset: {asset_id}")
+                logger.error("Asset %s could not be rendered.", asset_id)
         except (asyncio.TimeoutError, ValueError) as e:
             interface.display_output(f"An error occurred: {str(e)}")
             logger.error("An error occurred while downloading the asset: %s", str(e))
@@ -129,9 +151,15 @@ async def handle_download() -> None:
 
 async def main() -> None:
     """Main function to start the application."""
-    while True:
-        await handle_download()
-        break
+    try:
+        while True:
+            await handle_download()
+            break
+    finally:
+        await shutdown_connection_pool()
+        shutdown_render_executor()
+        # Let background writes finish so every download is on disk before exit
+        shutdown_output_writer()
 
 
 if __name__ == "__main__":
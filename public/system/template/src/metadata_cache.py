@@ -0,0 +1,319 @@
+"""
+This module provides the multi-tier cache for asset metadata lookups.
+
+`RobloxAssetDownloader.fetch_asset` (content name and template ID parsed from the
+asset XML) and `fetch_image_location` (the CDN URL of a template) each cost a round
+trip to assetdelivery, yet their answers rarely change. Results are kept in an
+in-memory LRU with a TTL, optionally backed by an SQLite file under `DOWNLOADS_DIR`
+so they survive restarts and are shared by worker processes. Private or nonexistent
+assets are cached negatively, so repeated bad IDs stop hitting Roblox. Negative
+entries are kept in memory only and only for failures that describe the asset itself,
+never for authentication or rate limiting problems. The "render"
+namespace records which asset a template was last rendered for, so other assets using
+that template are served its render.
+
+Classes:
+    TTLCache: Thread-safe in-memory LRU cache whose entries expire.
+    SQLiteStore: Optional on-disk tier backed by SQLite.
+    MetadataCache: Namespaced two-tier cache with negative caching.
+
+Functions:
+    get_metadata_cache: Returns the process-wide MetadataCache instance.
+
+metadata_cache.py
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import constants
+from custom_logger import setup_logger
+from file_handler import FileHandler
+from utils import env_int
+
+# Set up the logger for this module
+logger = setup_logger(__name__)
+
+# Returned by lookups that found nothing; a cached None means "known unavailable".
+MISS = object()
+
+# Statuses that say the asset itself is unavailable. A 403 only does when the request
+# carried no cookie; with one, it may just mean the cookie expired. 401 and 429 are
+# about the caller, never the asset.
+NEGATIVE_STATUSES = frozenset({400, 404})
+UNAUTHENTICATED_NEGATIVE_STATUSES = NEGATIVE_STATUSES | {403}
+
+
+class TTLCache:
+    """
+    A thread-safe, size-bounded LRU cache whose entries expire after their TTL.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Tuple[str, str]) -> Any:
+        """Return the cached value for `key`, or MISS if absent or expired.
+
+        Args:
+            key (Tuple[str, str]): The (namespace, key) pair.
+
+        Returns:
+            Any: The cached value, or MISS.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISS
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return MISS
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Tuple[str, str], value: Any, expires_at: float) -> None:
+        """Store a value until `expires_at`, evicting the least recently used entries.
+
+        Args:
+            key (Tuple[str, str]): The (namespace, key) pair.
+            value (Any): The value to cache.
+            expires_at (float): The UNIX time at which the entry expires.
+        """
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteStore:
+    """
+    An on-disk cache tier backed by SQLite; values are stored as JSON.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        with self._lock, self._conn:
+            # WAL lets several worker processes read while one writes.
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS metadata ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+
+    def get(self, namespace: str, key: str) -> Tuple[Any, float]:
+        """Return the stored value and its expiry, or (MISS, 0) if absent or expired.
+
+        Args:
+            namespace (str): The lookup namespace.
+            key (str): The key within the namespace.
+
+        Returns:
+            Tuple[Any, float]: The value (or MISS) and its expiry time.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM metadata WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return MISS, 0.0
+        return json.loads(row[0]), row[1]
+
+    def set(self, namespace: str, key: str, value: Any, expires_at: float) -> None:
+        """Store a value until `expires_at`.
+
+        Args:
+            namespace (str): The lookup namespace.
+            key (str): The key within the namespace.
+            value (Any): A JSON-serialisable value.
+            expires_at (float): The UNIX time at which the entry expires.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO metadata (namespace, key, value, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), expires_at),
+            )
+
+    def purge_expired(self) -> None:
+        """Delete every expired row."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM metadata WHERE expires_at <= ?", (time.time(),))
+
+
+class MetadataCache:
+    """
+    A namespaced, two-tier (memory, then optional SQLite) cache with negative caching.
+
+    Namespaces used by the downloader:
+        "asset": asset ID -> {"asset id", "content name", "template id"}
+        "location": template ID -> CDN image location URL
+        "render": "{template ID}:{content name}" -> asset ID the template was rendered for
+
+    Attributes:
+        ttls (Dict[str, int]): Seconds entries stay valid, by namespace (METADATA_ASSET_TTL,
+            METADATA_LOCATION_TTL, METADATA_RENDER_TTL); "negative" for unavailable keys.
+    """
+
+    def __init__(self, memory: TTLCache, store: Optional[SQLiteStore] = None) -> None:
+        self.memory = memory
+        self.store = store
+        self.ttls: Dict[str, int] = {
+            "asset": env_int("METADATA_ASSET_TTL", constants.METADATA_ASSET_TTL),
+            "location": env_int("METADATA_LOCATION_TTL", constants.METADATA_LOCATION_TTL),
+            "render": env_int("METADATA_RENDER_TTL", constants.METADATA_RENDER_TTL),
+            "negative": env_int("METADATA_NEGATIVE_TTL", constants.METADATA_NEGATIVE_TTL),
+        }
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, namespace: str, counter: str) -> None:
+        """Increment a per-namespace counter."""
+        with self._lock:
+            counters = self._counters.setdefault(
+                namespace, {"hits": 0, "negative_hits": 0, "misses": 0}
+            )
+            counters[counter] += 1
+
+    def get(self, namespace: str, key: str) -> Any:
+        """Look up a cached result.
+
+        Args:
+            namespace (str): The lookup namespace.
+            key (str): The key within the namespace.
+
+        Returns:
+            Any: The cached value, None for a negatively cached key, or MISS.
+        """
+        value = self.memory.get((namespace, key))
+        if value is MISS and self.store is not None:
+            try:
+                value, expires_at = self.store.get(namespace, key)
+            except sqlite3.Error as e:
+                logger.warning("Metadata store lookup failed: %s", e)
+                value = MISS
+            if value is not MISS:
+                # Promote to the memory tier for subsequent lookups.
+                self.memory.set((namespace, key), value, expires_at)
+
+        if value is MISS:
+            self._count(namespace, "misses")
+        elif value is None:
+            self._count(namespace, "negative_hits")
+        else:
+            self._count(namespace, "hits")
+        return value
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Cache a result in every tier.
+
+        Args:
+            namespace (str): The lookup namespace.
+            key (str): The key within the namespace.
+            value (Any): A JSON-serialisable value; None marks the key as unavailable.
+            ttl (Optional[float]): Seconds the entry stays valid. Defaults to the
+                namespace's TTL.
+        """
+        if ttl is None:
+            ttl = self.ttls[namespace]
+        expires_at = time.time() + ttl
+        self.memory.set((namespace, key), value, expires_at)
+        if self.store is not None:
+            try:
+                self.store.set(namespace, key, value, expires_at)
+            except sqlite3.Error as e:
+                logger.warning("Metadata store write failed: %s", e)
+
+    def set_negative(
+        self,
+        namespace: str,
+        key: str,
+        status: Optional[int] = None,
+        authenticated: bool = False,
+    ) -> bool:
+        """Remember that a key is private, deleted or otherwise unavailable.
+
+        The entry is kept in the memory tier only, so it never outlives the process
+        (or a fixed cookie after a restart).
+
+        Args:
+            namespace (str): The lookup namespace.
+            key (str): The key within the namespace.
+            status (Optional[int]): The HTTP status of the failed lookup, or None if the
+                response itself showed the key is unusable (e.g. not a clothing asset).
+            authenticated (bool): Whether the failed request carried a cookie.
+
+        Returns:
+            bool: Whether the key was cached; False for statuses that say nothing
+            about the key.
+        """
+        if status is not None:
+            allowed = NEGATIVE_STATUSES if authenticated else UNAUTHENTICATED_NEGATIVE_STATUSES
+            if status not in allowed:
+                return False
+        self.memory.set((namespace, key), None, time.time() + self.ttls["negative"])
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-namespace hit/miss counters and tier information.
+
+        Returns:
+            Dict[str, Any]: Cache counters.
+        """
+        with self._lock:
+            namespaces = {name: dict(counters) for name, counters in self._counters.items()}
+        return {
+            "memory_entries": len(self.memory),
+            "persistent": self.store is not None,
+            "namespaces": namespaces,
+        }
+
+
+_metadata_cache: Optional[MetadataCache] = None
+_metadata_cache_lock = threading.Lock()
+
+
+def get_metadata_cache() -> MetadataCache:
+    """Return the process-wide MetadataCache, creating it on first use.
+
+    The SQLite tier is enabled unless `METADATA_CACHE_PERSIST` is set to 0; if the
+    database can't be opened the cache silently runs memory-only.
+
+    Returns:
+        MetadataCache: The shared cache instance.
+    """
+    global _metadata_cache  # pylint: disable=global-statement
+    if _metadata_cache is None:
+        with _metadata_cache_lock:
+            if _metadata_cache is None:
+                memory = TTLCache(
+                    env_int("METADATA_CACHE_MAX_ENTRIES", constants.METADATA_CACHE_MAX_ENTRIES)
+                )
+                store = None
+                if env_int("METADATA_CACHE_PERSIST", constants.METADATA_CACHE_PERSIST):
+                    path = os.path.join(
+                        FileHandler.create_download_directory(), constants.METADATA_CACHE_DB
+                    )
+                    try:
+                        store = SQLiteStore(path)
+                        store.purge_expired()
+                    except sqlite3.Error as e:
+                        logger.warning("Metadata cache running memory-only: %s", e)
+                        store = None
+                _metadata_cache = MetadataCache(memory, store)
+    return _metadata_cache
@@ -0,0 +1,340 @@
+"""
+This module records where download time goes and exposes it in the Prometheus text format.
+
+The hot paths time themselves with the process-wide registry:
+
+    with get_metrics().time(STAGE_SECONDS, stage="asset_xml") as timer:
+        data = await fetch(...)
+        timer.set(asset_type="shirt")
+
+Histograms are kept per label set (stage and asset type for the download pipeline,
+host and status for Roblox API requests), and counters count events like retries.
+The registry's output also includes the operational counters the other components
+already keep (connection pool, rate limiter, caches, render pool, jobs), converted
+from their `stats()` dictionaries when /metrics is scraped.
+
+Set METRICS_ENABLED=0 to turn recording off: `time` then returns a shared no-op
+timer and `observe`/`inc` return immediately, so instrumented code costs one
+attribute check.
+
+Classes:
+    Histogram: Cumulative bucket counts, sum and count for each label set.
+    MetricsRegistry: Holds histograms and counters and renders them.
+
+Functions:
+    get_metrics: Returns the process-wide MetricsRegistry instance.
+
+metrics.py
+"""
+
+import bisect
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import constants
+from utils import env_int
+
+# Metric names used by the instrumented modules
+STAGE_SECONDS = "roblox_downloader_stage_seconds"
+HTTP_REQUEST_SECONDS = "roblox_downloader_http_request_seconds"
+HTTP_RETRIES = "roblox_downloader_http_retries_total"
+
+HELP = {
+    STAGE_SECONDS: "Time spent in each stage of the asset download pipeline.",
+    HTTP_REQUEST_SECONDS: "Duration of each Roblox API request attempt.",
+    HTTP_RETRIES: "Roblox API request attempts that were retried, by reason.",
+}
+
+# Component stats (see `render`): keys under these paths are label values, not names.
+STATS_LABELS = {
+    "rate_limits": "host",
+    "metadata_cache.namespaces": "namespace",
+}
+# Stats that only ever increase, by path; the rest are reported as gauges.
+STATS_COUNTERS = {
+    "rate_limits.*.successes",
+    "rate_limits.*.throttles",
+    "output_cache.hits",
+    "output_cache.misses",
+    "output_cache.evictions",
+    "output_cache.expirations",
+    "metadata_cache.namespaces.*.hits",
+    "metadata_cache.namespaces.*.negative_hits",
+    "metadata_cache.namespaces.*.misses",
+    "persistence.written",
+    "persistence.linked",
+    "persistence.failed",
+    "connection_pool.connections_created",
+    "connection_pool.connections_reused",
+    "logging.dropped",
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    """A hashable, ordered form of a label set."""
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    """Render a label set as `{name="value",...}` (empty string if there are none)."""
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (
+        value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for _, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value; integers without a trailing `.0`."""
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    """
+    Cumulative bucket counts, sum and count for each label set.
+
+    Attributes:
+        buckets (Tuple[float, ...]): Upper bounds in seconds, ascending; +Inf is implied.
+    """
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, key: LabelKey, value: float) -> None:
+        """Record one observation. The caller holds the registry's lock."""
+        series = self._series.get(key)
+        if series is None:
+            # One slot per bucket plus +Inf, then the sum.
+            series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self, name: str) -> Iterator[str]:
+        """Yield the exposition lines for every label set."""
+        for key, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f"{name}_bucket{_format_labels(key, ('le', repr(float(bound))))} {cumulative}"
+            cumulative += series[len(self.buckets)]
+            yield f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {cumulative}"
+            yield f"{name}_sum{_format_labels(key)} {_format_value(series[-1])}"
+            yield f"{name}_count{_format_labels(key)} {cumulative}"
+
+
+class _Timer:
+    """Times a `with` (or `async with`) block and records it in a histogram."""
+
+    __slots__ = ("_registry", "_name", "_labels", "_started")
+
+    def __init__(self, registry: "MetricsRegistry", name: str, labels: Dict[str, Any]) -> None:
+        self._registry = registry
+        self._name = name
+        self._labels = labels
+        self._started = 0.0
+
+    def set(self, **labels: Any) -> None:
+        """Add or change labels learned inside the block, e.g. a response status."""
+        self._labels.update(labels)
+
+    def __enter__(self) -> "_Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self._labels.setdefault("status", "ok")
+        elif issubclass(exc_type, TimeoutError):
+            self._labels["status"] = "timeout"
+        else:
+            self._labels.setdefault("status", "error")
+        self._registry.observe(self._name, time.perf_counter() - self._started, **self._labels)
+
+    async def __aenter__(self) -> "_Timer":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.__exit__(exc_type, exc, tb)
+
+
+class _NullTimer:
+    """The timer handed out while metrics are disabled."""
+
+    __slots__ = ()
+
+    def set(self, **labels: Any) -> None:
+        """Ignored."""
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+    async def __aenter__(self) -> "_NullTimer":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """
+    Holds the process's histograms and counters and renders them for scraping.
+
+    Attributes:
+        enabled (bool): Whether observations are recorded.
+        buckets (Tuple[float, ...]): Histogram bucket bounds, in seconds.
+    """
+
+    def __init__(
+        self, enabled: Optional[bool] = None, buckets: Optional[Sequence[float]] = None
+    ) -> None:
+        if enabled is None:
+            enabled = bool(env_int("METRICS_ENABLED", constants.METRICS_ENABLED))
+        self.enabled = enabled
+        self.buckets = tuple(buckets or constants.METRICS_BUCKETS)
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+
+    def time(self, name: str, **labels: Any):
+        """
+        Times a `with` block into the histogram `name`.
+
+        Unless the block sets a status label, it gets status="ok", or "error" if the
+        block raised ("timeout" for timeouts, whatever status was set).
+
+        Args:
+            name (str): The histogram's metric name.
+            **labels: The observation's labels; more can be added with `set`.
+
+        Returns:
+            A context manager whose `set(**labels)` adds labels before it records.
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """
+        Records one observation in the histogram `name`.
+
+        Args:
+            name (str): The histogram's metric name.
+            value (float): The observed duration, in seconds.
+            **labels: The observation's labels.
+        """
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(self.buckets)
+            histogram.observe(key, value)
+
+    def inc(self, name: str, amount: float = 1, **labels: Any) -> None:
+        """
+        Increments the counter `name`.
+
+        Args:
+            name (str): The counter's metric name.
+            amount (float): How much to add.
+            **labels: The counter's labels.
+        """
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def render(self, component_stats: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Renders every metric in the Prometheus text exposition format (version 0.0.4).
+
+        Args:
+            component_stats (Optional[Dict[str, Any]]): The components' `stats()`
+                dictionaries by component name, as served by /api/stats. Numeric
+                leaves become `roblox_downloader_<component>_<key>` gauges or counters.
+
+        Returns:
+            str: The exposition text.
+        """
+        lines: List[str] = []
+        with self._lock:
+            for name, histogram in sorted(self._histograms.items()):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                lines.extend(histogram.samples(name))
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+
+        families: Dict[str, List[Tuple[LabelKey, float]]] = {}
+        for component, stats in (component_stats or {}).items():
+            self._flatten(component, component, stats, {}, families)
+        for name, samples in sorted(families.items()):
+            kind = "counter" if name.rsplit("_", 1)[-1] == "total" else "gauge"
+            lines.append(f"# TYPE {name} {kind}")
+            for key, value in samples:
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _flatten(
+        self,
+        path: str,
+        name: str,
+        value: Any,
+        labels: Dict[str, str],
+        families: Dict[str, List[Tuple[LabelKey, float]]],
+    ) -> None:
+        """Turn a nested stats dictionary into metric samples."""
+        if isinstance(value, dict):
+            label = STATS_LABELS.get(path)
+            for key, child in value.items():
+                if label:
+                    self._flatten(path + ".*", name, child, {**labels, label: key}, families)
+                else:
+                    self._flatten(f"{path}.{key}", f"{name}_{key}", child, labels, families)
+            return
+        if not isinstance(value, (int, float)):
+            # Strings (versions, modes) aren't samples.
+            return
+        metric = "roblox_downloader_" + name
+        if path in STATS_COUNTERS:
+            metric += "_total"
+        families.setdefault(metric, []).append((_label_key(labels), float(value)))
+
+
+_metrics: Optional[MetricsRegistry] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Return the process-wide MetricsRegistry, creating it on first use.
+
+    Returns:
+        MetricsRegistry: The shared registry.
+    """
+    global _metrics  # pylint: disable=global-statement
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = MetricsRegistry()
+    return _metrics
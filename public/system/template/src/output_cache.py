@@ -0,0 +1,327 @@
+"""
+This module provides the rendered-output cache that sits in front of the download pipeline.
+
+Rendered images already live in `DOWNLOADS_DIR` as `{asset_id}.png`; the cache turns
+that directory into a bounded LRU store. Entries are keyed on the asset ID, the encode
+profile and an output version, which is derived from `OUTPUT_VERSION` and
+the bytes of the clothing templates. When the version changes (new templates or rendering logic),
+previously rendered files are discarded rather than served.
+
+Assets that share a template have their files hardlinked to one another (see
+`output_writer`). Sizes are accounted per inode, so a file with several names counts
+once against `OUTPUT_CACHE_MAX_BYTES`, and frees its space when its last name goes.
+
+Classes:
+    OutputCache: TTL + size-bounded LRU over the rendered files in a directory.
+
+Functions:
+    get_output_cache: Returns the process-wide OutputCache instance.
+
+output_cache.py
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import constants
+from custom_logger import setup_logger
+from encoder import get_profile
+from file_handler import FileHandler
+from template_registry import ASSETS_DIR
+from utils import env_int
+
+# Set up the logger for this module
+logger = setup_logger(__name__)
+
+# Rendered outputs are named after the numeric asset ID, plus the encode profile for
+# anything but the default PNG (e.g. "123.png", "123-fast.png", "123-webp.webp");
+# anything else in the directory is left alone.
+_OUTPUT_FILE_PATTERN = re.compile(r"^\d+(-[a-z]+)?\.(png|webp|avif)$")
+_VERSION_STAMP = ".output_version"
+
+
+def compute_output_version() -> str:
+    """Compute the version stamp for rendered outputs.
+
+    Returns:
+        str: A short hash of `OUTPUT_VERSION` and every clothing template file.
+    """
+    digest = hashlib.sha256(os.getenv("OUTPUT_VERSION", constants.OUTPUT_VERSION).encode())
+    for template in sorted(ASSETS_DIR.glob("*.png")):
+        digest.update(template.name.encode())
+        digest.update(template.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class OutputCache:
+    """
+    A TTL and size-bounded LRU cache of rendered images on disk.
+
+    Attributes:
+        directory (str): The directory holding the rendered files.
+        ttl (int): Seconds a rendered file stays valid.
+        max_bytes (int): Total size the cached files may occupy.
+        max_entries (int): Maximum number of cached files.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        ttl: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        max_entries: Optional[int] = None,
+    ) -> None:
+        self.directory = directory or FileHandler.create_download_directory()
+        self.ttl = ttl or env_int("OUTPUT_CACHE_TTL", constants.OUTPUT_CACHE_TTL)
+        self.max_bytes = max_bytes or env_int(
+            "OUTPUT_CACHE_MAX_BYTES", constants.OUTPUT_CACHE_MAX_BYTES
+        )
+        self.max_entries = max_entries or env_int(
+            "OUTPUT_CACHE_MAX_ENTRIES", constants.OUTPUT_CACHE_MAX_ENTRIES
+        )
+
+        self._lock = threading.Lock()
+        # filename -> (size, (st_dev, st_ino)); names hardlinked together share an inode
+        self._entries: "OrderedDict[str, Tuple[int, Tuple[int, int]]]" = OrderedDict()
+        self._inode_names: Dict[Tuple[int, int], int] = {}  # inode -> names cached
+        self._total_bytes = 0
+        self._loaded = False
+        self.version = ""
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def filename_for(asset_id: str, profile: str = "default") -> str:
+        """Return the file name used for an asset's rendered output.
+
+        Args:
+            asset_id (str): The numeric asset ID.
+            profile (str): The encode profile the output was encoded with.
+
+        Returns:
+            str: The output file name.
+        """
+        encode_profile = get_profile(profile)
+        if encode_profile.name == "default":
+            return f"{asset_id}.png"
+        return f"{asset_id}-{encode_profile.name}.{encode_profile.extension}"
+
+    def path_for(self, asset_id: str, profile: str = "default") -> str:
+        """Return the full path of an asset's rendered output.
+
+        Args:
+            asset_id (str): The numeric asset ID.
+            profile (str): The encode profile the output was encoded with.
+
+        Returns:
+            str: The output file path (which may not exist).
+        """
+        return os.path.join(self.directory, self.filename_for(asset_id, profile))
+
+    def etag_for(self, asset_id: str, profile: str = "default") -> str:
+        """Return the HTTP entity tag of an asset's rendered output.
+
+        It only depends on the asset ID, the encode profile and the output version,
+        so a client's cached copy can be validated before anything is rendered.
+
+        Args:
+            asset_id (str): The numeric asset ID.
+            profile (str): The encode profile.
+
+        Returns:
+            str: The (unquoted) entity tag.
+        """
+        with self._lock:
+            self._ensure_loaded()
+        return f"{asset_id}-{get_profile(profile).name}-{self.version}"
+
+    def _ensure_loaded(self, keep: Optional[str] = None) -> None:
+        """Index the directory on first use. Must be called with the lock held.
+
+        If the stored version stamp doesn't match the current output version, the
+        existing rendered files are stale and are removed.
+
+        Args:
+            keep (Optional[str]): A file just rendered by this version, never discarded.
+        """
+        if self._loaded:
+            return
+        self._loaded = True
+        self.version = compute_output_version()
+
+        stamp_path = os.path.join(self.directory, _VERSION_STAMP)
+        try:
+            with open(stamp_path, "r", encoding="utf-8") as stamp:
+                stored_version = stamp.read().strip()
+        except OSError:
+            stored_version = ""
+
+        files = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and _OUTPUT_FILE_PATTERN.match(entry.name):
+                    files.append((entry.stat().st_mtime, entry.name, entry.stat()))
+
+        if stored_version != self.version:
+            stale = [name for _, name, _ in files if name != keep]
+            if stale:
+                logger.info("Output version changed; discarding %d rendered files.", len(stale))
+            for name in stale:
+                self._remove_file(name)
+            with open(stamp_path, "w", encoding="utf-8") as stamp:
+                stamp.write(self.version)
+            return
+
+        # Oldest first so the OrderedDict front is the least recently used entry.
+        for _, name, stat in sorted(files, key=lambda file: file[:2]):
+            self._add_locked(name, stat)
+        self._evict_locked()
+
+    def _remove_file(self, name: str) -> None:
+        """Delete a cached file, ignoring files that are already gone."""
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except FileNotFoundError:
+            pass
+
+    def _add_locked(self, name: str, stat: os.stat_result) -> None:
+        """Index a file as the most recently used entry. Must be called with the lock held."""
+        self._forget_locked(name)
+        inode = (stat.st_dev, stat.st_ino)
+        self._entries[name] = (stat.st_size, inode)
+        if inode not in self._inode_names:
+            self._total_bytes += stat.st_size
+        self._inode_names[inode] = self._inode_names.get(inode, 0) + 1
+
+    def _forget_locked(self, name: str) -> None:
+        """Remove an entry from the index (not the disk). Must be called with the lock held."""
+        entry = self._entries.pop(name, None)
+        if entry is None:
+            return
+        size, inode = entry
+        remaining = self._inode_names.pop(inode) - 1
+        if remaining:
+            self._inode_names[inode] = remaining
+        else:
+            self._total_bytes -= size
+
+    def _drop_locked(self, name: str) -> None:
+        """Forget an entry and delete its file. Must be called with the lock held."""
+        self._forget_locked(name)
+        self._remove_file(name)
+
+    def _evict_locked(self) -> None:
+        """Evict least recently used entries until within bounds. Must hold the lock."""
+        while self._entries and (
+            self._total_bytes > self.max_bytes or len(self._entries) > self.max_entries
+        ):
+            name = next(iter(self._entries))
+            self._drop_locked(name)
+            self.evictions += 1
+            logger.debug("Evicted %s from the output cache.", name)
+
+    def get(self, asset_id: str, profile: str = "default") -> Optional[str]:
+        """Look up an asset's rendered output.
+
+        A hit never touches the network; it only stats the file and refreshes its
+        position in the LRU order.
+
+        Args:
+            asset_id (str): The numeric asset ID.
+            profile (str): The encode profile to look up.
+
+        Returns:
+            Optional[str]: The path of the cached file, or None on a miss.
+        """
+        name = self.filename_for(asset_id, profile)
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            self._ensure_loaded()
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # Another process may have evicted it; keep the index honest.
+                self._forget_locked(name)
+                self.misses += 1
+                return None
+
+            if time.time() - stat.st_mtime > self.ttl:
+                self._drop_locked(name)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            if name not in self._entries:
+                # Rendered by another process sharing the directory.
+                self._add_locked(name, stat)
+            else:
+                self._entries.move_to_end(name)
+            self.hits += 1
+        return path
+
+    def put(self, asset_id: str, profile: str = "default") -> Optional[str]:
+        """Register a freshly rendered output and evict entries if over budget.
+
+        Args:
+            asset_id (str): The numeric asset ID whose file was just written.
+            profile (str): The encode profile the file was encoded with.
+
+        Returns:
+            Optional[str]: The path of the cached file, or None if it doesn't exist.
+        """
+        name = self.filename_for(asset_id, profile)
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            self._ensure_loaded(keep=name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                return None
+            self._add_locked(name, stat)
+            self._evict_locked()
+            return path if name in self._entries else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters and current occupancy.
+
+        Returns:
+            Dict[str, Any]: Hit, miss, eviction and expiration counts plus sizes.
+        """
+        with self._lock:
+            return {
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_output_cache: Optional[OutputCache] = None
+_output_cache_lock = threading.Lock()
+
+
+def get_output_cache() -> OutputCache:
+    """Return the process-wide OutputCache, creating it on first use.
+
+    Returns:
+        OutputCache: The shared cache instance.
+    """
+    global _output_cache  # pylint: disable=global-statement
+    if _output_cache is None:
+        with _output_cache_lock:
+            if _output_cache is None:
+                _output_cache = OutputCache()
+    return _output_cache
@@ -0,0 +1,210 @@
+"""
+This module persists rendered assets to disk in the background.
+
+The download pipeline hands its result to the caller in memory; writing the file to
+`DOWNLOADS_DIR` (and registering it with the output cache) is a separate, optional
+step that runs on a small dedicated thread pool so it never delays a response. Until
+a write lands, the result stays available from memory, so a request arriving in the
+meantime doesn't render the asset again.
+
+A result shared from another asset with the same template (see `RenderedAsset.shared_from`)
+is hardlinked to that asset's file, so the image is stored once however many catalog
+items use it. If the source's own write is still pending, the link is made right after it.
+
+Persistence is enabled unless the `PERSIST_OUTPUTS` environment variable is set to 0.
+
+Classes:
+    OutputWriter: Writes rendered assets to the output cache directory asynchronously.
+
+Functions:
+    get_output_writer: Returns the process-wide OutputWriter instance.
+    shutdown_output_writer: Waits for pending writes and stops the writer threads.
+
+output_writer.py
+"""
+
+import concurrent.futures
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import constants
+from custom_logger import setup_logger
+from file_handler import FileHandler
+from output_cache import OutputCache
+from rendered_asset import RenderedAsset
+from utils import env_int
+
+# Set up the logger for this module
+logger = setup_logger(__name__)
+
+# The arguments of one `_write`: the cache, the result and its (directory, file name) key.
+_Write = Tuple[OutputCache, RenderedAsset, Tuple[str, str]]
+
+
+class OutputWriter:
+    """
+    Writes rendered assets to an output cache's directory on a dedicated thread pool.
+
+    Attributes:
+        enabled (bool): Whether results are persisted at all.
+        workers (int): The number of writer threads.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None, workers: Optional[int] = None) -> None:
+        if enabled is None:
+            enabled = bool(env_int("PERSIST_OUTPUTS", constants.PERSIST_OUTPUTS))
+        self.enabled = enabled
+        self.workers = workers or env_int("PERSIST_WORKERS", constants.PERSIST_WORKERS)
+        self._lock = threading.Lock()
+        self._pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        # (cache directory, file name) -> result still waiting to be written
+        self._pending: Dict[Tuple[str, str], RenderedAsset] = {}
+        # (cache directory, file name) of a pending write -> shared results to link to it
+        self._followers: Dict[Tuple[str, str], List[_Write]] = {}
+        self.written = 0
+        self.linked = 0
+        self.failed = 0
+
+    def _get_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        """Start the writer threads on first use. Must hold the lock."""
+        if self._pool is None:
+            self._pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="persist"
+            )
+        return self._pool
+
+    def pending(self, cache: OutputCache, filename: str) -> Optional[RenderedAsset]:
+        """
+        Returns a result that has been submitted but not yet written.
+
+        Args:
+            cache (OutputCache): The cache the result is being written to.
+            filename (str): The result's file name in the cache.
+
+        Returns:
+            Optional[RenderedAsset]: The in-memory result, or None.
+        """
+        with self._lock:
+            return self._pending.get((cache.directory, filename))
+
+    def submit(
+        self, cache: OutputCache, result: RenderedAsset
+    ) -> Optional[concurrent.futures.Future]:
+        """
+        Schedules a result to be written to the cache directory and registered with it.
+
+        Args:
+            cache (OutputCache): The cache to store the result in.
+            result (RenderedAsset): The rendered asset.
+
+        Returns:
+            Optional[concurrent.futures.Future]: The pending write, or None if
+            persistence is disabled.
+        """
+        if not self.enabled:
+            return None
+        key = (cache.directory, cache.filename_for(result.asset_id, result.profile))
+        with self._lock:
+            self._pending[key] = result
+            return self._get_pool().submit(self._write, cache, result, key)
+
+    def _write(self, cache: OutputCache, result: RenderedAsset, key: Tuple[str, str]) -> None:
+        """Write (or link) one result and register it with the cache."""
+        if result.shared_from:
+            source_key = (cache.directory, cache.filename_for(result.shared_from, result.profile))
+            with self._lock:
+                if source_key in self._pending:
+                    # Link once the source's file exists; its writer thread does that.
+                    self._followers.setdefault(source_key, []).append((cache, result, key))
+                    return
+        path = cache.path_for(result.asset_id, result.profile)
+        try:
+            if result.shared_from and self._link(cache, result, path):
+                self.linked += 1
+                logger.debug("Linked %s to the render of %s.", key[1], result.shared_from)
+            else:
+                FileHandler.write_atomic(path, result.data)
+                self.written += 1
+                logger.debug("Persisted %s to the output cache.", key[1])
+            cache.put(result.asset_id, result.profile)
+        except OSError as e:
+            self.failed += 1
+            logger.error("Failed to persist %s: %s", key[1], e)
+        finally:
+            with self._lock:
+                if self._pending.get(key) is result:
+                    del self._pending[key]
+                followers = self._followers.pop(key, [])
+            for follower in followers:
+                self._write(*follower)
+
+    @staticmethod
+    def _link(cache: OutputCache, result: RenderedAsset, path: str) -> bool:
+        """Hardlink a shared result to its source's file; False if that isn't possible."""
+        source = cache.path_for(result.shared_from, result.profile)
+        try:
+            if os.path.getsize(source) != len(result.data):
+                # The source asset has been rendered differently since; don't link it.
+                return False
+            with open(source, "rb") as file:
+                if file.read() != result.data:
+                    return False
+            FileHandler.link_atomic(source, path)
+        except OSError:
+            # Evicted, failed to write, or links unsupported: write the bytes instead.
+            return False
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns write counters.
+
+        Returns:
+            Dict[str, int]: Pending, written, linked and failed write counts.
+        """
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "enabled": int(self.enabled),
+            "pending": pending,
+            "written": self.written,
+            "linked": self.linked,
+            "failed": self.failed,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stops the writer threads; they restart on the next submission.
+
+        Args:
+            wait (bool): Whether to wait for pending writes to finish.
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+_output_writer: Optional[OutputWriter] = None
+_output_writer_lock = threading.Lock()
+
+
+def get_output_writer() -> OutputWriter:
+    """Return the process-wide OutputWriter, creating it on first use.
+
+    Returns:
+        OutputWriter: The shared writer instance.
+    """
+    global _output_writer  # pylint: disable=global-statement
+    if _output_writer is None:
+        with _output_writer_lock:
+            if _output_writer is None:
+                _output_writer = OutputWriter()
+    return _output_writer
+
+
+def shutdown_output_writer() -> None:
+    """Wait for pending writes and stop the process-wide writer, if it was started."""
+    if _output_writer is not None:
+        _output_writer.shutdown()
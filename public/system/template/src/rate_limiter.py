@@ -0,0 +1,274 @@
+"""
+This module provides a shared, per-host rate limiter for outgoing Roblox requests.
+
+Each host gets a token bucket that paces request starts and an AIMD (additive
+increase, multiplicative decrease) controller that adapts both the bucket rate and
+the number of concurrent requests. Successful responses slowly ramp throughput up;
+429 and 5xx responses cut it sharply, so the limiter settles near the highest rate
+Roblox tolerates instead of reacting to rate limits only after the fact.
+
+Classes:
+    TokenBucket: Paces request starts to a configurable rate with a burst allowance.
+    HostLimiter: Combines a TokenBucket with an AIMD-controlled concurrency gate.
+    RateLimiter: Registry of HostLimiters keyed by host name.
+
+Functions:
+    get_rate_limiter: Returns the process-wide RateLimiter instance.
+
+rate_limiter.py
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import constants
+from concurrency import AsyncGate
+from custom_logger import setup_logger
+
+# Set up the logger for this module
+logger = setup_logger(__name__)
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket that paces callers to `rate` acquisitions per second.
+
+    Callers reserve a token up front and sleep until it becomes available, so
+    waiters are served in order without polling.
+    """
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self._rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        """float: The refill rate in tokens per second."""
+        return self._rate
+
+    @property
+    def tokens(self) -> float:
+        """float: Tokens currently available (negative while callers are queued)."""
+        with self._lock:
+            self._refill_locked()
+            return self._tokens
+
+    def set_rate(self, rate: float) -> None:
+        """Change the refill rate.
+
+        Args:
+            rate (float): The new rate in tokens per second.
+        """
+        with self._lock:
+            self._refill_locked()
+            self._rate = rate
+
+    def _refill_locked(self) -> None:
+        """Add the tokens accrued since the last update. Must hold the lock."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Reserve one token, sleeping until it is available."""
+        with self._lock:
+            self._refill_locked()
+            self._tokens -= 1
+            wait_time = -self._tokens / self._rate if self._tokens < 0 else 0.0
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+
+
+class HostLimiter:
+    """
+    Token-bucket pacing plus AIMD concurrency control for a single host.
+
+    Attributes:
+        host (str): The host name this limiter applies to.
+        bucket (TokenBucket): Paces request starts.
+        gate (AsyncGate): Bounds the number of in-flight requests.
+    """
+
+    def __init__(self, host: str, settings: Dict[str, float]) -> None:
+        self.host = host
+        self.min_rate = settings["min_rate"]
+        self.max_rate = settings["max_rate"]
+        self.min_concurrency = settings["min_concurrency"]
+        self.max_concurrency = settings["max_concurrency"]
+
+        self.bucket = TokenBucket(settings["rate"], settings["burst"])
+        self._concurrency = float(settings["concurrency"])
+        self.gate = AsyncGate(int(self._concurrency))
+
+        self._lock = threading.Lock()
+        self._last_decrease = 0.0
+        self.successes = 0
+        self.throttles = 0
+
+    def on_success(self) -> None:
+        """Additively increase rate and concurrency after a successful response."""
+        with self._lock:
+            self.successes += 1
+            self._concurrency = min(
+                self.max_concurrency,
+                self._concurrency + constants.AIMD_INCREASE / self._concurrency,
+            )
+            rate = self.bucket.rate
+            new_rate = min(self.max_rate, rate + constants.AIMD_INCREASE / rate)
+        self.bucket.set_rate(new_rate)
+        self.gate.set_limit(int(self._concurrency))
+
+    def on_throttle(self) -> None:
+        """Multiplicatively decrease rate and concurrency after a 429/5xx response.
+
+        Decreases are applied at most once per `AIMD_COOLDOWN` seconds so that a burst
+        of throttled responses from requests already in flight counts as one signal.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.throttles += 1
+            if now - self._last_decrease < constants.AIMD_COOLDOWN:
+                return
+            self._last_decrease = now
+            self._concurrency = max(
+                self.min_concurrency, self._concurrency * constants.AIMD_DECREASE
+            )
+            new_rate = max(self.min_rate, self.bucket.rate * constants.AIMD_DECREASE)
+        self.bucket.set_rate(new_rate)
+        self.gate.set_limit(int(self._concurrency))
+        logger.warning(
+            "Throttled by %s; backing off to %.2f req/s, concurrency %d",
+            self.host,
+            new_rate,
+            int(self._concurrency),
+        )
+
+    def record(self, status: Optional[int]) -> None:
+        """Feed a response status back into the controller.
+
+        Args:
+            status (Optional[int]): The HTTP status, or None if the request never
+                                    produced a response (network error, timeout).
+        """
+        if status is None:
+            return
+        if status == 429 or status >= 500:
+            self.on_throttle()
+        elif status < 400:
+            self.on_success()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the limiter's current settings and counters.
+
+        Returns:
+            Dict[str, Any]: Current rate, concurrency and request counters.
+        """
+        return {
+            "rate": round(self.bucket.rate, 3),
+            "tokens": round(self.bucket.tokens, 3),
+            "concurrency_limit": self.gate.limit,
+            "in_flight": self.gate.in_use,
+            "waiting": self.gate.waiting,
+            "successes": self.successes,
+            "throttles": self.throttles,
+        }
+
+
+class _Permit:
+    """Handle given to a request holding a HostLimiter slot."""
+
+    def __init__(self) -> None:
+        self.status: Optional[int] = None
+
+    def record(self, status: int) -> None:
+        """Record the response status to feed back into the controller."""
+        self.status = status
+
+
+class RateLimiter:
+    """
+    A registry of per-host limiters shared by every APIHandler.
+    """
+
+    def __init__(self, host_settings: Optional[Dict[str, Dict[str, float]]] = None) -> None:
+        self._host_settings = host_settings or constants.HOST_RATE_LIMITS
+        self._hosts: Dict[str, HostLimiter] = {}
+        self._lock = threading.Lock()
+
+    def for_host(self, host: str) -> HostLimiter:
+        """Get or create the limiter for a host.
+
+        Args:
+            host (str): The host name.
+
+        Returns:
+            HostLimiter: The host's limiter.
+        """
+        limiter = self._hosts.get(host)
+        if limiter is None:
+            with self._lock:
+                limiter = self._hosts.get(host)
+                if limiter is None:
+                    settings = dict(self._host_settings["default"])
+                    settings.update(self._host_settings.get(host, {}))
+                    limiter = HostLimiter(host, settings)
+                    self._hosts[host] = limiter
+        return limiter
+
+    @asynccontextmanager
+    async def limit(self, url: str) -> AsyncIterator[_Permit]:
+        """Hold a rate-limited slot for a request to `url`.
+
+        Usage:
+            async with rate_limiter.limit(url) as permit:
+                async with session.get(url) as response:
+                    permit.record(response.status)
+
+        Args:
+            url (str): The request URL; its host selects the limiter.
+
+        Yields:
+            _Permit: Record the response status on it so the controller can adapt.
+        """
+        limiter = self.for_host(urlsplit(url).hostname or "")
+        await limiter.gate.acquire()
+        permit = _Permit()
+        try:
+            await limiter.bucket.acquire()
+            yield permit
+        finally:
+            limiter.gate.release()
+            limiter.record(permit.status)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return the current rates and counters for every host seen so far.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Per-host limiter snapshots.
+        """
+        return {host: limiter.snapshot() for host, limiter in list(self._hosts.items())}
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide RateLimiter, creating it on first use.
+
+    Returns:
+        RateLimiter: The shared limiter instance.
+    """
+    global _rate_limiter  # pylint: disable=global-statement
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter()
+    return _rate_limiter
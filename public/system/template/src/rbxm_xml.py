@@ -0,0 +1,84 @@
+"""
+This module extracts clothing template information from Roblox XML (rbxmx) assets.
+
+assetdelivery returns clothing assets as a small XML document such as:
+
+    <roblox ...>
+        <Item class="Shirt" referent="RBX0">
+            <Properties>
+                <Content name="ShirtTemplate">
+                    <url>http://www.roblox.com/asset/?id=123</url>
+                </Content>
+                <string name="Name">Shirt</string>
+            </Properties>
+        </Item>
+    </roblox>
+
+Pants use `PantsTemplate` and t-shirts (`ShirtGraphic` items) use `Graphic`. Only the
+first `<Content name=...><url>...</url>` pair is needed, so it is found with a single
+regular-expression scan instead of building a DOM.
+
+Functions:
+    extract_clothing_content: Returns the content name and template ID from an asset's XML.
+    parse_template_id: Extracts the numeric asset ID from a content URL.
+
+rbxm_xml.py
+"""
+
+import re
+from typing import Optional, Tuple, Union
+
+_CONTENT_PATTERN = (
+    r"""<Content\b[^>]*?\bname\s*=\s*["']([^"']+)["'][^>]*>"""
+    r"""\s*<url>\s*([^<]*?)\s*</url>"""
+)
+_CONTENT_RE = re.compile(_CONTENT_PATTERN, re.IGNORECASE)
+_CONTENT_RE_BYTES = re.compile(_CONTENT_PATTERN.encode(), re.IGNORECASE)
+
+# "http://www.roblox.com/asset/?id=123", "...?id=123&version=2", "rbxassetid://123"
+_TEMPLATE_ID_RE = re.compile(r"(?:[?&]id=|rbxassetid://)(\d+)", re.IGNORECASE)
+
+
+def parse_template_id(content_url: str) -> str:
+    """
+    Extracts the numeric asset ID from a Roblox content URL.
+
+    Args:
+        content_url (str): The text of a `<url>` element.
+
+    Returns:
+        str: The template asset ID, or an empty string if none was found.
+    """
+    if match := _TEMPLATE_ID_RE.search(content_url):
+        return match[1]
+    # Fall back to the digits of a bare ID such as "123".
+    return re.sub(r"[^0-9]", "", content_url)
+
+
+def extract_clothing_content(xml: Union[str, bytes]) -> Optional[Tuple[str, str]]:
+    """
+    Extracts the content name and template ID from a clothing asset's XML.
+
+    Args:
+        xml (Union[str, bytes]): The asset document as returned by assetdelivery.
+
+    Returns:
+        Optional[Tuple[str, str]]: The content name (e.g. "ShirtTemplate", "PantsTemplate",
+        "Graphic") and template ID, or None if the document has no template content.
+    """
+    if isinstance(xml, bytes):
+        byte_match = _CONTENT_RE_BYTES.search(xml)
+        if not byte_match:
+            return None
+        content_name = byte_match[1].decode("utf-8", "replace")
+        content_url = byte_match[2].decode("utf-8", "replace")
+    else:
+        text_match = _CONTENT_RE.search(xml)
+        if not text_match:
+            return None
+        content_name, content_url = text_match[1], text_match[2]
+
+    template_id = parse_template_id(content_url)
+    if not content_name or not template_id:
+        return None
+    return content_name, template_id
@@ -0,0 +1,277 @@
+"""
+This module runs the CPU-bound image stages of the download pipeline off the event loop.
+
+Decoding the downloaded template image, compositing it and encoding the result used
+to run directly on the event loop thread, stalling every other download in flight. The
+render executor hands that work to a thread or process pool instead. Only bytes
+cross the boundary (the downloaded image in, the encoded image out), each worker loads
+the overlay templates once when it starts, and the number of renders submitted at a
+time is bounded so a burst of downloads queues on the loop rather than in the pool.
+
+The pool is configured with environment variables:
+    RENDER_EXECUTOR: "thread" (default), "process" or "inline" (run on the caller).
+    RENDER_WORKERS: Number of workers; 0 (default) uses the CPU count.
+    RENDER_QUEUE_PER_WORKER: Renders that may be queued per worker before callers wait.
+
+Classes:
+    RenderExecutor: Runs render jobs in a bounded thread or process pool.
+
+Functions:
+    render_asset: Decodes, composites and encodes one asset image (the worker job).
+    transcode_asset: Re-encodes a rendered asset with another encode profile.
+    get_render_executor: Returns the process-wide RenderExecutor instance.
+    shutdown_render_executor: Stops the process-wide executor's workers.
+
+render_executor.py
+"""
+
+import asyncio
+import concurrent.futures
+import io
+import multiprocessing
+import os
+import threading
+from typing import Any, Callable, Optional
+
+from PIL import Image, UnidentifiedImageError
+
+import constants
+from asset_type import AssetTypeFactory
+from compositor import get_compositor
+from concurrency import AsyncGate
+from custom_logger import setup_logger
+from encoder import encode_image, get_profile
+from metrics import STAGE_SECONDS, get_metrics
+from template_registry import get_template_registry
+from utils import env_int
+
+# Set up the logger for this module
+logger = setup_logger(__name__)
+
+EXECUTOR_MODES = ("thread", "process", "inline")
+
+
+def warm_worker() -> None:
+    """Load the overlay templates (and their compositor data) into this worker."""
+    registry = get_template_registry()
+    registry.preload()
+    compositor = get_compositor()
+    if hasattr(compositor, "prepare"):
+        for name in ("shirt", "pants"):
+            if template := registry.get(name):
+                compositor.prepare(template)
+        for name, size in (
+            ("whitespace", constants.CLOTHING_TEMPLATE_SIZE),
+            ("tshirt", constants.TSHIRT_SIZE),
+        ):
+            if template := registry.get(name, size):
+                compositor.prepare(template)
+
+
+def render_asset(
+    asset_type: str, clothing_id: str, image_bytes: bytes, profile: str = "default"
+) -> Optional[bytes]:
+    """
+    Decodes a downloaded template image, renders it and encodes the result.
+
+    This is the job executed by the pool, so it only takes and returns bytes. The
+    decode, composite and encode stages are timed into the metrics registry of the
+    process running the job, so with RENDER_EXECUTOR=process they aren't reported;
+    the downloader's "render" stage still is.
+
+    Args:
+        asset_type (str): The asset's content name, e.g. "shirt", "pants" or "Graphic".
+        clothing_id (str): The asset ID.
+        image_bytes (bytes): The downloaded template image.
+        profile (str): The encode profile to encode the result with.
+
+    Returns:
+        Optional[bytes]: The encoded image, or None if the image couldn't be rendered.
+    """
+    metrics = get_metrics()
+    try:
+        with metrics.time(STAGE_SECONDS, stage="decode", asset_type=asset_type):
+            asset_img = Image.open(io.BytesIO(image_bytes))
+            asset_img.load()  # Force loading of the image
+    except (IOError, OSError, UnidentifiedImageError) as e:
+        logger.error("Error decoding image for asset %s: %s", clothing_id, e)
+        return None
+
+    asset_instance = AssetTypeFactory.create_asset(asset_type, clothing_id, asset_img)
+    if not asset_instance:
+        logger.error("Failed to create asset instance for asset type: %s", asset_type)
+        return None
+
+    with metrics.time(STAGE_SECONDS, stage="composite", asset_type=asset_type):
+        rendered = asset_instance.render()
+    if not rendered:
+        logger.error("Failed to overlay image on %s template.", asset_type)
+        return None
+
+    with metrics.time(STAGE_SECONDS, stage="encode", asset_type=asset_type):
+        return encode_image(rendered, get_profile(profile))
+
+
+def transcode_asset(data: bytes, profile: str) -> Optional[bytes]:
+    """
+    Re-encodes an already rendered (losslessly encoded) asset with another profile.
+
+    Args:
+        data (bytes): The rendered asset, e.g. the default PNG.
+        profile (str): The encode profile to encode the result with.
+
+    Returns:
+        Optional[bytes]: The encoded image, or None if `data` couldn't be decoded.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            rendered = image.convert("RGBA")
+    except (IOError, OSError, UnidentifiedImageError) as e:
+        logger.error("Error decoding rendered image for transcoding: %s", e)
+        return None
+    return encode_image(rendered, get_profile(profile))
+
+
+class RenderExecutor:
+    """
+    Runs render jobs in a bounded thread or process pool.
+
+    Attributes:
+        mode (str): "thread", "process" or "inline".
+        workers (int): The number of pool workers.
+        max_pending (int): Renders submitted to the pool at once; others wait.
+    """
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        workers: Optional[int] = None,
+        queue_per_worker: Optional[int] = None,
+    ) -> None:
+        mode = (mode or os.getenv("RENDER_EXECUTOR", constants.RENDER_EXECUTOR)).lower()
+        if mode not in EXECUTOR_MODES:
+            logger.warning("Unknown RENDER_EXECUTOR %r; using threads.", mode)
+            mode = "thread"
+        self.mode = mode
+        self.workers = workers or env_int("RENDER_WORKERS", constants.RENDER_WORKERS)
+        if self.workers <= 0:
+            self.workers = os.cpu_count() or 1
+        per_worker = queue_per_worker or env_int(
+            "RENDER_QUEUE_PER_WORKER", constants.RENDER_QUEUE_PER_WORKER
+        )
+        self.max_pending = self.workers * max(1, per_worker)
+
+        self._gate = AsyncGate(self.max_pending)
+        self._lock = threading.Lock()
+        self._pool: Optional[concurrent.futures.Executor] = None
+
+    def _get_pool(self) -> concurrent.futures.Executor:
+        """Start the pool on first use."""
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if self.mode == "process":
+                        # "spawn" avoids forking the web server's threads and locks.
+                        self._pool = concurrent.futures.ProcessPoolExecutor(
+                            max_workers=self.workers,
+                            mp_context=multiprocessing.get_context("spawn"),
+                            initializer=warm_worker,
+                        )
+                    else:
+                        self._pool = concurrent.futures.ThreadPoolExecutor(
+                            max_workers=self.workers,
+                            thread_name_prefix="render",
+                            initializer=warm_worker,
+                        )
+                    logger.info("Started %s render pool with %d workers.", self.mode, self.workers)
+        return self._pool
+
+    async def _run(self, func: Callable[..., Optional[bytes]], *args: Any) -> Optional[bytes]:
+        """Run a job in the pool, waiting for a slot if too many are queued."""
+        if self.mode == "inline":
+            return func(*args)
+
+        async with self._gate:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_pool(), func, *args)
+
+    async def render(
+        self, asset_type: str, clothing_id: str, image_bytes: bytes, profile: str = "default"
+    ) -> Optional[bytes]:
+        """
+        Renders an asset in the pool without blocking the event loop.
+
+        Args:
+            asset_type (str): The asset's content name.
+            clothing_id (str): The asset ID.
+            image_bytes (bytes): The downloaded template image.
+            profile (str): The encode profile to encode the result with.
+
+        Returns:
+            Optional[bytes]: The encoded image, or None if the image couldn't be rendered.
+        """
+        return await self._run(render_asset, asset_type, clothing_id, image_bytes, profile)
+
+    async def transcode(self, data: bytes, profile: str) -> Optional[bytes]:
+        """
+        Re-encodes a rendered asset with another profile in the pool.
+
+        Args:
+            data (bytes): The rendered asset.
+            profile (str): The encode profile to encode the result with.
+
+        Returns:
+            Optional[bytes]: The encoded image, or None if `data` couldn't be decoded.
+        """
+        return await self._run(transcode_asset, data, profile)
+
+    def stats(self) -> dict:
+        """
+        Returns the pool configuration and current load.
+
+        Returns:
+            dict: Mode, worker count and in-flight/queued render counts.
+        """
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": self._gate.in_use,
+            "waiting": self._gate.waiting,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stops the pool's workers; it restarts on the next render.
+
+        Args:
+            wait (bool): Whether to wait for running renders to finish.
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+_render_executor: Optional[RenderExecutor] = None
+_render_executor_lock = threading.Lock()
+
+
+def get_render_executor() -> RenderExecutor:
+    """Return the process-wide RenderExecutor, creating it on first use.
+
+    Returns:
+        RenderExecutor: The shared executor instance.
+    """
+    global _render_executor  # pylint: disable=global-statement
+    if _render_executor is None:
+        with _render_executor_lock:
+            if _render_executor is None:
+                _render_executor = RenderExecutor()
+    return _render_executor
+
+
+def shutdown_render_executor() -> None:
+    """Stop the process-wide executor's workers, if it was started."""
+    if _render_executor is not None:
+        _render_executor.shutdown()
@@ -0,0 +1,118 @@
+"""
+This module contains the result object returned by the download pipeline.
+
+`RobloxAssetDownloader.process_asset` returns the encoded image in memory together with
+the metadata needed to serve it, so callers such as the web server can stream it to
+the client directly instead of reading it back from `DOWNLOADS_DIR`.
+
+Classes:
+    RenderedAsset: An encoded, rendered asset image and its metadata.
+
+rendered_asset.py
+"""
+
+from typing import Optional
+
+
+class RenderedAsset:
+    """
+    An encoded, rendered asset image and its metadata. Instances are immutable and
+    may be shared between every caller waiting on the same asset.
+
+    Attributes:
+        asset_id (str): The numeric asset ID.
+        data (bytes): The encoded image.
+        media_type (str): The image's MIME type.
+        extension (str): The file extension for the image's format.
+        asset_type (Optional[str]): The asset's content name, if known.
+        profile (str): The encode profile the image was encoded with.
+        shared_from (Optional[str]): The asset whose render this is, when another asset
+            with the same template was rendered instead; None if rendered for this one.
+    """
+
+    __slots__ = (
+        "asset_id", "data", "media_type", "extension", "asset_type", "profile", "shared_from"
+    )
+
+    def __init__(
+        self,
+        asset_id: str,
+        data: bytes,
+        media_type: str = "image/png",
+        extension: str = "png",
+        asset_type: Optional[str] = None,
+        profile: str = "default",
+        shared_from: Optional[str] = None,
+    ) -> None:
+        object.__setattr__(self, "asset_id", asset_id)
+        object.__setattr__(self, "data", bytes(data))
+        object.__setattr__(self, "media_type", media_type)
+        object.__setattr__(self, "extension", extension)
+        object.__setattr__(self, "asset_type", asset_type)
+        object.__setattr__(self, "profile", profile)
+        object.__setattr__(self, "shared_from", shared_from)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError("RenderedAsset is immutable")
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return (
+            f"RenderedAsset(asset_id={self.asset_id!r}, profile={self.profile!r}, "
+            f"media_type={self.media_type!r}, size={len(self.data)})"
+        )
+
+    @property
+    def filename(self) -> str:
+        """str: The download file name, e.g. "123.png"."""
+        return f"{self.asset_id}.{self.extension}"
+
+    def shared_as(self, asset_id: str) -> "RenderedAsset":
+        """
+        Returns this render under another asset ID that uses the same template.
+
+        Args:
+            asset_id (str): The numeric ID of the other asset.
+
+        Returns:
+            RenderedAsset: The same image and metadata for `asset_id` (this instance if
+            it already is for `asset_id`).
+        """
+        if asset_id == self.asset_id:
+            return self
+        return RenderedAsset(
+            asset_id,
+            self.data,
+            media_type=self.media_type,
+            extension=self.extension,
+            asset_type=self.asset_type,
+            profile=self.profile,
+            shared_from=self.shared_from or self.asset_id,
+        )
+
+    def view(self) -> memoryview:
+        """
+        Returns a zero-copy view of the encoded image.
+
+        Returns:
+            memoryview: A read-only view of `data`.
+        """
+        return memoryview(self.data)
+
+    @classmethod
+    def from_file(cls, asset_id: str, path: str, **metadata: str) -> "RenderedAsset":
+        """
+        Loads a previously rendered asset from disk.
+
+        Args:
+            asset_id (str): The numeric asset ID.
+            path (str): The file holding the encoded image.
+            **metadata (str): Any of `media_type`, `extension`, `asset_type` or `profile`.
+
+        Returns:
+            RenderedAsset: The asset read from `path`.
+        """
+        with open(path, "rb") as file:
+            return cls(asset_id, file.read(), **metadata)
@@ -0,0 +1,176 @@
+"""
+This module provides the retry policy used by APIHandler for outgoing requests.
+
+Responses are classified by status code so that permanent failures (e.g. a private
+or deleted asset returning 404/403/400) fail immediately, transient failures are
+retried with jittered exponential backoff, and rate-limited responses honour the
+server's `Retry-After` header. Every request also has a total deadline budget so
+that a single call can never hold a worker for longer than the configured time.
+
+Classes:
+    RetryClass: Enum of the ways a response can be treated.
+    PermanentHTTPError: Raised (on request) when a response fails permanently.
+    RetryPolicy: Classifies responses and computes backoff delays within a deadline.
+
+retry_policy.py
+"""
+
+import enum
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import FrozenSet, Optional
+
+import constants
+
+
+class RetryClass(enum.Enum):
+    """
+    Enum representing how a response status should be handled.
+    Attributes:
+        SUCCESS (int): The request succeeded.
+        PERMANENT (int): The request failed and retrying will not help.
+        RETRYABLE (int): The request failed transiently and may be retried.
+        RATE_LIMITED (int): The server asked us to slow down before retrying.
+    """
+
+    SUCCESS = 1
+    PERMANENT = 2
+    RETRYABLE = 3
+    RATE_LIMITED = 4
+
+
+class PermanentHTTPError(Exception):
+    """
+    Raised when a request fails with a status that retrying cannot fix.
+
+    Attributes:
+        url (str): The requested URL.
+        status (int): The HTTP status code.
+    """
+
+    def __init__(self, url: str, status: int) -> None:
+        super().__init__(f"Request to {url} failed permanently with status {status}")
+        self.url = url
+        self.status = status
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a `Retry-After` header value into a number of seconds.
+
+    Args:
+        value (Optional[str]): The header value, either delta-seconds or an HTTP date.
+
+    Returns:
+        Optional[float]: The number of seconds to wait, or None if absent or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """
+    Classifies responses and computes jittered backoff delays within a deadline budget.
+
+    Attributes:
+        max_retries (int): Maximum number of attempts per request.
+        base_delay (float): Base delay in seconds for exponential backoff.
+        max_delay (float): Upper bound in seconds for a single backoff delay.
+        deadline (float): Total time budget in seconds for one request, retries included.
+    """
+
+    RETRYABLE_STATUSES: FrozenSet[int] = frozenset({408, 500, 502, 503, 504})
+    RATE_LIMITED_STATUSES: FrozenSet[int] = frozenset({429})
+
+    def __init__(
+        self,
+        max_retries: int = constants.MAX_RETRIES,
+        base_delay: float = constants.RETRY_BASE_DELAY,
+        max_delay: float = constants.RETRY_MAX_DELAY,
+        deadline: float = constants.RETRY_DEADLINE,
+    ) -> None:
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def classify(self, status: int) -> RetryClass:
+        """Classify a response status code.
+
+        Args:
+            status (int): The HTTP status code.
+
+        Returns:
+            RetryClass: How the response should be handled.
+        """
+        if 200 <= status < 300:
+            return RetryClass.SUCCESS
+        if status in self.RATE_LIMITED_STATUSES:
+            return RetryClass.RATE_LIMITED
+        if status in self.RETRYABLE_STATUSES:
+            return RetryClass.RETRYABLE
+        return RetryClass.PERMANENT
+
+    def backoff(self, attempt: int) -> float:
+        """Compute a "full jitter" exponential backoff delay for the given attempt.
+
+        Args:
+            attempt (int): The zero-based attempt number that just failed.
+
+        Returns:
+            float: A random delay between 0 and the capped exponential bound.
+        """
+        bound = min(self.max_delay, self.base_delay * (2**attempt))
+        return random.uniform(0, bound)
+
+    def delay_for(
+        self, retry_class: RetryClass, attempt: int, retry_after: Optional[str] = None
+    ) -> float:
+        """Compute how long to wait before the next attempt.
+
+        Rate-limited responses wait for `Retry-After` when the server provides it
+        (capped at `max_delay`), otherwise they fall back to jittered backoff.
+
+        Args:
+            retry_class (RetryClass): The classification of the failed attempt.
+            attempt (int): The zero-based attempt number that just failed.
+            retry_after (Optional[str]): The raw `Retry-After` header, if any.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        if retry_class is RetryClass.RATE_LIMITED:
+            server_delay = parse_retry_after(retry_after)
+            if server_delay is not None:
+                return min(server_delay, self.max_delay)
+        return self.backoff(attempt)
+
+    def start(self) -> float:
+        """Start the deadline clock for a new request.
+
+        Returns:
+            float: The monotonic time at which the request's budget runs out.
+        """
+        return time.monotonic() + self.deadline
+
+    @staticmethod
+    def remaining(deadline_at: float) -> float:
+        """Return how much of the deadline budget is left.
+
+        Args:
+            deadline_at (float): The value returned by `start`.
+
+        Returns:
+            float: Remaining seconds, never negative.
+        """
+        return max(0.0, deadline_at - time.monotonic())
@@ -12,33 +12,49 @@ Attributes:
 Methods:
     fetch_asset(asset_url: str) -> Optional[dict]:
         Fetches the asset data from a given URL.
+    remember_asset_xml(asset_id: str, data: bytes) -> Optional[dict]:
+        Extracts and caches the content name and template ID from an asset's XML.
     fetch_image_location(asset_id: str) -> Optional[str]:
         Fetches the image location for the given asset ID.
-    download_asset(url: str) -> Optional[Image.Image]:
-        Downloads an image from the given URL.
-    process_asset(clothing_id: str) -> None:
-        Processes a clothing asset by fetching its image and saving it.
+    process_asset(clothing_id: str, profile: Optional[str]) -> Optional[RenderedAsset]:
+        Processes a clothing asset and returns the rendered image in memory. Cached renders
+        are reused, concurrent requests for the same asset ID share one pipeline run, assets
+        sharing a template share one download and render, and the result is written to
+        disk in the background.
 
 roblox_asset_downloader.py
 """
 
-import io
+import asyncio
 import re
 from typing import Optional
 
-from bs4 import BeautifulSoup
-from PIL import Image, UnidentifiedImageError
-
 import constants
 from api_handler import APIHandler
-from asset_type import AssetTypeFactory
+from concurrency import SingleFlight
 from custom_logger import setup_logger
+from encoder import EncodeProfile, get_profile
 from file_handler import FileHandler
+from metadata_cache import MISS, MetadataCache, get_metadata_cache
+from metrics import STAGE_SECONDS, MetricsRegistry, get_metrics
+from output_cache import OutputCache, get_output_cache
+from output_writer import OutputWriter, get_output_writer
+from rbxm_xml import extract_clothing_content
+from render_executor import get_render_executor
+from rendered_asset import RenderedAsset
+from retry_policy import PermanentHTTPError
 from utils import validate_clothing_id
 
 # Set up the logger for this module
 logger = setup_logger(__name__)
 
+# Shared by every downloader in the process (including the web server's request
+# threads) so concurrent requests for one asset ID run the pipeline only once.
+_inflight_assets = SingleFlight()
+# Likewise for templates: different asset IDs using the same template image (and
+# overlay type and profile) are downloaded and composited only once.
+_inflight_templates = SingleFlight()
+
 
 class RobloxAssetDownloader:
     """
@@ -51,16 +67,36 @@ class RobloxAssetDownloader:
     Attributes:
         file_handler (FileHandler): An instance of FileHandler to manage file operations.
         api_handler (APIHandler): An instance of APIHandler to handle API requests.
+        output_cache (OutputCache): The rendered-output cache checked before the pipeline.
+        metadata_cache (MetadataCache): Caches asset and image location lookups.
+        output_writer (OutputWriter): Persists rendered assets in the background.
+        metrics (MetricsRegistry): Records how long each pipeline stage takes.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        api_handler: Optional[APIHandler] = None,
+        output_cache: Optional[OutputCache] = None,
+        metadata_cache: Optional[MetadataCache] = None,
+        output_writer: Optional[OutputWriter] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
         self.file_handler = FileHandler()
-        self.api_handler = APIHandler()
+        # Handlers share the process-wide connection pool, so passing one in is
+        # optional; it only lets callers (e.g. group downloads) reuse a single instance.
+        self.api_handler = api_handler or APIHandler()
+        self.output_cache = output_cache or get_output_cache()
+        self.metadata_cache = metadata_cache or get_metadata_cache()
+        self.output_writer = output_writer or get_output_writer()
+        self.metrics = metrics or get_metrics()
 
     async def fetch_asset(self, asset_url: str) -> Optional[dict]:
         """
         Fetches the asset data from the given asset URL.
 
+        Results, including "private or nonexistent" outcomes, are served from the
+        metadata cache when available.
+
         Args:
             asset_url (str): The URL of the asset to fetch.
 
@@ -72,30 +108,54 @@ class RobloxAssetDownloader:
             logger.error("Invalid asset URL provided: %s", asset_url)
             return None
 
+        cached = self.metadata_cache.get("asset", asset_id)
+        if cached is not MISS:
+            if cached is None:
+                logger.error("Asset %s is cached as private or nonexistent", asset_id)
+                return None
+            logger.debug("Asset metadata cache hit for asset ID: %s", asset_id)
+            return dict(cached)
+
         asset_delivery_url: str = constants.ROUTES["base_asset"].format(asset_id=asset_id)
 
-        # Fetch the asset page as text using the API handler's fetch_text method
-        data = await self.api_handler.fetch_text(asset_delivery_url)
+        # Fetch the asset XML as raw bytes; the extractor scans them without decoding
+        try:
+            data = await self.api_handler.fetch_bytes(asset_delivery_url, raise_permanent=True)
+        except PermanentHTTPError as e:
+            logger.error("Asset %s is unavailable (status %s)", asset_id, e.status)
+            self.metadata_cache.set_negative(
+                "asset", asset_id, e.status, self.api_handler.authenticated
+            )
+            return None
         if not data:
             logger.error("Failed to fetch asset data from: %s", asset_delivery_url)
             return None
 
-        # Parse the HTML response using BeautifulSoup
-        data_soup = BeautifulSoup(data, "html.parser")
-
-        if not data_soup:
-            logger.error("Failed to parse asset data from: %s", asset_delivery_url)
+        discovered_asset = self.remember_asset_xml(asset_id, data)
+        if not discovered_asset:
+            # Not a clothing asset; remember that so repeated requests stay local.
+            logger.error("Failed to extract asset data from: %s", asset_delivery_url)
+            self.metadata_cache.set_negative("asset", asset_id)
             return None
+        return dict(discovered_asset)
 
-        content_name = data_soup.find("content").get("name")
-        template_id = data_soup.find("url").text
+    def remember_asset_xml(self, asset_id: str, data: bytes) -> Optional[dict]:
+        """
+        Extracts an asset's content name and template ID from its XML and caches them.
 
-        if not content_name or not template_id:
-            logger.error("Failed to extract asset data from: %s", asset_delivery_url)
-            return None
+        Args:
+            asset_id (str): The numeric asset ID.
+            data (bytes): The asset's XML, undecoded.
 
-        # Validate and extract the template ID to ensure it's a valid clothing ID
-        template_id = validate_clothing_id(template_id)
+        Returns:
+            Optional[dict]: The asset data, or None (nothing cached) if the XML isn't a
+            clothing asset.
+        """
+        # Pull the content name and template ID straight out of the asset XML
+        content = extract_clothing_content(data)
+        if not content:
+            return None
+        content_name, template_id = content
 
         discovered_asset = {
             "asset id": asset_id,
@@ -111,6 +171,7 @@ class RobloxAssetDownloader:
         elif "ShirtTemplate" in discovered_asset["content name"]:
             discovered_asset["content name"] = "shirt"
 
+        self.metadata_cache.set("asset", asset_id, discovered_asset)
         return discovered_asset
 
     async def fetch_image_location(self, asset_id: str) -> Optional[str]:
@@ -123,16 +184,32 @@ class RobloxAssetDownloader:
         Returns:
             Optional[str]: The image location URL if found, otherwise None.
         """
+        cached = self.metadata_cache.get("location", asset_id)
+        if cached is not MISS:
+            if cached is None:
+                logger.error("Image location for %s is cached as unavailable", asset_id)
+            return cached
+
         imagelocation_url: str = constants.ROUTES["image_location"].format(asset_id=asset_id)
         logger.debug("Fetching image location from: %s", imagelocation_url)
 
         # Use fetch_json to get the image location JSON response
-        response = await self.api_handler.fetch_json(imagelocation_url)
+        try:
+            response = await self.api_handler.fetch_json(imagelocation_url, raise_permanent=True)
+        except PermanentHTTPError as e:
+            logger.error("Image location for %s is unavailable (status %s)", asset_id, e.status)
+            self.metadata_cache.set_negative(
+                "location", asset_id, e.status, self.api_handler.authenticated
+            )
+            return None
         if not response:
             logger.error("Failed to fetch image location for asset ID: %s", asset_id)
             return None
 
-        return self.extract_image_location_from_json(response)
+        location = self.extract_image_location_from_json(response)
+        if location:
+            self.metadata_cache.set("location", asset_id, location)
+        return location
 
     def extract_image_location_from_json(self, json_dict: dict) -> Optional[str]:
         """
@@ -150,93 +227,258 @@ class RobloxAssetDownloader:
             logger.error("No location found in the JSON response.")
             return None
 
-    async def download_asset(self, url: str) -> Optional[Image.Image]:
+    async def process_asset(
+        self, clothing_id: str, profile: Optional[str] = None
+    ) -> Optional[RenderedAsset]:
+        """
+        Processes the given clothing asset URL to download the image.
+
+        A cached render is returned without any network call. Otherwise concurrent
+        calls for the same asset ID and profile, from any downloader instance or
+        thread, wait on a single pipeline run and share its result. Writing the
+        result to `DOWNLOADS_DIR` happens in the background and doesn't delay the
+        return.
+
+        Args:
+            clothing_id (str): The ID of the clothing asset to download.
+            profile (Optional[str]): The encode profile; see `encoder`. Defaults to
+                                     the configured default profile.
+
+        Returns:
+            Optional[RenderedAsset]: The encoded image and its metadata, or None if the
+            asset couldn't be rendered.
+
+        Raises:
+            ValueError: If the asset doesn't exist or the profile is unknown.
         """
-        Asynchronously fetches an image from the given URL.
+        encode_profile = get_profile(profile)
+        asset_id = validate_clothing_id(clothing_id)
+        if not asset_id:
+            # Nothing to deduplicate on; let the pipeline report the invalid input.
+            return await self._process_asset(clothing_id, encode_profile)
+        cached = await self.get_cached(asset_id, encode_profile.name)
+        if cached:
+            return cached
+        return await _inflight_assets.do(
+            (asset_id, encode_profile.name),
+            lambda: self._process_and_cache(asset_id, encode_profile),
+        )
+
+    async def get_cached(self, asset_id: str, profile: str = "default") -> Optional[RenderedAsset]:
         """
-        logger.debug("Downloading asset image from: %s", url)
+        Returns an already rendered asset, from memory while it is still being
+        persisted or from the output cache on disk.
+
+        Args:
+            asset_id (str): The numeric ID of the clothing asset.
+            profile (str): The encode profile to look up.
+
+        Returns:
+            Optional[RenderedAsset]: The cached render, or None on a miss.
+        """
+        pending = self.output_writer.pending(
+            self.output_cache, self.output_cache.filename_for(asset_id, profile)
+        )
+        if pending:
+            logger.info("Pending render reused for asset ID: %s", asset_id)
+            return pending
+
+        path = self.output_cache.get(asset_id, profile)
+        if not path:
+            return None
+        encode_profile = get_profile(profile)
         try:
-            # Fetch the image bytes (ensure binary mode)
-            image_bytes = await self.api_handler.fetch_image(url)
-            if not image_bytes:
-                logger.error("Failed to download image from: %s", url)
-                return None
-            # Ensure we're treating it as binary data
-            asset_img = Image.open(io.BytesIO(image_bytes))
-            asset_img.load()  # Force loading of the image
-            return asset_img
-        except (IOError, OSError, UnidentifiedImageError) as e:
-            logger.error("Error processing image from %s: %s", url, str(e))
+            result = await asyncio.to_thread(
+                RenderedAsset.from_file,
+                asset_id,
+                path,
+                media_type=encode_profile.media_type,
+                extension=encode_profile.extension,
+                profile=encode_profile.name,
+            )
+        except OSError:
+            # Evicted between the lookup and the read; render it again.
             return None
+        logger.info("Output cache hit for asset ID: %s", asset_id)
+        return result
+
+    async def _process_and_cache(
+        self, asset_id: str, profile: EncodeProfile
+    ) -> Optional[RenderedAsset]:
+        """
+        Produces an asset in the given profile and schedules it to be persisted.
 
+        If the default render is already cached, it is re-encoded instead of running
+        the whole pipeline again.
+
+        Args:
+            asset_id (str): The numeric ID of the clothing asset to download.
+            profile (EncodeProfile): The encode profile.
 
-    async def process_asset(self, clothing_id: str) -> None:
+        Returns:
+            Optional[RenderedAsset]: The rendered asset, or None.
         """
-        Processes the given clothing asset URL to download the image.
+        result = None
+        if profile.name != "default":
+            result = await self._transcode_cached(asset_id, profile)
+        if result is None:
+            result = await self._process_asset(asset_id, profile)
+        if result:
+            self.output_writer.submit(self.output_cache, result)
+        return result
+
+    async def _transcode_cached(
+        self, asset_id: str, profile: EncodeProfile
+    ) -> Optional[RenderedAsset]:
+        """
+        Re-encodes a cached default render with another profile.
+
+        Args:
+            asset_id (str): The numeric ID of the clothing asset.
+            profile (EncodeProfile): The encode profile.
+
+        Returns:
+            Optional[RenderedAsset]: The re-encoded asset, or None if no default render
+            is cached.
+        """
+        source = await self.get_cached(asset_id)
+        if not source:
+            return None
+        data = await get_render_executor().transcode(source.data, profile.name)
+        if not data:
+            return None
+        logger.info("Re-encoded cached asset %s as %s.", asset_id, profile.name)
+        return RenderedAsset(
+            asset_id,
+            data,
+            media_type=profile.media_type,
+            extension=profile.extension,
+            asset_type=source.asset_type,
+            profile=profile.name,
+        )
+
+    async def _process_asset(
+        self, clothing_id: str, profile: Optional[EncodeProfile] = None
+    ) -> Optional[RenderedAsset]:
+        """
+        Runs the full download pipeline for one clothing asset.
 
         Args:
             clothing_id (str): The ID of the clothing asset to download.
+            profile (Optional[EncodeProfile]): The encode profile; the default if omitted.
 
         Returns:
-            None
+            Optional[RenderedAsset]: The rendered asset, or None.
         """
-        # Ensure API session closes regardless of outcome
-        try:
-            # Fetch the asset data (e.g., asset ID, template, etc.)
+        profile = profile or get_profile()
+        # The pooled API session is intentionally left open so later assets reuse
+        # its warm connections; the application closes it on shutdown.
+
+        # Each stage is timed by asset type; status is "failed" when it yields nothing.
+        # Fetch the asset data (e.g., asset ID, template, etc.)
+        with self.metrics.time(STAGE_SECONDS, stage="asset_xml") as timer:
             asset_data = await self.fetch_asset(clothing_id)
-            if not asset_data:
-                msg = f"No asset data found for clothing ID: {clothing_id} (may be private or not exist)"
-                logger.error(msg)
-                # Raise so callers (CLI/web) can handle and present a clear error
-                raise ValueError(msg)
-            logger.info("asset data found")
-
-            # Fetch the image location URL
-            image_location = await self.fetch_image_location(asset_data["template id"])
+            timer.set(
+                asset_type=asset_data["content name"] if asset_data else "unknown",
+                status="ok" if asset_data else "failed",
+            )
+        if not asset_data:
+            msg = (
+                f"No asset data found for clothing ID: {clothing_id} "
+                "(may be private or not exist)"
+            )
+            logger.error(msg)
+            # Raise so callers (CLI/web) can handle and present a clear error
+            raise ValueError(msg)
+        logger.debug("asset data found")
+        asset_id = re.sub(r"[^0-9]", "", clothing_id)
+        asset_type = asset_data["content name"]
+        template_id = asset_data["template id"]
+
+        # Catalog items that only differ by listing (recolors, re-uploads) share a
+        # template image, so the rest of the pipeline runs once per template, overlay
+        # type and profile, and every asset ID is served the same render.
+        shared = await _inflight_templates.do(
+            (template_id, asset_type, profile.name),
+            lambda: self._render_template(asset_id, template_id, asset_type, profile),
+        )
+        if not shared:
+            return None
+        return shared.shared_as(asset_id)
+
+    async def _render_template(
+        self, asset_id: str, template_id: str, asset_type: str, profile: EncodeProfile
+    ) -> Optional[RenderedAsset]:
+        """
+        Renders a template image as the given asset type, unless another asset using
+        the same template has already been rendered and is still cached.
+
+        Args:
+            asset_id (str): The numeric ID of the clothing asset being processed.
+            template_id (str): The asset ID of its template image.
+            asset_type (str): The asset's content name, which selects the overlay.
+            profile (EncodeProfile): The encode profile.
+
+        Returns:
+            Optional[RenderedAsset]: The render, for whichever asset it was made for, or None.
+        """
+        render_key = f"{template_id}:{asset_type}"
+        source_id = self.metadata_cache.get("render", render_key)
+        if source_id not in (MISS, None) and source_id != asset_id:
+            shared = await self.get_cached(source_id, profile.name)
+            if not shared and profile.name != "default":
+                shared = await self._transcode_cached(source_id, profile)
+            if shared:
+                logger.info(
+                    "Asset %s shares template %s with asset %s; reusing its render.",
+                    asset_id,
+                    template_id,
+                    source_id,
+                )
+                return shared
+
+        # Fetch the image location URL
+        with self.metrics.time(
+            STAGE_SECONDS, stage="image_location", asset_type=asset_type
+        ) as timer:
+            image_location = await self.fetch_image_location(template_id)
             if not image_location:
-                return
-
-            logger.info("Downloading image from URL: %s", image_location)
-            # Download the image from the URL
-            asset_img = await self.download_asset(image_location)
-            if not asset_img:
-                return
-
-            # Create an asset instance for handling overlay operations
-            asset_type = asset_data["content name"]
-            asset_instance = AssetTypeFactory.create_asset(asset_type, clothing_id, asset_img)
-
-            if not asset_instance:
-                logger.error("Failed to create asset instance for asset type: %s", asset_type)
-                return
-
-            # Special handling for TShirt assets: resize to 512x512, no overlay
-            if asset_type == "tshirt":
-                # Resize to 512x512
-                try:
-                    resized_img = asset_img.resize((512, 512), Image.LANCZOS)
-                    # Save directly using FileHandler
-                    asset_id = re.sub(r"[^0-9]", "", clothing_id)
-                    downloads_dir = self.file_handler.downloads_dir
-                    file_path = self.file_handler.get_download_path(asset_id)
-                    resized_img.save(file_path, format="PNG")
-                    logger.info("Saved resized TShirt image for asset ID: %s", asset_id)
-                except Exception as e:
-                    logger.error("Error resizing/saving TShirt image: %s", str(e))
-                return
-            # For other asset types, overlay as usual
-            overlayed_image = await asset_instance.overlay_image()
-            if not overlayed_image:
-                logger.error("Failed to overlay image on %s template.", asset_type)
-                return
-            # Save the overlayed image
-            await asset_instance.save_asset_image()
-            logger.info("Successfully processed and saved asset for clothing ID: %s", clothing_id)
-
-        finally:
-            # Always attempt to close the API handler session
-            try:
-                await self.api_handler.close()
-                logger.debug("API handler closed.")
-            except Exception:
-                logger.debug("API handler close raised an exception", exc_info=True)
+                timer.set(status="failed")
+        if not image_location:
+            return None
+
+        logger.debug("Downloading image from URL: %s", image_location)
+        # Download the image bytes; decoding happens in the render executor
+        with self.metrics.time(
+            STAGE_SECONDS, stage="cdn_download", asset_type=asset_type
+        ) as timer:
+            image_bytes = await self.api_handler.fetch_image(image_location)
+            if not image_bytes:
+                timer.set(status="failed")
+        if not image_bytes:
+            logger.error("Failed to download image from: %s", image_location)
+            return None
+
+        # Overlay the asset on its template (t-shirts are scaled instead) and encode it,
+        # off the event loop. This stage includes waiting for a render slot; the worker
+        # times decoding, compositing and encoding separately.
+        with self.metrics.time(STAGE_SECONDS, stage="render", asset_type=asset_type) as timer:
+            data = await get_render_executor().render(
+                asset_type, asset_id, image_bytes, profile.name
+            )
+            if not data:
+                timer.set(status="failed")
+        if not data:
+            return None
+
+        # Later assets with this template reuse this asset's cached render.
+        self.metadata_cache.set("render", render_key, asset_id)
+        logger.info("Successfully processed asset for clothing ID: %s", asset_id)
+        return RenderedAsset(
+            asset_id,
+            data,
+            media_type=profile.media_type,
+            extension=profile.extension,
+            asset_type=asset_type,
+            profile=profile.name,
+        )
@@ -0,0 +1,138 @@
+"""
+This module provides the registry of clothing overlay templates.
+
+Every template in `src/assets` is opened, converted to RGBA and resized at most once
+per process; later lookups hand out the same in-memory image, so compositing an
+asset does no file I/O. Paths are resolved relative to this package, not the current
+working directory, so the CLI, the web server and worker processes all find them.
+
+The returned images are shared between every caller (and thread) and must be treated
+as read-only: use them as inputs to `Image.alpha_composite` and similar functions that
+return new images, never draw on or `paste` into them.
+
+Classes:
+    TemplateRegistry: Loads and caches overlay templates by name and size.
+
+Functions:
+    get_template_registry: Returns the process-wide TemplateRegistry instance.
+
+template_registry.py
+"""
+
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+import constants
+from custom_logger import setup_logger
+
+# Set up the logger for this module
+logger = setup_logger(__name__)
+
+ASSETS_DIR = Path(__file__).resolve().parent / "assets"
+
+try:
+    LANCZOS = Image.Resampling.LANCZOS
+except AttributeError:  # Pillow < 9.1
+    LANCZOS = Image.LANCZOS if hasattr(Image, "LANCZOS") else Image.BICUBIC
+
+Size = Tuple[int, int]
+
+
+class TemplateRegistry:
+    """
+    Loads overlay templates once and caches them, keyed by name and target size.
+
+    Template names are the lower-cased keys of `constants.CLOTHING_TEMPLATES`
+    ("shirt", "pants", "tshirt") plus "whitespace".
+
+    Attributes:
+        assets_dir (Path): The directory the template files are read from.
+    """
+
+    def __init__(self, assets_dir: Path = ASSETS_DIR) -> None:
+        self.assets_dir = assets_dir
+        self._filenames: Dict[str, str] = {
+            name.lower(): filename for name, filename in constants.CLOTHING_TEMPLATES.items()
+        }
+        self._filenames["whitespace"] = constants.WHITESPACE_TEMPLATE
+        self._lock = threading.Lock()
+        # (name, size or None for the native size) -> RGBA image, None if unavailable
+        self._images: Dict[Tuple[str, Optional[Size]], Optional[Image.Image]] = {}
+
+    def _load(self, name: str) -> Optional[Image.Image]:
+        """Read a template from disk and convert it to RGBA. Must hold the lock."""
+        filename = self._filenames.get(name)
+        if not filename:
+            logger.error("No overlay template found for type: %s", name)
+            return None
+
+        path = self.assets_dir / filename
+        try:
+            with Image.open(path) as template:
+                image = template.convert("RGBA")
+        except (OSError, ValueError) as e:
+            logger.error("Overlay template file could not be loaded from %s: %s", path, e)
+            return None
+        logger.debug("Loaded overlay template from: %s", path)
+        return image
+
+    def get(self, name: str, size: Optional[Size] = None) -> Optional[Image.Image]:
+        """
+        Returns a shared, read-only RGBA template.
+
+        Args:
+            name (str): The template name, e.g. "shirt" or "whitespace".
+            size (Optional[Size]): The size to resize to; the native size if omitted.
+
+        Returns:
+            Optional[Image.Image]: The template, or None if it doesn't exist.
+        """
+        name = name.lower()
+        key = (name, size)
+        try:
+            return self._images[key]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if key in self._images:
+                return self._images[key]
+
+            native = self._images.get((name, None))
+            if (name, None) not in self._images:
+                native = self._load(name)
+                self._images[(name, None)] = native
+
+            image = native
+            if native is not None and size is not None and native.size != size:
+                image = native.resize(size, LANCZOS)
+            self._images[key] = image
+            return image
+
+    def preload(self) -> None:
+        """Load every known template at its native size and the sizes it is used at."""
+        for name in self._filenames:
+            self.get(name)
+        self.get("whitespace", constants.CLOTHING_TEMPLATE_SIZE)
+        self.get("tshirt", constants.TSHIRT_SIZE)
+
+
+_template_registry: Optional[TemplateRegistry] = None
+_template_registry_lock = threading.Lock()
+
+
+def get_template_registry() -> TemplateRegistry:
+    """Return the process-wide TemplateRegistry, creating it on first use.
+
+    Returns:
+        TemplateRegistry: The shared registry instance.
+    """
+    global _template_registry  # pylint: disable=global-statement
+    if _template_registry is None:
+        with _template_registry_lock:
+            if _template_registry is None:
+                _template_registry = TemplateRegistry()
+    return _template_registry
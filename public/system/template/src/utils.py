@@ -2,6 +2,8 @@
 Utility module for various helper functions.
 """
 
+import logging
+import os
 import re
 from typing import Optional, Tuple
 
@@ -48,3 +50,45 @@ def extract_id_and_type_from_url(input_str: str) -> Optional[Tuple[str, str]]:
         if (catalog_match := re.match(catalog_pattern, input_str))
         else None
     )
+
+
+def env_int(name: str, default: int) -> int:
+    """
+    Reads an integer setting from the environment, falling back to a default.
+
+    Args:
+        name (str): The environment variable name.
+        default (int): The value used when the variable is unset or invalid.
+
+    Returns:
+        int: The configured value.
+    """
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logging.getLogger(__name__).warning("Ignoring invalid integer for %s: %s", name, value)
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    """
+    Reads a decimal setting from the environment, falling back to a default.
+
+    Args:
+        name (str): The environment variable name.
+        default (float): The value used when the variable is unset or invalid.
+
+    Returns:
+        float: The configured value.
+    """
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logging.getLogger(__name__).warning("Ignoring invalid number for %s: %s", name, value)
+        return default
@@ -7,18 +7,23 @@ import fails (for example due to an exception at module import-time), we
 create a minimal Flask application that returns a 500 error and logs the
 original exception. This prevents the serverless function from crashing
 at import time and gives clearer error responses in the deployment logs.
+
+Importing `web_server` is kept cheap because it runs on every cold start: the
+download pipeline is loaded on a background thread (or on the first request),
+and this module's own fallback only imports what it needs when it is used.
 """
 
 import logging
-import traceback
-
-from flask import Flask, jsonify
 
 try:
 	# Attempt to import the real app
 	from web_server import app  # type: ignore
 except Exception as exc:  # pragma: no cover - helpful for runtime debugging
 	# Log the import error with traceback so it appears in Vercel build logs
+	import traceback
+
+	from flask import Flask, jsonify
+
 	logging.exception("Failed to import web_server.app for Vercel WSGI entrypoint")
 	tb = traceback.format_exc()
 
@@ -1,20 +1,178 @@
-from flask import Flask, request, send_file, jsonify
-import asyncio
+from flask import Flask, Response, request, send_file, jsonify, url_for
+import io
 import os
 import re
+import sys
+import threading
 import logging
 
-from roblox_asset_downloader import RobloxAssetDownloader
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
+
+from typing import TYPE_CHECKING
+
+import constants
+from background_loop import get_background_loop
+from custom_logger import logging_stats
+from metrics import get_metrics
+from rendered_asset import RenderedAsset
+from utils import env_int
+
+if TYPE_CHECKING:
+    from encoder import EncodeProfile
 
 # Minimal Flask app that exposes only the API path used by the front-end.
 # The static site should be served by Apache/XAMPP (copy src/static into htdocs).
 app = Flask(__name__)
 
 
+async def _close_connection_pool() -> None:
+    """Close the pooled session, if the download pipeline was ever loaded."""
+    if "connection_pool" in sys.modules:
+        # pylint: disable-next=import-outside-toplevel
+        from connection_pool import shutdown_connection_pool
+
+        await shutdown_connection_pool()
+
+
+# Every handler submits its coroutines to one long-lived event loop, so the pooled
+# session and in-flight downloads are shared across requests. The pool's session is
+# closed on that loop when the process exits.
+background_loop = get_background_loop()
+background_loop.add_shutdown_hook(_close_connection_pool)
+
+# The download pipeline (aiohttp, Pillow, NumPy), and the encoder and caches that
+# import Pillow, are imported on first use rather than with the app, which keeps
+# serverless cold starts short; see `_warm_up`.
+_downloader = None
+_downloader_lock = threading.Lock()
+
+
+def _get_downloader():
+    """Return the downloader shared by every request, loading the pipeline on first use."""
+    global _downloader  # pylint: disable=global-statement
+    if _downloader is None:
+        with _downloader_lock:
+            if _downloader is None:
+                # pylint: disable-next=import-outside-toplevel
+                from roblox_asset_downloader import RobloxAssetDownloader
+
+                _downloader = RobloxAssetDownloader()
+    return _downloader
+
+
+def _warm_up() -> None:
+    """Load the pipeline, TLS context and overlay templates ahead of the first request."""
+    # pylint: disable=import-outside-toplevel
+    try:
+        _get_downloader()
+        from connection_pool import get_ssl_context
+        from template_registry import get_template_registry
+
+        get_ssl_context()
+        get_template_registry().preload()
+    except Exception:
+        logging.exception("Warm-up failed; the first request will load the pipeline")
+
+
+# Overlaps loading the pipeline with whatever the server does before the first request
+# arrives; set WEB_WARM_UP=0 to load it lazily on that request instead. It is off by
+# default on Vercel, where a cold start is usually caused by the request that has to
+# wait, and a warm-up thread would only compete with it for the GIL.
+if env_int("WEB_WARM_UP", 0 if os.getenv("VERCEL") else constants.WEB_WARM_UP):
+    threading.Thread(target=_warm_up, name="warm-up", daemon=True).start()
+
+
+def _run_async(coro):
+    """Run a coroutine on the shared background loop and wait for its result."""
+    return background_loop.run(coro)
+
+
+def _select_profile(data=None) -> "EncodeProfile":
+    """Pick the encode profile for a request.
+
+    An explicit `format` (or `profile`) field in the query string or body wins;
+    otherwise the `Accept` header is negotiated. Raises ValueError for unknown names.
+    """
+    # pylint: disable-next=import-outside-toplevel
+    from encoder import get_profile, negotiate_profile
+
+    name = request.args.get("format") or request.args.get("profile")
+    if not name and isinstance(data, dict):
+        name = data.get("format") or data.get("profile")
+    if name:
+        return get_profile(name)
+    return negotiate_profile(request.headers.get("Accept"))
+
+
+def _profile_error(e: ValueError):
+    """Return the 400 response for an unknown encode profile."""
+    from encoder import available_profiles  # pylint: disable=import-outside-toplevel
+
+    return jsonify({"error": str(e), "formats": available_profiles()}), 400
+
+
+def _cache_max_age() -> int:
+    """Seconds clients and CDNs may reuse a download without revalidating it."""
+    return env_int("HTTP_CACHE_MAX_AGE", constants.HTTP_CACHE_MAX_AGE)
+
+
+def _with_cache_headers(response, etag: str):
+    """Mark a download as immutable and identified by `etag`."""
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = _cache_max_age()
+    response.cache_control.immutable = True
+    response.vary.add("Accept")
+    return response
+
+
+def _not_modified(etag: str):
+    """Return a 304 response if the client already holds this render, else None.
+
+    This is checked before the output cache or the pipeline are touched. The ETag
+    only depends on the asset, the profile and the output version, so it is known
+    without rendering anything. POST /api/download is a safe lookup despite its
+    method, so it is answered the same way.
+    """
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    return _with_cache_headers(Response(status=304), etag)
+
+
+def _send(path_or_file, mimetype: str, download_name: str, etag: str):
+    """Send a download with validators; Range and If-None-Match are honoured."""
+    try:
+        response = send_file(
+            path_or_file,
+            mimetype=mimetype,
+            as_attachment=True,
+            download_name=download_name,
+            etag=etag,
+            max_age=_cache_max_age(),
+            conditional=True,
+        )
+    except RequestedRangeNotSatisfiable as e:
+        return e.get_response()
+    return _with_cache_headers(response, etag)
+
+
+def _send_rendered(result: RenderedAsset, etag: str):
+    """Send a rendered asset held in memory as an attachment."""
+    return _send(io.BytesIO(result.data), result.media_type, result.filename, etag)
+
+
+def _send_cached(file_path: str, asset_id: str, profile: "EncodeProfile", etag: str):
+    """Send a render from the output cache as an attachment."""
+    return _send(file_path, profile.media_type, profile.download_name(asset_id), etag)
+
+
 @app.route("/api/download", methods=["POST"])  # API path intended for proxying by Apache
 def download_api():
     """Accept a JSON body or form field 'clothing' (ID or URL), process the asset,
-    and return the resulting PNG as an attachment.
+    and return the resulting image as an attachment.
+
+    The image is a PNG unless a 'format' field or query parameter (see
+    `encoder.PROFILES`) or the Accept header asks for another encoding.
 
     This endpoint intentionally does not serve static files so Apache can handle them.
     """
@@ -29,35 +187,46 @@ def download_api():
         if not clothing:
             return jsonify({"error": "Please provide clothing id or url in field 'clothing'"}), 400
 
-        # Run the asynchronous processing synchronously for this endpoint
-        downloader = RobloxAssetDownloader()
-        try:
-            asyncio.run(downloader.process_asset(clothing))
-        except Exception:
-            logging.exception("Error processing asset")
-            return jsonify({"error": "Error processing asset"}), 500
-
         # Determine the numeric asset id from the provided input
         asset_id = re.sub(r"[^0-9]", "", clothing)
         if not asset_id:
             return jsonify({"error": "Could not determine numeric asset id from input"}), 400
 
-        # Determine where files are written. In serverless environments we set
-        # DOWNLOADS_DIR (usually /tmp). Fall back to the repo 'downloads/' for
-        # local development.
-        downloads_dir = os.environ.get(
-            "DOWNLOADS_DIR",
-            os.path.join(os.path.dirname(os.path.dirname(__file__)), "downloads"),
-        )
-        file_path = os.path.join(downloads_dir, f"{asset_id}.png")
+        try:
+            profile = _select_profile(data)
+        except ValueError as e:
+            return _profile_error(e)
 
-        if not os.path.exists(file_path):
-            return jsonify({"error": "Download finished but output file not found"}), 500
+        from output_cache import get_output_cache  # pylint: disable=import-outside-toplevel
 
-        # Return the processed image as an attachment
-        return send_file(
-            file_path, mimetype="image/png", as_attachment=True, download_name=f"{asset_id}.png"
-        )
+        output_cache = get_output_cache()
+        etag = output_cache.etag_for(asset_id, profile.name)
+        not_modified = _not_modified(etag)
+        if not_modified:
+            return not_modified
+
+        # Serve a cached render straight away; only run the pipeline on a miss.
+        # Files live in DOWNLOADS_DIR (usually /tmp in serverless environments).
+        file_path = output_cache.get(asset_id, profile.name)
+        if file_path:
+            return _send_cached(file_path, asset_id, profile, etag)
+
+        # Run the asynchronous processing synchronously for this endpoint
+        downloader = _get_downloader()
+        try:
+            result = _run_async(downloader.process_asset(asset_id, profile.name))
+        except TimeoutError:
+            logging.error("Timed out processing asset %s", asset_id)
+            return jsonify({"error": "Timed out processing asset"}), 504
+        except Exception:
+            logging.exception("Error processing asset")
+            return jsonify({"error": "Error processing asset"}), 500
+
+        if result is None:
+            return jsonify({"error": "Asset could not be rendered"}), 500
+
+        # Stream the rendered image from memory; it is persisted in the background
+        return _send_rendered(result, etag)
     except Exception:
         logging.exception("Unhandled exception in download_api")
         return jsonify({"error": "Internal server error"}), 500
@@ -69,7 +238,8 @@ def download_get(asset_id: str):
 
     Example: GET /download/81146553878533
     This proxies the same processing as the POST /api/download endpoint
-    but accepts the asset id directly in the URL for convenience.
+    but accepts the asset id directly in the URL for convenience; add
+    ?format=webp (or another profile name) to choose the encoding.
     """
     try:
         # Normalize asset id to digits only
@@ -77,28 +247,166 @@ def download_get(asset_id: str):
         if not asset_id_clean:
             return jsonify({"error": "Invalid asset id"}), 400
 
+        try:
+            profile = _select_profile()
+        except ValueError as e:
+            return _profile_error(e)
+
+        from output_cache import get_output_cache  # pylint: disable=import-outside-toplevel
+
+        output_cache = get_output_cache()
+        etag = output_cache.etag_for(asset_id_clean, profile.name)
+        not_modified = _not_modified(etag)
+        if not_modified:
+            return not_modified
+
+        # Serve a cached render straight away; only run the pipeline on a miss.
+        file_path = output_cache.get(asset_id_clean, profile.name)
+        if file_path:
+            return _send_cached(file_path, asset_id_clean, profile, etag)
+
         # Run the processing (same as POST handler)
-        downloader = RobloxAssetDownloader()
+        downloader = _get_downloader()
         try:
-            asyncio.run(downloader.process_asset(asset_id_clean))
+            result = _run_async(downloader.process_asset(asset_id_clean, profile.name))
+        except TimeoutError:
+            logging.error("Timed out processing asset %s", asset_id_clean)
+            return jsonify({"error": "Timed out processing asset"}), 504
         except Exception:
             logging.exception("Error processing asset via GET download")
             return jsonify({"error": "Error processing asset"}), 500
 
-        downloads_dir = os.environ.get(
-            "DOWNLOADS_DIR",
-            os.path.join(os.path.dirname(os.path.dirname(__file__)), "downloads"),
-        )
-        file_path = os.path.join(downloads_dir, f"{asset_id_clean}.png")
+        if result is None:
+            return jsonify({"error": "Asset could not be rendered"}), 500
+        return _send_rendered(result, etag)
+    except Exception:
+        logging.exception("Unhandled exception in download_get")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+def _job_status(job):
+    """Return a job's state with links to poll it and to fetch its archive."""
+    data = job.as_dict()
+    data["url"] = url_for("job_status", job_id=job.job_id)
+    data["artifact_url"] = (
+        url_for("job_artifact", job_id=job.job_id) if data["artifact_ready"] else None
+    )
+    return data
+
+
+@app.route("/api/jobs", methods=["POST"])  # Background group and bulk downloads
+def create_job():
+    """Start a background job downloading a group or a list of assets.
+
+    Body (JSON or form): either 'group' (group ID or URL) or 'assets' (a list of
+    asset IDs), and optionally 'format'. Responds 202 with the job's state; poll
+    GET /api/jobs/<id> until its status is "succeeded" or "failed", then fetch the
+    ZIP archive from its 'artifact_url'.
+    """
+    try:
+        if request.is_json:
+            data = request.get_json(silent=True)
+        else:
+            data = request.form.to_dict()
+        if not isinstance(data, dict):
+            return jsonify({"error": "Expected a JSON object"}), 400
+
+        group = data.get("group") or data.get("group_id")
+        if group:
+            group = re.sub(r"[^0-9]", "", str(group))
+            if not group:
+                return jsonify({"error": "Could not determine numeric group id from input"}), 400
+        assets = data.get("assets") or data.get("asset_ids")
+        if isinstance(assets, str):
+            assets = [part for part in re.split(r"[\s,]+", assets) if part]
+
+        # pylint: disable-next=import-outside-toplevel
+        from job_manager import JobLimitError, get_job_manager
+
+        try:
+            profile = _select_profile(data)
+            job = get_job_manager().submit(group_id=group, asset_ids=assets, profile=profile.name)
+        except JobLimitError as e:
+            return jsonify({"error": str(e)}), 503
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        response = jsonify(_job_status(job))
+        response.status_code = 202
+        response.headers["Location"] = url_for("job_status", job_id=job.job_id)
+        return response
+    except Exception:
+        logging.exception("Unhandled exception in create_job")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def job_status(job_id: str):
+    """Report a job's progress and per-asset results."""
+    from job_manager import get_job_manager  # pylint: disable=import-outside-toplevel
+
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    return jsonify(_job_status(job))
 
-        if not os.path.exists(file_path):
-            return jsonify({"error": "Download finished but output file not found"}), 500
 
-        return send_file(
-            file_path, mimetype="image/png", as_attachment=True, download_name=f"{asset_id_clean}.png"
+@app.route("/api/jobs/<job_id>/artifact", methods=["GET"])
+def job_artifact(job_id: str):
+    """Download a finished job's ZIP archive."""
+    from job_manager import get_job_manager  # pylint: disable=import-outside-toplevel
+
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    if not job.artifact_path:
+        return jsonify({"error": "The job has no archive yet", "status": job.status}), 409
+    return send_file(
+        job.artifact_path,
+        mimetype="application/zip",
+        as_attachment=True,
+        download_name=f"{job.group_id or 'assets'}-{job.profile}.zip",
+    )
+
+
+@app.route("/api/groups/<group_id>/archive", methods=["GET"])  # Whole-group ZIP download
+def group_archive(group_id: str):
+    """Stream a ZIP archive of every clothing asset in a group as it is rendered.
+
+    Example: GET /api/groups/123456/archive?format=webp
+    Entries are added as each asset finishes, so the download starts right away;
+    a manifest.json entry at the end lists any assets that failed.
+    """
+    try:
+        group_id_clean = re.sub(r"[^0-9]", "", group_id)
+        if not group_id_clean:
+            return jsonify({"error": "Invalid group id"}), 400
+        try:
+            profile = _select_profile()
+        except ValueError as e:
+            return _profile_error(e)
+
+        from archive_stream import GroupArchiveStream  # pylint: disable=import-outside-toplevel
+
+        stream = GroupArchiveStream(group_id_clean, profile.name)
+        try:
+            has_assets = stream.start()
+        except TimeoutError:
+            stream.close()
+            return jsonify({"error": "Timed out waiting for the group's first asset"}), 504
+        if not has_assets:
+            return jsonify({"error": "No clothing assets found in the group"}), 404
+
+        response = Response(iter(stream), mimetype="application/zip")
+        response.headers["Content-Disposition"] = (
+            f"attachment; filename=group-{group_id_clean}.zip"
         )
+        # Let reverse proxies pass chunks through as they are produced.
+        response.headers["X-Accel-Buffering"] = "no"
+        response.call_on_close(stream.close)
+        return response
     except Exception:
-        logging.exception("Unhandled exception in download_get")
+        logging.exception("Unhandled exception in group_archive")
         return jsonify({"error": "Internal server error"}), 500
 
 
@@ -120,33 +428,85 @@ def check_cookie():
         has_cookie = bool(os.environ.get("ROBLOX_COOKIE") or os.environ.get("ROBLOSECURITY"))
 
         # Use APIHandler to perform a single request and return status
+        from api_handler import APIHandler  # pylint: disable=import-outside-toplevel
+
         handler = APIHandler()
-        try:
-            result = asyncio.run(handler.fetch_json(test_url))
-            if result is None:
-                # fetch_json returns None on non-200 or errors
-                return jsonify({
-                    "has_cookie": has_cookie,
-                    "asset_status": "non-200 or error",
-                    "message": "Asset request returned non-200 or could not be parsed",
-                }), 200
-            # If we got JSON back, return the keys lightly
+        result = _run_async(handler.fetch_json(test_url))
+        if result is None:
+            # fetch_json returns None on non-200 or errors
             return jsonify({
                 "has_cookie": has_cookie,
-                "asset_status": 200,
-                "message": "Asset request succeeded (JSON)",
-                "sample_keys": list(result.keys()) if isinstance(result, dict) else None,
+                "asset_status": "non-200 or error",
+                "message": "Asset request returned non-200 or could not be parsed",
             }), 200
-        finally:
-            try:
-                asyncio.run(handler.close())
-            except Exception:
-                pass
+        # If we got JSON back, return the keys lightly
+        return jsonify({
+            "has_cookie": has_cookie,
+            "asset_status": 200,
+            "message": "Asset request succeeded (JSON)",
+            "sample_keys": list(result.keys()) if isinstance(result, dict) else None,
+        }), 200
     except Exception:
         logging.exception("Unhandled exception in check_cookie")
         return jsonify({"error": "Internal server error"}), 500
 
 
+def _existing_component(module: str, attribute: str):
+    """
+    Return a component's module-level singleton without importing or creating it.
+
+    Returns None until the first download has loaded the module and built the
+    component, so the stats routes keep a cold start as light as the import itself.
+    """
+    loaded = sys.modules.get(module)
+    return getattr(loaded, attribute, None) if loaded is not None else None
+
+
+def _component_stats() -> dict:
+    """
+    Collect the operational counters of the components this process has started.
+
+    A scrape never creates a component: one that has not been used yet (no SQLite
+    store opened, no jobs directory, no render pool) is simply left out.
+    """
+    component_stats = {"logging": logging_stats()}
+    rate_limiter = _existing_component("rate_limiter", "_rate_limiter")
+    if rate_limiter is not None:
+        component_stats["rate_limits"] = rate_limiter.snapshot()
+    for name, module, attribute in (
+        ("output_cache", "output_cache", "_output_cache"),
+        ("metadata_cache", "metadata_cache", "_metadata_cache"),
+        ("render", "render_executor", "_render_executor"),
+        ("persistence", "output_writer", "_output_writer"),
+        ("jobs", "job_manager", "_job_manager"),
+        ("connection_pool", "connection_pool", "_pool"),
+    ):
+        component = _existing_component(module, attribute)
+        if component is not None:
+            component_stats[name] = component.stats()
+    return component_stats
+
+
+@app.route("/api/stats", methods=["GET"])  # Operational counters for tuning
+def stats():
+    """Return per-host request rates, cache counters and render pool load as JSON."""
+    return jsonify(_component_stats())
+
+
+@app.route("/metrics", methods=["GET"])  # Prometheus scrape target
+def metrics():
+    """Return stage and request timing histograms, retry counts and the component
+    counters from /api/stats in the Prometheus text format.
+
+    Timings are only recorded while METRICS_ENABLED is on; the component counters
+    are always reported.
+    """
+    return Response(
+        get_metrics().render(_component_stats()),
+        mimetype="text/plain; version=0.0.4",
+    )
+
+
 if __name__ == "__main__":
     # For local development
     app.run(host="127.0.0.1", port=5000, debug=False)
@@ -0,0 +1,100 @@
+"""
+Tests for compositor.py: the NumPy backend must match the Pillow one byte for byte.
+
+Each case composites a noisy, partly transparent clothing image with the real
+templates from src/assets. The cases are also what benchmarks/bench_compositor.py
+times, and it runs these tests before timing anything.
+
+test_compositor.py
+"""
+
+import random
+import sys
+import unittest
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+# Imported after sys.path is set up.
+# pylint: disable=wrong-import-position
+import constants  # noqa: E402
+from compositor import PillowCompositor, np  # noqa: E402
+from PIL import Image  # noqa: E402
+from template_registry import get_template_registry  # noqa: E402
+
+
+def random_asset(size: Tuple[int, int], seed: int = 0) -> Image.Image:
+    """A noisy, partly transparent RGBA image like a clothing upload."""
+    data = random.Random(seed).randbytes(size[0] * size[1] * 4)
+    return Image.frombytes("RGBA", size, data)
+
+
+def clothing_cases(seed: int = 0) -> Dict[str, Tuple[Image.Image, List[Image.Image]]]:
+    """
+    Builds a shirt, pants and t-shirt case from the real templates.
+
+    Returns:
+        Dict[str, Tuple[Image.Image, List[Image.Image]]]: The asset and overlay
+        layers to composite, by clothing type.
+    """
+    registry = get_template_registry()
+    registry.preload()
+    whitespace = registry.get("whitespace", constants.CLOTHING_TEMPLATE_SIZE)
+    return {
+        "shirt": (
+            random_asset(constants.CLOTHING_TEMPLATE_SIZE, seed),
+            [registry.get("shirt"), whitespace],
+        ),
+        "pants": (
+            random_asset(constants.CLOTHING_TEMPLATE_SIZE, seed + 1),
+            [registry.get("pants"), whitespace],
+        ),
+        "tshirt": (
+            random_asset(constants.TSHIRT_SIZE, seed + 2),
+            [registry.get("tshirt", constants.TSHIRT_SIZE)],
+        ),
+    }
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class NumpyCompositorTest(unittest.TestCase):
+    """NumpyCompositor against PillowCompositor on every clothing type."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # pylint: disable-next=import-outside-toplevel
+        from compositor import NumpyCompositor
+
+        cls.cases = clothing_cases()
+        cls.pillow = PillowCompositor()
+        cls.numpy = NumpyCompositor()
+
+    def assert_matches_pillow(self, name: str) -> None:
+        asset, layers = self.cases[name]
+        expected = self.pillow.compose(asset, layers)
+        actual = self.numpy.compose(asset, layers)
+        self.assertEqual((actual.mode, actual.size), (expected.mode, expected.size))
+        self.assertEqual(actual.tobytes(), expected.tobytes())
+
+    def test_shirt(self) -> None:
+        self.assert_matches_pillow("shirt")
+
+    def test_pants(self) -> None:
+        self.assert_matches_pillow("pants")
+
+    def test_tshirt(self) -> None:
+        self.assert_matches_pillow("tshirt")
+
+    def test_reused_prepared_layers(self) -> None:
+        # Layers are prepared once and cached; a second asset must not see stale state.
+        for name, (asset, layers) in clothing_cases(seed=100).items():
+            with self.subTest(name):
+                self.assertEqual(
+                    self.numpy.compose(asset, layers).tobytes(),
+                    self.pillow.compose(asset, layers).tobytes(),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
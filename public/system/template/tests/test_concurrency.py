@@ -0,0 +1,77 @@
+"""
+Tests for concurrency.py: SingleFlight sharing one execution between callers.
+
+test_concurrency.py
+"""
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+# Imported after sys.path is set up.
+# pylint: disable=wrong-import-position
+from concurrency import SingleFlight  # noqa: E402
+
+
+class SingleFlightTest(unittest.IsolatedAsyncioTestCase):
+    """SingleFlight.do with concurrent callers for one key."""
+
+    async def asyncSetUp(self) -> None:
+        self.flight = SingleFlight()
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def work(self) -> str:
+        self.calls += 1
+        await self.release.wait()
+        return "result"
+
+    async def start_callers(self, count: int):
+        callers = [asyncio.create_task(self.flight.do("key", self.work)) for _ in range(count)]
+        # Let the leader start the work and the others join it.
+        await asyncio.sleep(0)
+        return callers
+
+    async def test_callers_share_one_execution(self) -> None:
+        callers = await self.start_callers(3)
+        self.release.set()
+        self.assertEqual(await asyncio.gather(*callers), ["result"] * 3)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.flight.in_flight(), 0)
+
+    async def test_cancelled_leader_leaves_work_running(self) -> None:
+        leader, *waiters = await self.start_callers(3)
+        leader.cancel()
+        await asyncio.sleep(0)
+        self.release.set()
+        self.assertEqual(await asyncio.gather(*waiters), ["result"] * 2)
+        self.assertTrue(leader.cancelled())
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.flight.in_flight(), 0)
+
+    async def test_cancelled_waiter_leaves_work_running(self) -> None:
+        leader, waiter, other = await self.start_callers(3)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        self.release.set()
+        self.assertEqual(await asyncio.gather(leader, other), ["result"] * 2)
+        self.assertTrue(waiter.cancelled())
+
+    async def test_exception_reaches_every_caller(self) -> None:
+        async def fail() -> None:
+            await self.release.wait()
+            raise ValueError("boom")
+
+        callers = [asyncio.create_task(self.flight.do("key", fail)) for _ in range(3)]
+        await asyncio.sleep(0)
+        self.release.set()
+        for outcome in await asyncio.gather(*callers, return_exceptions=True):
+            self.assertIsInstance(outcome, ValueError)
+        self.assertEqual(self.flight.in_flight(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()